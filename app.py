@@ -19,6 +19,9 @@ sys.path.insert(0, str(current_dir / 'src'))
 
 from rag_system import TradingKnowledgeBase
 from chatbot import TraderAnalysisChatbot
+from timeseries import EquityCurves
+from activity import ActivityCube
+from cohorts import EXPERIENCE_BUCKETS, CohortTable, experience_bounds
 
 # 페이지 설정
 st.set_page_config(
@@ -234,10 +237,9 @@ st.markdown("""
 
 # 데이터 로드 (캐싱)
 @st.cache_data
-def load_data():
-    """데이터 로드"""
-    data_path = current_dir / 'data' / 'analysis_results_50.json'
-    kb = TradingKnowledgeBase(str(data_path))
+def load_data(version=0, _kb=None):
+    """데이터 로드 (version은 챗봇 리프레셔의 재로딩 번호 - 바뀌면 새 지식베이스로 다시 만듦)"""
+    kb = _kb if _kb is not None else TradingKnowledgeBase(str(current_dir / 'data' / 'analysis_results_50.json'))
     traders = kb.get_all_traders()
     return pd.DataFrame([
         {
@@ -256,6 +258,51 @@ def load_data():
         for t in traders
     ])
 
+def _mtime(path):
+    """캐시 키용 파일 수정 시각 (없으면 None) - 분석을 다시 돌리면 캐시를 새로 만든다"""
+    return path.stat().st_mtime_ns if path.exists() else None
+
+@st.cache_resource
+def _equity_curves(path, mtime):
+    return None if mtime is None else EquityCurves(str(path))
+
+def load_equity_curves():
+    """일별 자산 곡선 로드 (analyzer.py --timeseries로 생성, 없으면 None)"""
+    path = current_dir / 'data' / 'analysis_results_50.timeseries.npz'
+    return _equity_curves(path, _mtime(path))
+
+@st.cache_resource
+def _activity_cube(path, mtime):
+    return None if mtime is None else ActivityCube(str(path))
+
+def load_activity_cube():
+    """(트레이더 x 요일 x 시각) 활동 큐브 로드 (analyzer.py 실행 시 리포트 옆에 생성, 없으면 None)"""
+    path = current_dir / 'data' / 'analysis_results_50.activity.npz'
+    return _activity_cube(path, _mtime(path))
+
+@st.cache_resource
+def _cohorts(path, mtime):
+    return None if mtime is None else CohortTable(str(path))
+
+def load_cohorts():
+    """스타일/리스크/경력 코호트 통계 로드 (analyzer.py 실행 시 리포트 옆에 생성, 없으면 None)"""
+    path = current_dir / 'data' / 'analysis_results_50.cohorts.json'
+    return _cohorts(path, _mtime(path))
+
+def cohort_cell(cohorts, style, risk, exp_range):
+    """사이드바 필터가 코호트 하나에 해당하면 미리 계산된 셀 반환 (경력은 전체 또는 구간 하나만)"""
+    if cohorts is None:
+        return None
+    if exp_range == (EXPERIENCE_BUCKETS[0][0], EXPERIENCE_BUCKETS[-1][0]):
+        years = None
+    elif exp_range[0] == exp_range[1]:
+        years = exp_range[0]
+    else:
+        return None
+    return cohorts.stats(
+        None if style == '전체' else style, None if risk == '전체' else risk, years
+    )
+
 @st.cache_resource
 def load_chatbot():
     """챗봇 로드"""
@@ -266,6 +313,7 @@ def load_chatbot():
         api_key = os.getenv('GEMINI_API_KEY')
     
     data_path = str(current_dir / 'data' / 'analysis_results_50.json')
+    # 챗봇은 세션 간에 공유되고, 리포트가 바뀌면 리프레셔가 지식베이스를 백그라운드에서 교체한다
     return TraderAnalysisChatbot(api_key=api_key, provider='gemini', data_path=data_path)
 
 # 메인
@@ -276,8 +324,8 @@ def main():
     
     # 데이터 로드
     try:
-        df = load_data()
         chatbot = load_chatbot()
+        df = load_data(chatbot.refresher.version, chatbot.kb)
     except Exception as e:
         st.error(f"데이터 로드 실패: {e}")
         return
@@ -294,13 +342,9 @@ def main():
         risks = ['전체'] + sorted(df['risk'].unique().tolist())
         selected_risk = st.selectbox("리스크 성향", risks)
         
-        # 경력 필터
-        exp_range = st.slider(
-            "경력 (년)",
-            min_value=int(df['experience'].min()),
-            max_value=int(df['experience'].max()),
-            value=(int(df['experience'].min()), int(df['experience'].max()))
-        )
+        # 경력 필터 (코호트 통계와 같은 구간 단위)
+        labels = [label for label, _ in EXPERIENCE_BUCKETS]
+        exp_range = st.select_slider("경력 (년)", options=labels, value=(labels[0], labels[-1]))
         
         st.markdown("---")
         st.markdown("**📈 데이터 요약**")
@@ -314,10 +358,11 @@ def main():
         filtered_df = filtered_df[filtered_df['style'] == selected_style]
     if selected_risk != '전체':
         filtered_df = filtered_df[filtered_df['risk'] == selected_risk]
-    filtered_df = filtered_df[
-        (filtered_df['experience'] >= exp_range[0]) &
-        (filtered_df['experience'] <= exp_range[1])
-    ]
+    exp_low, _ = experience_bounds(exp_range[0])
+    _, exp_high = experience_bounds(exp_range[1])
+    filtered_df = filtered_df[filtered_df['experience'] >= exp_low]
+    if exp_high is not None:
+        filtered_df = filtered_df[filtered_df['experience'] < exp_high]
     
     # 탭 구성 - AI 챗봇을 첫 번째로
     tab1, tab2, tab3, tab4 = st.tabs(["💬 AI 챗봇", "📊 대시보드", "📈 차트", "📋 트레이더 목록"])
@@ -326,7 +371,7 @@ def main():
         show_chatbot(chatbot)
     
     with tab2:
-        show_dashboard(filtered_df)
+        show_dashboard(filtered_df, cohort_cell(load_cohorts(), selected_style, selected_risk, exp_range))
     
     with tab3:
         show_charts(filtered_df)
@@ -334,25 +379,28 @@ def main():
     with tab4:
         show_trader_list(filtered_df)
 
-def show_dashboard(df):
-    """대시보드 탭"""
+def show_dashboard(df, cohort=None):
+    """대시보드 탭 (cohort가 있으면 평균/분포를 미리 계산된 코호트 셀에서 읽음)"""
     st.subheader("📊 핵심 지표")
     
+    def mean(metric):
+        return cohort[metric]['mean'] if cohort and cohort[metric]['count'] else df[metric].mean()
+    
     # 상위 지표
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
             "평균 승률",
-            f"{df['win_rate'].mean():.1f}%",
-            f"{df['win_rate'].mean() - 50:.1f}% vs 50%"
+            f"{mean('win_rate'):.1f}%",
+            f"{mean('win_rate') - 50:.1f}% vs 50%"
         )
     
     with col2:
         st.metric(
             "평균 샤프 비율",
-            f"{df['sharpe_ratio'].mean():.2f}",
-            f"{df['sharpe_ratio'].mean() - 1:.2f} vs 1.0"
+            f"{mean('sharpe_ratio'):.2f}",
+            f"{mean('sharpe_ratio') - 1:.2f} vs 1.0"
         )
     
     with col3:
@@ -365,10 +413,18 @@ def show_dashboard(df):
     with col4:
         st.metric(
             "평균 MDD",
-            f"{df['max_drawdown_pct'].mean():.1f}%",
+            f"{mean('max_drawdown_pct'):.1f}%",
             "손실폭"
         )
     
+    if cohort:
+        st.markdown(f"**코호트 분포** ({cohort['traders']}명)")
+        st.dataframe(pd.DataFrame({
+            label: {stat: cohort[metric][stat] for stat in ['p10', 'p25', 'median', 'p75', 'p90']}
+            for metric, label in [('win_rate', '승률'), ('sharpe_ratio', '샤프'),
+                                  ('total_pnl', '수익'), ('max_drawdown_pct', 'MDD')]
+        }).T, use_container_width=True)
+    
     st.markdown("---")
     
     # Top 5 트레이더
@@ -447,6 +503,71 @@ def show_charts(df):
         labels={'total_pnl': '총 수익 ($)'}
     )
     st.plotly_chart(fig4, use_container_width=True)
+    
+    # 차트 5: 요일 x 시간대 활동 히트맵 (필터된 트레이더 합계)
+    cube = load_activity_cube()
+    if cube is not None:
+        heatmap = cube.heatmap(df['trader_id'].tolist())
+        heatmap = heatmap.loc[:, heatmap.sum(axis=0) > 0]
+        fig_activity = px.imshow(
+            heatmap,
+            labels={'x': '시각', 'y': '요일', 'color': '거래 건수'},
+            title='요일 x 시간대 거래 활동',
+            aspect='auto',
+            color_continuous_scale='Blues'
+        )
+        st.plotly_chart(fig_activity, use_container_width=True)
+    
+    # 차트 6: 트레이더별 자산 곡선과 롤링 지표
+    st.markdown("---")
+    st.subheader("📉 자산 곡선 & 롤링 지표")
+    curves = load_equity_curves()
+    if curves is None:
+        st.info(
+            "자산 곡선 파일이 없습니다. `python src/analyzer.py --transactions data/trading_transactions_50.csv "
+            "--profiles data/trader_profiles_50.csv --output data/analysis_results_50.json --timeseries`로 생성하세요."
+        )
+        return
+    
+    available = df[df['trader_id'].isin(curves.trader_ids)]
+    if available.empty:
+        st.info("선택한 필터에 해당하는 자산 곡선이 없습니다.")
+        return
+    
+    trader_labels = {
+        f"{name} ({trader_id})": trader_id
+        for name, trader_id in zip(available['name'], available['trader_id'])
+    }
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        selected = st.selectbox("트레이더", list(trader_labels))
+    with col2:
+        window = st.selectbox("롤링 윈도우 (일)", curves.windows)
+    with col3:
+        metric = st.selectbox("롤링 지표", ['샤프 비율', 'MDD', '승률'])
+    
+    series = curves.get(trader_labels[selected])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        fig5 = go.Figure()
+        fig5.add_trace(go.Scatter(x=series['date'], y=series['equity'], name='누적 손익'))
+        fig5.add_trace(go.Scatter(x=series['date'], y=series['drawdown'], name='낙폭', fill='tozeroy'))
+        fig5.update_layout(title='일별 누적 실현 손익 ($)', height=400)
+        st.plotly_chart(fig5, use_container_width=True)
+    
+    with col2:
+        metric_map = {'샤프 비율': 'sharpe', 'MDD': 'max_drawdown', '승률': 'win_rate'}
+        column = f"{metric_map[metric]}_{window}d"
+        fig6 = px.line(
+            series,
+            x='date',
+            y=column,
+            title=f'롤링 {metric} ({window}일)',
+            labels={'date': '날짜', column: metric}
+        )
+        fig6.update_layout(height=400)
+        st.plotly_chart(fig6, use_container_width=True)
 
 def show_trader_list(df):
     """트레이더 목록 탭"""
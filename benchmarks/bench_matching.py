@@ -0,0 +1,110 @@
+"""
+라운드트립 매칭 벤치마크: 벡터화 엔진 vs 기존 행 단위 루프
+
+    python benchmarks/bench_matching.py --rows 10000000
+    python benchmarks/bench_matching.py --file data/trading_transactions_50.csv
+
+기존 루프는 10M 행 전체를 돌리면 수 시간이 걸리므로 일부 트레이더만 실행해
+행당 시간으로 전체 소요 시간을 추정하고, 같은 표본에서 결과 일치 여부도 검증한다.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from matching import match_round_trips
+
+
+def synthesize(n_rows, rows_per_trader=500, n_symbols=30, seed=42):
+    """매수/매도가 섞인 합성 거래 데이터 생성"""
+    rng = np.random.default_rng(seed)
+    n_traders = max(1, n_rows // rows_per_trader)
+    trader = np.sort(rng.integers(0, n_traders, n_rows))
+    symbol = rng.integers(0, n_symbols, n_rows)
+    is_sell = rng.random(n_rows) < 0.5
+    start = np.datetime64('2024-01-01T09:00:00', 's')
+    ts = start + rng.integers(0, 180 * 86400, n_rows).astype('timedelta64[s]')
+    quantity = rng.choice([10, 25, 50, 100, 200], n_rows)
+    price = np.round(rng.uniform(50, 500, n_rows), 2)
+    commission = np.round(quantity * price * 0.001, 2)
+    total = np.round(np.where(is_sell, quantity * price - commission, quantity * price + commission), 2)
+
+    trader_names = np.array([f"T{i:06d}" for i in range(n_traders)], dtype=object)
+    symbol_names = np.array([f"S{i:03d}" for i in range(n_symbols)], dtype=object)
+    return pd.DataFrame({
+        'trader_id': pd.Categorical.from_codes(trader, trader_names),
+        'symbol': pd.Categorical.from_codes(symbol, symbol_names),
+        'side': pd.Categorical.from_codes(is_sell.astype(np.int8), ['Buy', 'Sell']),
+        'quantity': quantity,
+        'price': price,
+        'total_amount': total,
+        'datetime': ts.astype('datetime64[ns]')
+    })
+
+
+def legacy_match(transactions, trader_id):
+    """기존 calculate_trader_metrics의 행 단위 매칭 루프"""
+    trader_trades = transactions[transactions['trader_id'] == trader_id]
+    trades = []
+    for symbol in trader_trades['symbol'].unique():
+        symbol_trades = trader_trades[trader_trades['symbol'] == symbol].sort_values('datetime', kind='stable')
+        buys = symbol_trades[symbol_trades['side'] == 'Buy']
+        sells = symbol_trades[symbol_trades['side'] == 'Sell']
+        for i in range(min(len(buys), len(sells))):
+            buy = buys.iloc[i]
+            sell = sells.iloc[i]
+            pnl = sell['total_amount'] - buy['total_amount']
+            trades.append({
+                'trader_id': trader_id,
+                'symbol': symbol,
+                'pnl': pnl,
+                'pnl_pct': (pnl / buy['total_amount']) * 100,
+                'hold_days': (sell['datetime'] - buy['datetime']).days
+            })
+    return pd.DataFrame(trades, columns=['trader_id', 'symbol', 'pnl', 'pnl_pct', 'hold_days'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000, help='합성 데이터 행 수')
+    parser.add_argument('--file', help='합성 대신 사용할 거래 CSV')
+    parser.add_argument('--sample-traders', type=int, default=10, help='기존 루프를 실행할 트레이더 수')
+    args = parser.parse_args()
+
+    if args.file:
+        transactions = pd.read_csv(args.file)
+        transactions['datetime'] = pd.to_datetime(transactions['date'] + ' ' + transactions['time'])
+    else:
+        transactions = synthesize(args.rows)
+    n_rows = len(transactions)
+    print(f"[INFO] {n_rows:,} rows, {transactions['trader_id'].nunique():,} traders")
+
+    start = time.perf_counter()
+    round_trips = match_round_trips(transactions)
+    vectorized_sec = time.perf_counter() - start
+    print(f"[VECTORIZED] {vectorized_sec:.2f}s, {len(round_trips):,} round trips")
+
+    sample_ids = list(pd.unique(transactions['trader_id']))[:args.sample_traders]
+    sample = transactions[transactions['trader_id'].isin(sample_ids)]
+    start = time.perf_counter()
+    legacy = pd.concat([legacy_match(sample, tid) for tid in sample_ids], ignore_index=True)
+    legacy_sec = time.perf_counter() - start
+    legacy_est = legacy_sec / max(len(sample), 1) * n_rows
+    print(f"[LEGACY] {legacy_sec:.2f}s for {len(sample):,} rows -> est. {legacy_est:.0f}s for all rows")
+    print(f"[SPEEDUP] ~{legacy_est / vectorized_sec:.0f}x")
+
+    expected = round_trips[round_trips['trader_id'].isin(sample_ids)].reset_index(drop=True)
+    for col in ['pnl', 'pnl_pct', 'hold_days']:
+        if not np.array_equal(expected[col].to_numpy(), legacy[col].to_numpy()):
+            print(f"[ERROR] Mismatch in {col}")
+            sys.exit(1)
+    print("[OK] pnl, pnl_pct, hold_days identical on sample")
+
+
+if __name__ == "__main__":
+    main()
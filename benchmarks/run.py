@@ -0,0 +1,187 @@
+"""
+분석 파이프라인 단계별 벤치마크와 회귀 추적
+
+    python benchmarks/run.py                          # 기본 규모(1만/10만/100만 행) 측정
+    python benchmarks/run.py --scales 100000 --repeat 5
+    python benchmarks/run.py --save-baseline          # 현재 결과를 기준선으로 저장
+    python benchmarks/run.py --threshold 1.25         # 기준선보다 25% 이상 느려지면 exit 1
+
+규모마다 generate_traders.py로 고정 시드/기준일 데이터를 만들고(--data-dir에 재사용),
+CSV 로드, datetime 파싱, 캐시 로드, 라운드트립/로트 매칭, 지표, 패턴, JSON 저장을
+각각 --repeat 번 실행해 최솟값과 중앙값을 기록한다. 기준선 비교는 최솟값 기준이며
+--min-delta보다 작은 차이는 측정 잡음으로 보고 무시한다.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'src'))
+
+from generate_traders import write_dataset
+from columnar import read_transactions_csv, parse_datetimes, load_transactions
+from matching import match_round_trips
+from lots import match_lots
+from batch_metrics import compute_all_metrics, compute_all_patterns, assemble_results
+from incremental import write_json_atomic
+from report_io import write_report
+
+DEFAULT_SCALES = [10_000, 100_000, 1_000_000]
+ROWS_PER_TRADER = 400
+END_DATE = date(2025, 6, 30)
+RESULTS_DIR = ROOT / 'benchmarks' / 'results'
+
+
+def dataset(rows, data_dir):
+    """규모별 합성 데이터 (이미 있으면 재사용)"""
+    tag = f"bench_{rows}"
+    profiles_file = os.path.join(data_dir, f'trader_profiles_{tag}.csv')
+    transactions_file = os.path.join(data_dir, f'trading_transactions_{tag}.csv')
+    if not (os.path.exists(profiles_file) and os.path.exists(transactions_file)):
+        n_traders = max(1, rows // ROWS_PER_TRADER)
+        mean = ROWS_PER_TRADER // 2
+        write_dataset(n_traders, (mean // 2, mean + mean // 2), seed=42, end_date=END_DATE,
+                      output_dir=data_dir, tag=tag)
+    return profiles_file, transactions_file
+
+
+def measure(func, repeat):
+    """func를 repeat번 실행한 시간 목록과 마지막 반환값"""
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+
+def run_scale(rows, data_dir, repeat):
+    """한 규모에서 단계별 소요 시간 측정"""
+    profiles_file, transactions_file = dataset(rows, data_dir)
+    profiles = pd.read_csv(profiles_file)
+    timings = {}
+
+    def stage(name, func):
+        times, result = measure(func, repeat)
+        timings[name] = {'min': min(times), 'median': statistics.median(times)}
+        print(f"  {name:<16} {min(times):8.3f}s")
+        return result
+
+    raw = stage('read_csv', lambda: pd.read_csv(transactions_file))
+    stage('parse_datetimes', lambda: parse_datetimes(raw['date'], raw['time']))
+    transactions = stage('load_typed', lambda: read_transactions_csv(transactions_file))
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_transactions(transactions_file, cache_dir=cache_dir)  # 캐시 생성 (측정 제외)
+        stage('load_cache', lambda: load_transactions(transactions_file, cache_dir=cache_dir))
+
+    round_trips = stage('match_pairwise', lambda: match_round_trips(transactions))
+    stage('match_fifo', lambda: match_lots(transactions, 'fifo'))
+    stage('match_lifo', lambda: match_lots(transactions, 'lifo'))
+    stage('match_average', lambda: match_lots(transactions, 'average'))
+    performances = stage('metrics', lambda: compute_all_metrics(round_trips))
+    patterns = stage('patterns', lambda: compute_all_patterns(transactions))
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        output_file = os.path.join(out_dir, 'report.json')
+
+        def write_results():
+            write_report(output_file, assemble_results(profiles, performances, patterns))
+        stage('json_write', write_results)
+
+    return {'rows': len(transactions), 'traders': len(profiles), 'stages': timings}
+
+
+def environment():
+    """결과 비교에 필요한 실행 환경 정보"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(current, baseline, threshold, min_delta):
+    """기준선 대비 느려진 (규모, 단계) 목록"""
+    regressions = []
+    for scale, result in current['scales'].items():
+        base = baseline.get('scales', {}).get(scale)
+        if base is None:
+            continue
+        for name, timing in result['stages'].items():
+            if name not in base['stages']:
+                continue
+            before, after = base['stages'][name]['min'], timing['min']
+            ratio = after / before if before > 0 else float('inf')
+            marker = ''
+            if ratio > threshold and after - before > min_delta:
+                regressions.append((scale, name, before, after, ratio))
+                marker = '  <-- REGRESSION'
+            print(f"  {scale:>10} {name:<16} {before:8.3f}s -> {after:8.3f}s ({ratio:5.2f}x){marker}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help='측정할 거래 행 수')
+    parser.add_argument('--repeat', type=int, default=3, help='단계별 반복 횟수')
+    parser.add_argument('--data-dir', default=str(ROOT / 'benchmarks' / 'data'), help='합성 데이터 보관 디렉터리')
+    parser.add_argument('--output', default=str(RESULTS_DIR / 'latest.json'), help='결과 JSON 경로')
+    parser.add_argument('--baseline', default=str(RESULTS_DIR / 'baseline.json'), help='비교할 기준선 JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='이번 결과를 기준선으로 저장')
+    parser.add_argument('--threshold', type=float, default=1.25, help='회귀로 판단할 최솟값 배율')
+    parser.add_argument('--min-delta', type=float, default=0.02, help='무시할 절대 차이(초)')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    current = {'environment': environment(), 'repeat': args.repeat, 'scales': {}}
+    for rows in args.scales:
+        print(f"[BENCH] {rows:,} rows")
+        current['scales'][str(rows)] = run_scale(rows, args.data_dir, args.repeat)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    write_json_atomic(args.output, current, indent=2)
+    print(f"[SAVED] {args.output}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        write_json_atomic(args.baseline, current, indent=2)
+        print(f"[SAVED] Baseline {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"[INFO] No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"[COMPARE] vs baseline {baseline['environment'].get('commit')} ({baseline['environment'].get('timestamp')})")
+    regressions = compare(current, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"[ERROR] {len(regressions)} stage(s) slower than {args.threshold:.2f}x baseline")
+        sys.exit(1)
+    print("[OK] No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+대용량 트레이더 합성 데이터 생성 (부하 테스트용)
+
+generate_traders_50.py와 같은 분포(경력별 승률, 스타일별 보유 기간, 0.1% 수수료)를
+NumPy로 트레이더 청크 단위 일괄 생성해 CSV 또는 Parquet에 바로 이어 쓴다.
+시드, 기준일, 청크 크기가 같으면 같은 파일이 나온다.
+
+사용법:
+    python generate_traders.py --traders 10000 --rows 100000000 --tag 10k
+    python generate_traders.py --traders 500 --trades 15 30 --format parquet
+"""
+import argparse
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from generate_traders_50 import FIRST_NAMES, LAST_NAMES, SYMBOLS, TRADING_STYLES, RISK_LEVELS, SECTORS
+
+EDUCATIONS = ['서울대', 'KAIST', '연세대', '고려대', '경북대', '부산대']
+CERTIFICATIONS = ['CFA Level 1', 'CFA Level 2', 'CFA Level 3', 'None']
+QUANTITIES = np.array([10, 25, 50, 100, 200])
+TRANSACTION_COLUMNS = ['trader_id', 'date', 'time', 'symbol', 'side', 'quantity', 'price', 'commission', 'total_amount']
+HOLD_DAYS = {'단기매매': (1, 5), '중기투자': (5, 30)}  # 그 외 스타일은 (10, 60)
+MAX_HOLD_DAYS = 60
+# 09:00:00 ~ 15:59:00 분 단위 시각 조회표
+TIMES = np.array([f"{h:02d}:{m:02d}:00" for h in range(9, 16) for m in range(60)], dtype=object)
+
+
+def trader_ids(n):
+    """T001 형식 ID (트레이더 수에 맞춰 자릿수 확장)"""
+    width = max(3, len(str(n)))
+    return np.array([f"T{i + 1:0{width}d}" for i in range(n)], dtype=object)
+
+
+def generate_trader_profiles(n, rng, end_date):
+    """트레이더 프로필 일괄 생성 (generate_traders_50과 같은 컬럼/분포)"""
+    years_exp = rng.integers(1, 11, n)
+    # 경력에 따라 고를 수 있는 스타일: <=2년 단기/스윙, <=5년 +중기, 그 외 전체
+    junior = np.array(['단기매매', '스윙트레이딩'], dtype=object)
+    middle = np.array(['단기매매', '중기투자', '스윙트레이딩'], dtype=object)
+    styles = np.array(TRADING_STYLES, dtype=object)
+    style = np.where(
+        years_exp <= 2, junior[rng.integers(0, 2, n)],
+        np.where(years_exp <= 5, middle[rng.integers(0, 3, n)], styles[rng.integers(0, 4, n)])
+    )
+    join_days = (np.datetime64(end_date) - years_exp * 365).astype('datetime64[D]')
+
+    return pd.DataFrame({
+        'trader_id': trader_ids(n),
+        'name': np.char.add(rng.choice(LAST_NAMES, n), rng.choice(FIRST_NAMES, n)),
+        'join_date': np.datetime_as_string(join_days, unit='D'),
+        'trading_style': style,
+        'risk_tolerance': rng.choice(RISK_LEVELS, n, p=[0.3, 0.5, 0.2]),
+        'preferred_sectors': rng.choice(SECTORS, n),
+        'years_experience': years_exp,
+        'education': rng.choice(EDUCATIONS, n),
+        'certifications': rng.choice(CERTIFICATIONS, n),
+        'account_size': rng.integers(100000, 500001, n),
+        'performance_goal': np.char.add(rng.integers(10, 31, n).astype(str), '% annual return')
+    })
+
+
+def _win_rates(years_exp, style, rng):
+    """경력/스타일별 기본 승률"""
+    low = np.select([years_exp >= 7, years_exp >= 4], [0.60, 0.50], 0.40)
+    rate = low + rng.random(len(years_exp)) * 0.15
+    return rate + np.select([style == '장기투자', style == '단기매매'], [0.05, -0.05], 0.0)
+
+
+def generate_transactions(profiles, trades_range, rng, start_date, days):
+    """프로필 청크의 매수/매도 쌍을 한 번에 생성해 (trader_id, date, time) 순으로 정렬"""
+    n = len(profiles)
+    years_exp = profiles['years_experience'].to_numpy()
+    style = profiles['trading_style'].to_numpy(dtype=object)
+    win_rate = _win_rates(years_exp, style, rng)
+
+    n_trades = rng.integers(trades_range[0], trades_range[1] + 1, n)
+    owner = np.repeat(np.arange(n), n_trades)
+    m = len(owner)
+
+    buy_day = rng.integers(0, days + 1, m)
+    symbol = rng.integers(0, len(SYMBOLS), m)
+    quantity = QUANTITIES[rng.integers(0, len(QUANTITIES), m)]
+    buy_price = np.round(rng.uniform(50, 500, m), 2)
+    commission = np.round(quantity * buy_price * 0.001, 2)
+
+    hold_low = np.full(n, 10)
+    hold_high = np.full(n, MAX_HOLD_DAYS)
+    for name, (low, high) in HOLD_DAYS.items():
+        hold_low[style == name], hold_high[style == name] = low, high
+    hold = rng.integers(hold_low[owner], hold_high[owner] + 1)
+
+    is_win = rng.random(m) < win_rate[owner]
+    pnl_pct = np.where(is_win, rng.uniform(0.5, 15, m), rng.uniform(-10, -0.5, m))
+    sell_price = np.round(buy_price * (1 + pnl_pct / 100), 2)
+
+    # 매수 행 + 매도 행을 이어 붙인 뒤 (트레이더, 날짜, 시각)으로 정렬
+    trader = np.concatenate((owner, owner))
+    day = np.concatenate((buy_day, buy_day + hold))
+    minute = rng.integers(0, len(TIMES), 2 * m)
+    order = np.lexsort((minute, day, trader))
+
+    day_labels = np.datetime_as_string(
+        np.datetime64(start_date) + np.arange(days + MAX_HOLD_DAYS + 1), unit='D'
+    ).astype(object)
+    qty = np.concatenate((quantity, quantity))[order]
+    return pd.DataFrame({
+        'trader_id': profiles['trader_id'].to_numpy(dtype=object)[trader[order]],
+        'date': day_labels[day[order]],
+        'time': TIMES[minute[order]],
+        'symbol': np.array(SYMBOLS, dtype=object)[np.concatenate((symbol, symbol))[order]],
+        'side': np.where(order < m, 'Buy', 'Sell').astype(object),
+        'quantity': qty,
+        'price': np.concatenate((buy_price, sell_price))[order],
+        'commission': np.concatenate((commission, commission))[order],
+        'total_amount': np.round(np.concatenate((
+            quantity * buy_price + commission, quantity * sell_price - commission
+        )), 2)[order]
+    }, columns=TRANSACTION_COLUMNS)
+
+
+# 소수 둘째 자리 이하 문자열 (repr과 같은 최단 표기: 0.5 → '5', 0.05 → '05')
+_CENTS = np.array([str(k // 10) if k % 10 == 0 else f"{k:02d}" for k in range(100)], dtype=object)
+
+
+def _format_cents(values):
+    """소수 둘째 자리로 반올림된 양수 배열을 to_csv와 같은 문자열로 (정수부 조회표 사용)"""
+    cents = np.rint(values * 100).astype(np.int64)
+    if len(cents) == 0 or cents.min() < 0:
+        return values.astype(str).astype(object)
+    whole = cents // 100
+    table = np.char.add(np.arange(whole.max() + 1).astype(str), '.').astype(object)
+    return table[whole] + _CENTS[cents % 100]
+
+
+def _csv_lines(frame):
+    """거래 청크를 CSV 본문 문자열로 (DataFrame.to_csv보다 수 배 빠른 조회표 포맷)"""
+    columns = []
+    for name in frame.columns:
+        values = frame[name].to_numpy()
+        if values.dtype == object:
+            columns.append(values)
+        elif values.dtype.kind == 'f':
+            columns.append(_format_cents(values))
+        else:
+            columns.append(values.astype(str).astype(object))
+    return ''.join(line + '\n' for line in map(','.join, zip(*columns)))
+
+
+class _CsvSink:
+    """청크를 하나의 CSV(utf-8-sig)에 이어 쓰기"""
+
+    def __init__(self, path):
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._header = True
+
+    def write(self, frame):
+        if self._header:
+            self._file.write(','.join(frame.columns) + '\n')
+            self._header = False
+        self._file.write(_csv_lines(frame))
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    """청크마다 row group 하나씩 Parquet에 이어 쓰기 (pyarrow 필요)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("[ERROR] Parquet output requires pyarrow: pip install pyarrow")
+        self._pa, self._pq = pa, pq
+        self._path = path
+        self._writer = None
+
+    def write(self, frame):
+        table = self._pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def write_dataset(n_traders, trades_range, seed=42, end_date=None, days=180,
+                  output_dir='data', tag=None, fmt='csv', chunk_rows=2_000_000):
+    """프로필 CSV와 거래 파일을 생성하고 (프로필 경로, 거래 경로, 거래 행 수) 반환
+
+    거래는 트레이더 청크마다 (seed, 청크 번호)로 만든 난수 생성기로 만들어 바로 파일에
+    쓰므로 메모리 사용량은 청크 크기에만 비례한다.
+    """
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days)
+    tag = tag or str(n_traders)
+    os.makedirs(output_dir, exist_ok=True)
+
+    profiles = generate_trader_profiles(n_traders, np.random.default_rng(seed), end_date)
+    profiles_file = os.path.join(output_dir, f'trader_profiles_{tag}.csv')
+    profiles.to_csv(profiles_file, index=False, encoding='utf-8-sig')
+
+    extension = 'parquet' if fmt == 'parquet' else 'csv'
+    transactions_file = os.path.join(output_dir, f'trading_transactions_{tag}.{extension}')
+    sink = _ParquetSink(transactions_file) if fmt == 'parquet' else _CsvSink(transactions_file)
+
+    rows_per_trader = trades_range[0] + trades_range[1]  # 평균 라운드트립 수 x 2
+    chunk_traders = max(1, chunk_rows // max(rows_per_trader, 1))
+    total = 0
+    try:
+        for chunk, lo in enumerate(range(0, n_traders, chunk_traders)):
+            rng = np.random.default_rng([seed, chunk])
+            frame = generate_transactions(
+                profiles.iloc[lo:lo + chunk_traders], trades_range, rng, start_date, days
+            )
+            sink.write(frame)
+            total += len(frame)
+    finally:
+        sink.close()
+    return profiles_file, transactions_file, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--traders', type=int, default=50, help='트레이더 수')
+    parser.add_argument('--trades', type=int, nargs=2, default=[15, 30], metavar=('MIN', 'MAX'),
+                        help='트레이더당 라운드트립 수 범위 (행 수는 2배)')
+    parser.add_argument('--rows', type=int, help='목표 총 거래 행 수 (지정 시 --trades 대신 평균에 맞춤)')
+    parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+    parser.add_argument('--end-date', type=date.fromisoformat, help='기준일 YYYY-MM-DD (기본: 오늘)')
+    parser.add_argument('--days', type=int, default=180, help='매수일 범위 (기준일 이전 일수)')
+    parser.add_argument('--output-dir', default='data', help='출력 디렉터리')
+    parser.add_argument('--tag', help='파일명 접미사 (기본: 트레이더 수)')
+    parser.add_argument('--format', choices=['csv', 'parquet'], default='csv', help='거래 파일 형식')
+    parser.add_argument('--chunk-rows', type=int, default=2_000_000, help='청크당 대략적인 거래 행 수')
+    args = parser.parse_args()
+
+    trades_range = tuple(args.trades)
+    if args.rows:
+        mean = max(1, round(args.rows / (2 * args.traders)))
+        trades_range = (max(1, mean // 2), mean + mean // 2) if mean > 1 else (1, 1)
+    if not 1 <= trades_range[0] <= trades_range[1]:
+        parser.error('--trades requires 1 <= MIN <= MAX')
+
+    start = time.perf_counter()
+    profiles_file, transactions_file, rows = write_dataset(
+        args.traders, trades_range, seed=args.seed, end_date=args.end_date, days=args.days,
+        output_dir=args.output_dir, tag=args.tag, fmt=args.format, chunk_rows=args.chunk_rows
+    )
+    elapsed = time.perf_counter() - start
+    print(f"[SAVED] {profiles_file} ({args.traders:,} traders)")
+    print(f"[SAVED] {transactions_file} ({rows:,} rows)")
+    print(f"[OK] {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -166,32 +166,33 @@ def generate_transactions(profiles_df, n_trades_per_trader=20):
     return pd.DataFrame(transactions).sort_values(['trader_id', 'date', 'time'])
 
 # 실행
-print("=" * 60)
-print("50명 트레이더 데이터 생성 중...")
-print("=" * 60)
-
-# 프로필 생성
-profiles = generate_trader_profiles(50)
-print(f"\n[1/3] 프로필 생성 완료: {len(profiles)}명")
-
-# 거래 내역 생성
-transactions = generate_transactions(profiles)
-print(f"[2/3] 거래 내역 생성 완료: {len(transactions)}건")
-
-# 저장
-profiles.to_csv('data/trader_profiles_50.csv', index=False, encoding='utf-8-sig')
-transactions.to_csv('data/trading_transactions_50.csv', index=False, encoding='utf-8-sig')
-
-print("[3/3] 파일 저장 완료")
-print(f"\n출력 파일:")
-print(f"  - data/trader_profiles_50.csv")
-print(f"  - data/trading_transactions_50.csv")
-
-# 통계
-print(f"\n통계:")
-print(f"  트레이더: {len(profiles)}명")
-print(f"  총 거래: {len(transactions)}건")
-print(f"  평균 거래/인: {len(transactions)//len(profiles)//2}회")
-print(f"  기간: {transactions['date'].min()} ~ {transactions['date'].max()}")
-
-print("\n[OK] 데이터 생성 완료!")
+if __name__ == "__main__":
+    print("=" * 60)
+    print("50명 트레이더 데이터 생성 중...")
+    print("=" * 60)
+
+    # 프로필 생성
+    profiles = generate_trader_profiles(50)
+    print(f"\n[1/3] 프로필 생성 완료: {len(profiles)}명")
+
+    # 거래 내역 생성
+    transactions = generate_transactions(profiles)
+    print(f"[2/3] 거래 내역 생성 완료: {len(transactions)}건")
+
+    # 저장
+    profiles.to_csv('data/trader_profiles_50.csv', index=False, encoding='utf-8-sig')
+    transactions.to_csv('data/trading_transactions_50.csv', index=False, encoding='utf-8-sig')
+
+    print("[3/3] 파일 저장 완료")
+    print(f"\n출력 파일:")
+    print(f"  - data/trader_profiles_50.csv")
+    print(f"  - data/trading_transactions_50.csv")
+
+    # 통계
+    print(f"\n통계:")
+    print(f"  트레이더: {len(profiles)}명")
+    print(f"  총 거래: {len(transactions)}건")
+    print(f"  평균 거래/인: {len(transactions)//len(profiles)//2}회")
+    print(f"  기간: {transactions['date'].min()} ~ {transactions['date'].max()}")
+
+    print("\n[OK] 데이터 생성 완료!")
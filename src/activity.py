@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from batch_metrics import DAY_NAMES
+
+HOURS = 24
+DAYS = 7
+CELLS = DAYS * HOURS
+# 자연어 시간대 → 시각 범위 (끝 포함)
+DAYPARTS = {
+    'morning': (9, 11),
+    'afternoon': (12, 15),
+    'evening': (16, 23)
+}
+
+
+def default_activity_path(output_file):
+    """리포트 파일 옆에 두는 활동 큐브 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.activity.npz"
+
+
+def activity_cube(transactions):
+    """(트레이더 x 요일 x 시각) 거래 건수 큐브를 bincount 한 번으로 계산
+
+    트레이더 축은 거래 파일 첫 등장 순서이며 요일은 월요일=0 (DAY_NAMES 순서)이다.
+    반환값은 (trader_ids, int32 배열[트레이더, 7, 24]).
+    """
+    if len(transactions) == 0:
+        return [], np.zeros((0, DAYS, HOURS), dtype=np.int32)
+    trader_codes, trader_uniques = pd.factorize(transactions['trader_id'], sort=False)
+    datetimes = transactions['datetime'].dt
+    cell = (
+        trader_codes.astype(np.int64) * CELLS
+        + datetimes.dayofweek.to_numpy(dtype=np.int64) * HOURS
+        + datetimes.hour.to_numpy(dtype=np.int64)
+    )
+    n_traders = len(trader_uniques)
+    counts = np.bincount(cell, minlength=n_traders * CELLS).astype(np.int32)
+    return np.asarray(trader_uniques, dtype=object).tolist(), counts.reshape(n_traders, DAYS, HOURS)
+
+
+def save_activity_cube(path, trader_ids, cube):
+    """활동 큐브를 압축 .npz로 저장 (임시 파일 후 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, trader_ids=np.asarray(trader_ids, dtype=str), cube=cube.astype(np.int32))
+    os.replace(tmp_path, path)
+
+
+def _day_index(day):
+    """'Thursday' / 'thu' / 3 → 요일 인덱스"""
+    if isinstance(day, (int, np.integer)):
+        return int(day)
+    key = str(day).strip().lower()[:3]
+    for i, name in enumerate(DAY_NAMES.tolist()):
+        if name.lower().startswith(key):
+            return i
+    raise ValueError(f"Unknown weekday: {day}")
+
+
+def _hour_mask(hours):
+    """None / (시작, 끝) / 'morning' / 시각 목록 → 24칸 bool 마스크"""
+    mask = np.zeros(HOURS, dtype=bool)
+    if hours is None:
+        mask[:] = True
+    elif isinstance(hours, str):
+        start, end = DAYPARTS[hours.lower()]
+        mask[start:end + 1] = True
+    elif isinstance(hours, tuple) and len(hours) == 2:
+        mask[hours[0]:hours[1] + 1] = True
+    else:
+        mask[list(hours)] = True
+    return mask
+
+
+class ActivityCube:
+    """save_activity_cube로 저장한 큐브 조회 (요일/시간대 슬라이스 합산)"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.trader_ids = data['trader_ids'].tolist()
+            self.cube = data['cube']
+        self._index = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+
+    def __contains__(self, trader_id):
+        return trader_id in self._index
+
+    def get(self, trader_id):
+        """트레이더 한 명의 7 x 24 건수 배열 (없으면 None)"""
+        i = self._index.get(trader_id)
+        return None if i is None else self.cube[i]
+
+    def window_counts(self, days=None, hours=None):
+        """트레이더별 (지정 요일 x 시간대) 거래 건수와 전체 대비 비중(%)"""
+        day_mask = np.zeros(DAYS, dtype=bool)
+        if days is None:
+            day_mask[:] = True
+        else:
+            day_mask[[_day_index(d) for d in ([days] if isinstance(days, (str, int)) else days)]] = True
+        window = day_mask[:, None] & _hour_mask(hours)[None, :]
+        flat = self.cube.reshape(len(self.cube), CELLS)
+        counts = flat @ window.reshape(CELLS).astype(np.int64)
+        totals = flat.sum(axis=1, dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(totals > 0, counts / totals * 100, 0.0)
+        return counts, share
+
+    def search(self, days=None, hours=None, min_share=0.0, min_trades=1, sort_by='trades'):
+        """지정 구간에서 거래한 트레이더 [(trader_id, 건수, 비중%)]
+
+        sort_by='trades'면 건수, 'share'면 전체 거래 대비 비중 내림차순 (동률은 큐브 순서).
+        """
+        counts, share = self.window_counts(days, hours)
+        hits = np.flatnonzero((counts >= min_trades) & (share >= min_share))
+        key = share if sort_by == 'share' else counts
+        hits = hits[np.lexsort((hits, -key[hits]))]
+        return [(self.trader_ids[i], int(counts[i]), round(float(share[i]), 2)) for i in hits.tolist()]
+
+    def heatmap(self, trader_ids=None):
+        """7 x 24 합계 DataFrame (trader_ids가 없으면 전체 트레이더)"""
+        if trader_ids is None:
+            grid = self.cube.sum(axis=0)
+        else:
+            rows = [self._index[t] for t in trader_ids if t in self._index]
+            grid = self.cube[rows].sum(axis=0)
+        return pd.DataFrame(grid, index=DAY_NAMES.tolist(), columns=list(range(HOURS)))
@@ -1,54 +1,133 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
 import json
+import os
+from matching import match_round_trips, trader_slices, unmatched_rows
+from batch_metrics import assemble_results, compute_all_metrics, compute_all_patterns
+from parallel import analyze_in_parallel
+from streaming import StreamingAnalyzer
+from columnar import load_transactions
+from activity import activity_cube, default_activity_path, save_activity_cube
+from cohorts import build_cohorts, default_cohort_path, save_cohorts
+from timeseries import DEFAULT_WINDOWS, default_timeseries_path, equity_curves, save_equity_curves
+from exposure import default_exposure_path, exposure_timeline, save_exposure
+from window_metrics import build_window_index, default_window_index_path, save_window_index
+from market import benchmark_stats, load_benchmarks
+from bootstrap import DEFAULT_RESAMPLES, bootstrap_intervals
+from validation import default_validation_path, print_validation_summary, save_validation, validate_transactions
+from report_io import ReportWriter, report_path
+from trader_store import is_store
+from profiling import NULL_PROFILER, StageProfiler, default_profile_path
+from lots import LOT_METHODS, inventory_by_trader, last_prices, mark_positions, match_lots, position_records
+from incremental import (
+    default_checkpoint_path, file_digest, file_signature, load_checkpoint, open_lots_by_trader, output_formats,
+    save_checkpoint, sources_unchanged, trader_hashes
+)
 
 class TradingPerformanceAnalyzer:
     """거래 성과 분석 클래스"""
     
-    def __init__(self, transactions_file, profiles_file):
-        self.transactions = pd.read_csv(transactions_file)
-        self.profiles = pd.read_csv(profiles_file)
-        self.transactions['datetime'] = pd.to_datetime(
-            self.transactions['date'] + ' ' + self.transactions['time']
+    def __init__(self, transactions_file, profiles_file, use_cache=True, lot_method=None,
+                 benchmarks_file=None, profiler=None, msgpack=False, compact_json=False, store=False,
+                 bootstrap=None, validate=False):
+        if lot_method is not None and lot_method not in LOT_METHODS:
+            raise ValueError(f"Unknown lot method: {lot_method} (choose from {', '.join(LOT_METHODS)})")
+        self.transactions_file = transactions_file
+        self.profiles_file = profiles_file
+        # None이면 기존 순번 매칭, 'fifo' / 'lifo' / 'average'면 수량 기준 로트 매칭
+        self.lot_method = lot_method
+        # 단계별 시간/메모리 계측 (기본은 측정하지 않는 프로파일러)
+        self.profiler = profiler or NULL_PROFILER
+        # 타입 지정 컬럼 캐시 (원본 CSV가 바뀌면 자동 재생성)
+        self.transactions = load_transactions(
+            transactions_file, use_cache=use_cache, profiler=self.profiler, errors='coerce' if validate else 'raise'
         )
+        self.profiles = pd.read_csv(profiles_file)
+        # 타입/일관성 검증 (validate=True면 문제 행을 격리하고 나머지만 분석)
+        self.validation = None
+        self.quarantine = None
+        if validate:
+            with self.profiler.stage('validate', rows=len(self.transactions)):
+                self.transactions, self.quarantine, self.validation = validate_transactions(
+                    self.transactions, self.profiles, transactions_file
+                )
+            print_validation_summary(self.validation)
+        # 지수 대비 베타/알파 계산용 벤치마크 (예: data/market_benchmarks.csv)
+        self.benchmarks_file = benchmarks_file
+        self.benchmarks = load_benchmarks(benchmarks_file) if benchmarks_file else None
+        # 리포트 형식: JSON은 항상 쓰고 msgpack=True면 <output>.msgpack, store=True면
+        # 트레이더별 레코드 + 인덱스 저장소 <output>.store/도 함께 기록
+        self.report_formats = ('json',) + (('msgpack',) if msgpack else ()) + (('store',) if store else ())
+        self.compact_json = compact_json
+        # 승률/샤프/손익비 부트스트랩 재표본 수 (None이면 신뢰구간을 계산하지 않음)
+        self.bootstrap = bootstrap
+        self._round_trips = None
+        self._round_trip_slices = None
+        self._positions = None
+        self._open_lots = None
+    
+    def _ensure_round_trips(self):
+        """전체 트레이더 매수/매도 매칭 (최초 1회)"""
+        if self._round_trips is None:
+            self._round_trips, self._positions, self._open_lots = self._match(self.transactions, open_lots=True)
+            self._round_trip_slices = trader_slices(self._round_trips)
+    
+    def _match(self, transactions, open_lots=False):
+        """매칭 방식에 따른 (라운드트립, 잔여 포지션) - 기존 순번 매칭이면 포지션은 None
+
+        open_lots=True면 로트 매칭의 미청산 로트 테이블을 세 번째로 함께 반환한다 (순번 매칭이면 None).
+        """
+        with self.profiler.stage('matching', rows=len(transactions)):
+            if self.lot_method:
+                return match_lots(transactions, self.lot_method, open_lots)
+            result = match_round_trips(transactions), None
+            return result + (None,) if open_lots else result
+    
+    @property
+    def round_trips(self):
+        """전체 트레이더 라운드트립 테이블"""
+        self._ensure_round_trips()
+        return self._round_trips
+    
+    @property
+    def round_trip_slices(self):
+        """트레이더별 라운드트립 구간"""
+        self._ensure_round_trips()
+        return self._round_trip_slices
+    
+    @property
+    def positions(self):
+        """로트 매칭 후 남은 종목별 포지션 (기존 순번 매칭이면 None)"""
+        self._ensure_round_trips()
+        return self._positions
+    
+    @property
+    def open_lots(self):
+        """아직 청산되지 않은 매수 로트 (trader_id, datetime, total_amount 컬럼)
+
+        로트 매칭이면 매칭 후 남은 로트(매수 시각, 남은 수량분 원가), 순번 매칭이면 짝이 없는 매수 행이다.
+        """
+        self._ensure_round_trips()
+        if self.lot_method:
+            return self._open_lots
+        lots = self.transactions.iloc[unmatched_rows(self.transactions)]
+        return lots[lots['side'] == 'Buy']
+    
+    def inventory(self, positions=None):
+        """trader_id → 종목별 마지막 체결 가격으로 평가한 미실현 인벤토리"""
+        if not self.lot_method:
+            return None
+        positions = self.positions if positions is None else positions
+        return inventory_by_trader(positions, last_prices(self.transactions))
         
     def calculate_trader_metrics(self, trader_id):
         """트레이더별 핵심 지표 계산"""
-        trader_trades = self.transactions[self.transactions['trader_id'] == trader_id]
-        
-        # 매수/매도 매칭
-        trades = []
-        symbols = trader_trades['symbol'].unique()
-        
-        for symbol in symbols:
-            symbol_trades = trader_trades[trader_trades['symbol'] == symbol].sort_values('datetime')
-            buys = symbol_trades[symbol_trades['side'] == 'Buy']
-            sells = symbol_trades[symbol_trades['side'] == 'Sell']
-            
-            for i in range(min(len(buys), len(sells))):
-                buy = buys.iloc[i]
-                sell = sells.iloc[i]
-                
-                pnl = sell['total_amount'] - buy['total_amount']
-                hold_days = (sell['datetime'] - buy['datetime']).days
-                
-                trades.append({
-                    'symbol': symbol,
-                    'buy_date': buy['datetime'],
-                    'sell_date': sell['datetime'],
-                    'buy_price': buy['price'],
-                    'sell_price': sell['price'],
-                    'quantity': buy['quantity'],
-                    'pnl': pnl,
-                    'pnl_pct': (pnl / buy['total_amount']) * 100,
-                    'hold_days': hold_days
-                })
-        
-        if not trades:
+        # 매수/매도 매칭 (전체 트레이더 일괄 매칭 결과에서 구간 조회)
+        trader_slice = self.round_trip_slices.get(trader_id)
+        if trader_slice is None:
             return None
-            
-        trades_df = pd.DataFrame(trades)
+        
+        trades_df = self.round_trips.iloc[trader_slice]
         
         # 핵심 지표 계산
         total_trades = len(trades_df)
@@ -71,10 +150,6 @@ class TradingPerformanceAnalyzer:
         max_drawdown = drawdown.min()
         max_drawdown_pct = (max_drawdown / running_max.max() * 100) if running_max.max() != 0 else 0
         
-        # 패턴 분석
-        trades_df['hour'] = pd.to_datetime(trader_trades.iloc[:len(trades_df)]['time'].values).hour
-        trades_df['weekday'] = trades_df['buy_date'].dt.day_name()
-        
         return {
             'trader_id': trader_id,
             'total_trades': total_trades,
@@ -95,9 +170,18 @@ class TradingPerformanceAnalyzer:
     
     def analyze_patterns(self, trader_id):
         """거래 패턴 분석"""
-        trader_trades = self.transactions[self.transactions['trader_id'] == trader_id]
-        
-        hourly = trader_trades['time'].apply(lambda x: int(x.split(':')[0])).value_counts().to_dict()
+        return self._trader_patterns(trader_id, self._trader_transactions(trader_id))
+    
+    def _trader_transactions(self, trader_id):
+        """트레이더 한 명의 거래 행 ('filter' 단계로 계측)"""
+        with self.profiler.stage('filter', trader_id=trader_id) as stage:
+            trader_trades = self.transactions[self.transactions['trader_id'] == trader_id]
+            stage['rows'] = len(trader_trades)
+        return trader_trades
+    
+    def _trader_patterns(self, trader_id, trader_trades):
+        """필터링된 거래 행 → 패턴 딕셔너리"""
+        hourly = trader_trades['datetime'].dt.hour.value_counts().to_dict()
         weekly = trader_trades['datetime'].dt.day_name().value_counts().to_dict()
         
         return {
@@ -109,36 +193,365 @@ class TradingPerformanceAnalyzer:
             'most_active_day': max(weekly, key=weekly.get)
         }
     
-    def generate_full_report(self, output_file='data/analysis_results.json'):
-        """전체 트레이더 분석 리포트 생성"""
+    def calculate_all_metrics(self):
+        """전체 트레이더 핵심 지표 일괄 계산"""
+        round_trips = self.round_trips
+        with self.profiler.stage('metrics', rows=len(round_trips)):
+            return compute_all_metrics(round_trips)
+    
+    def analyze_all_patterns(self):
+        """전체 트레이더 거래 패턴 일괄 분석"""
+        with self.profiler.stage('patterns', rows=len(self.transactions)):
+            return compute_all_patterns(self.transactions)
+    
+    def account_sizes(self):
+        """trader_id → 프로필 account_size (수익률 환산 기준)"""
+        if 'account_size' not in self.profiles.columns:
+            return {}
+        profiles = self.profiles.drop_duplicates('trader_id', keep='first')
+        return dict(zip(profiles['trader_id'].tolist(), profiles['account_size'].tolist()))
+    
+    def benchmark_stats(self, round_trips=None):
+        """trader_id → 지수 대비 베타/알파/상관/추적오차/정보비율 (벤치마크가 없으면 None)"""
+        if self.benchmarks is None:
+            return None
+        round_trips = self.round_trips if round_trips is None else round_trips
+        with self.profiler.stage('benchmarks', rows=len(round_trips)):
+            return benchmark_stats(round_trips, self.account_sizes(), self.benchmarks)
+    
+    def confidence_intervals(self, round_trips=None):
+        """trader_id → 승률/샤프/손익비 부트스트랩 신뢰구간과 low_sample (bootstrap이 없으면 None)"""
+        if not self.bootstrap:
+            return None
+        round_trips = self.round_trips if round_trips is None else round_trips
+        with self.profiler.stage('bootstrap', rows=len(round_trips)):
+            return bootstrap_intervals(round_trips, self.bootstrap)
+    
+    def _assemble_results(self, performances, patterns, positions=None, benchmarks=None, confidence=None):
+        """일괄 계산 결과를 트레이더 등장 순서의 리포트로 조립"""
+        inventory = self.inventory(positions)
+        with self.profiler.stage('assemble', rows=len(performances)):
+            return assemble_results(self.profiles, performances, patterns, inventory, benchmarks, confidence)
+    
+    def _source_files(self):
+        """체크포인트 변경 감지 대상 입력 파일"""
+        return [f for f in (self.transactions_file, self.profiles_file, self.benchmarks_file) if f]
+    
+    def _report_writer(self, output_file):
+        """설정된 형식으로 트레이더 레코드를 이어 쓰는 리포트 작성기"""
+        return ReportWriter(output_file, self.report_formats, self.compact_json)
+    
+    def _write_results(self, results, output_file):
+        """리포트 저장 (완성된 결과 딕셔너리)"""
+        with self._report_writer(output_file) as writer:
+            with self.profiler.stage('json_write', rows=len(results)):
+                writer.write_all(results)
+        for path in writer.paths:
+            print(f"[SAVED] {path}")
+    
+    def generate_full_report(self, output_file='data/analysis_results.json', batch=True, workers=1):
+        """전체 트레이더 분석 리포트 생성
+
+        batch=False면 트레이더별 개별 계산, workers>1이면 트레이더 샤드를 프로세스 풀에서 분석
+        """
+        if workers > 1:
+            with self.profiler.stage('parallel_analysis', rows=len(self.transactions)):
+                parts = analyze_in_parallel(
+                    self.transactions, workers, self.lot_method, self.benchmarks, self.account_sizes(),
+                    self.bootstrap
+                )
+            results = self._assemble_results(*parts)
+        elif batch:
+            results = self._assemble_results(
+                self.calculate_all_metrics(), self.analyze_all_patterns(), benchmarks=self.benchmark_stats(),
+                confidence=self.confidence_intervals()
+            )
+        else:
+            results = self._stream_trader_reports(output_file)
+            self.write_activity_cube(output_file)
+            self.write_cohorts(results, output_file)
+            return results
+        
+        print(f"[OK] Analysis complete: {len(results)} traders")
+        self._write_results(results, output_file)
+        self.write_activity_cube(output_file)
+        self.write_cohorts(results, output_file)
+        return results
+    
+    def _stream_trader_reports(self, output_file):
+        """트레이더별 개별 계산 경로: 레코드가 완성되는 대로 리포트 파일에 기록"""
         results = {}
+        self._ensure_round_trips()  # 전체 매칭이 첫 트레이더의 'metrics' 단계 안에 겹쳐 잡히지 않도록 먼저
+        inventory = self.inventory()
+        benchmarks = self.benchmark_stats()
+        confidence = self.confidence_intervals()
+        with self._report_writer(output_file) as writer:
+            for trader_id in self.transactions['trader_id'].unique():
+                with self.profiler.stage('filter', trader_id=trader_id):
+                    profile = self.profiles[self.profiles['trader_id'] == trader_id].iloc[0].to_dict()
+                with self.profiler.stage('metrics', trader_id=trader_id) as stage:
+                    performance = self.calculate_trader_metrics(trader_id)
+                    stage['rows'] = performance['total_trades'] if performance else 0
+                # 'filter'를 'patterns' 안에 겹쳐 재면 같은 시간이 두 단계에 잡히므로 따로 잰다
+                trader_trades = self._trader_transactions(trader_id)
+                with self.profiler.stage('patterns', rows=len(trader_trades), trader_id=trader_id):
+                    pattern = self._trader_patterns(trader_id, trader_trades)
+                
+                if performance:
+                    record = {
+                        'profile': profile,
+                        'performance': performance,
+                        'pattern': pattern
+                    }
+                    if inventory is not None:
+                        record['inventory'] = inventory.get(trader_id, [])
+                    if benchmarks is not None:
+                        record['benchmark'] = benchmarks.get(trader_id)
+                    if confidence is not None:
+                        record['confidence'] = confidence.get(trader_id)
+                    with self.profiler.stage('json_write', trader_id=trader_id):
+                        writer.write(trader_id, record)
+                    results[trader_id] = record
+        print(f"[OK] Analysis complete: {len(results)} traders")
+        for path in writer.paths:
+            print(f"[SAVED] {path}")
+        return results
+    
+    def write_activity_cube(self, output_file='data/analysis_results.json'):
+        """(트레이더 x 요일 x 시각) 거래 건수 큐브를 리포트 옆에 저장"""
+        path = default_activity_path(output_file)
+        with self.profiler.stage('activity', rows=len(self.transactions)):
+            save_activity_cube(path, *activity_cube(self.transactions))
+        print(f"[SAVED] {path}")
+        return path
+    
+    def write_cohorts(self, results, output_file='data/analysis_results.json'):
+        """스타일/리스크/경력 코호트별 지표 분포와 코호트 내 백분위를 리포트 옆에 저장"""
+        path = default_cohort_path(output_file)
+        with self.profiler.stage('cohorts', rows=len(results)):
+            save_cohorts(path, build_cohorts(results))
+        print(f"[SAVED] {path}")
+        return path
+    
+    def write_equity_curves(self, output_file='data/analysis_results.json', windows=DEFAULT_WINDOWS):
+        """일별 자산 곡선과 롤링 샤프/MDD/승률을 리포트 옆 컬럼 파일로 저장"""
+        path = default_timeseries_path(output_file)
+        round_trips = self.round_trips
+        with self.profiler.stage('timeseries', rows=len(round_trips)):
+            save_equity_curves(path, equity_curves(round_trips, windows), windows)
+        print(f"[SAVED] {path}")
+        return path
+    
+    def write_window_index(self, output_file='data/analysis_results.json'):
+        """임의 기간 지표 조회용 트레이더별 청산 시각 정렬 누적합을 리포트 옆에 저장"""
+        path = default_window_index_path(output_file)
+        round_trips = self.round_trips
+        with self.profiler.stage('window_index', rows=len(round_trips)):
+            save_window_index(path, build_window_index(round_trips))
+        print(f"[SAVED] {path}")
+        return path
+    
+    def write_exposure(self, output_file='data/analysis_results.json'):
+        """보유 금액/동시 포지션 수 타임라인과 자본 활용률을 리포트 옆에 저장
+
+        미청산 로트(순번 매칭은 짝이 없는 매수, 로트 매칭은 남은 로트)는 데이터 마지막 시각까지
+        열린 포지션으로 본다.
+        """
+        path = default_exposure_path(output_file)
+        round_trips = self.round_trips
+        open_lots = self.open_lots
+        end_time = self.transactions['datetime'].max() if len(self.transactions) else None
+        with self.profiler.stage('exposure', rows=len(round_trips)):
+            save_exposure(path, exposure_timeline(round_trips, open_lots, self.account_sizes(), end_time))
+        print(f"[SAVED] {path}")
+        return path
+    
+    def write_validation(self, output_file='data/analysis_results.json'):
+        """검증 요약과 격리 행(flags 비트마스크, issues)을 리포트 옆에 저장"""
+        if self.validation is None:
+            raise ValueError('Validation was not run (use validate=True)')
+        paths = save_validation(output_file, self.quarantine, self.validation)
+        for path in paths:
+            print(f"[SAVED] {path}")
+        return paths
+    
+    def update_report(self, output_file='data/analysis_results.json', checkpoint_file=None):
+        """증분 분석: 내용 해시가 바뀐 트레이더만 다시 계산해 기존 리포트를 갱신
+
+        체크포인트에는 트레이더별 해시, 미청산 로트(로트 매칭이면 잔여 포지션), 누적 집계가 저장된다.
+        체크포인트나 리포트가 없거나, 리포트가 외부에서 바뀌었거나, 매칭 방식이 바뀌었으면
+        전체를 다시 계산한다. 벤치마크 파일 내용은 모든 트레이더 해시에 섞여 바뀌면 전원 재계산된다.
+        """
+        checkpoint_file = checkpoint_file or default_checkpoint_path(output_file)
+        checkpoint = load_checkpoint(checkpoint_file)
+        previous, known = {}, {}
+        if (checkpoint and checkpoint['output'] == file_signature(output_file)
+                and checkpoint.get('lot_method') == self.lot_method
+                and checkpoint.get('bootstrap') == self.bootstrap):
+            with open(output_file, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            known = checkpoint['traders']
         
-        for trader_id in self.transactions['trader_id'].unique():
-            profile = self.profiles[self.profiles['trader_id'] == trader_id].iloc[0].to_dict()
-            performance = self.calculate_trader_metrics(trader_id)
-            pattern = self.analyze_patterns(trader_id)
-            
-            if performance:
-                results[trader_id] = {
-                    'profile': profile,
-                    'performance': performance,
-                    'pattern': pattern
-                }
+        salt = file_digest(self.benchmarks_file) if self.benchmarks_file else None
+        with self.profiler.stage('hashing', rows=len(self.transactions)):
+            hashes = trader_hashes(self.transactions, self.profiles, salt)
+        changed = [tid for tid, digest in hashes.items() if known.get(tid, {}).get('hash') != digest]
+        
+        subset = self.transactions[self.transactions['trader_id'].isin(changed)]
+        round_trips, positions = self._match(subset)
+        with self.profiler.stage('metrics', rows=len(round_trips)):
+            performances = compute_all_metrics(round_trips)
+        with self.profiler.stage('patterns', rows=len(subset)):
+            patterns = compute_all_patterns(subset)
+        fresh = self._assemble_results(
+            performances, patterns, positions, self.benchmark_stats(round_trips),
+            self.confidence_intervals(round_trips)
+        )
+        if self.lot_method:
+            lots_key, open_lots = 'positions', position_records(positions)
+            prices = last_prices(self.transactions)
+        else:
+            lots_key, open_lots = 'open_lots', open_lots_by_trader(subset)
+        row_counts = subset['trader_id'].value_counts().to_dict()
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2, default=str)
+        changed = set(changed)
+        results, traders = {}, {}
+        for trader_id, digest in hashes.items():
+            if trader_id in changed:
+                record = fresh.get(trader_id)
+                performance = performances.get(trader_id, {})
+                traders[trader_id] = {
+                    'hash': digest,
+                    lots_key: open_lots.get(trader_id, []),
+                    'aggregates': {
+                        'rows': int(row_counts.get(trader_id, 0)),
+                        'total_trades': performance.get('total_trades', 0),
+                        'winning_trades': performance.get('winning_trades', 0),
+                        'losing_trades': performance.get('losing_trades', 0),
+                        'total_pnl': float(performance.get('total_pnl', 0))
+                    }
+                }
+            else:
+                record = previous.get(trader_id)
+                traders[trader_id] = known[trader_id]
+                if record and self.lot_method:
+                    # 다른 트레이더 거래로 마지막 체결 가격이 바뀔 수 있어 평가는 매번 다시 한다
+                    record['inventory'] = mark_positions(known[trader_id]['positions'], prices)
+            
+            if record:
+                results[trader_id] = record
         
-        print(f"[OK] Analysis complete: {len(results)} traders")
-        print(f"[SAVED] {output_file}")
+        print(f"[OK] Incremental update: {len(changed)}/{len(hashes)} traders recomputed")
+        self._write_results(results, output_file)
+        self.write_activity_cube(output_file)
+        self.write_cohorts(results, output_file)
+        save_checkpoint(
+            checkpoint_file, self._source_files(), output_file, traders, lot_method=self.lot_method,
+            bootstrap=self.bootstrap, formats=output_formats(
+                'msgpack' in self.report_formats, self.compact_json, 'store' in self.report_formats
+            )
+        )
         return results
 
 # 실행
 if __name__ == "__main__":
-    analyzer = TradingPerformanceAnalyzer(
-        'data/trading_transactions_enhanced.csv',
-        'data/trader_profiles_enhanced.csv'
-    )
-    results = analyzer.generate_full_report()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='트레이더 성과 분석 리포트 생성')
+    parser.add_argument('--transactions', default='data/trading_transactions_enhanced.csv')
+    parser.add_argument('--profiles', default='data/trader_profiles_enhanced.csv')
+    parser.add_argument('--output', default='data/analysis_results.json')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 분석 프로세스 수')
+    parser.add_argument('--incremental', action='store_true', help='변경된 트레이더만 다시 계산')
+    parser.add_argument('--no-cache', action='store_true', help='컬럼 캐시를 쓰지 않고 CSV를 직접 읽음')
+    parser.add_argument('--lot-method', choices=LOT_METHODS, help='수량 기준 로트 매칭 방식 (기본: 매수/매도 순번 매칭)')
+    parser.add_argument('--timeseries', action='store_true', help='일별 자산 곡선과 롤링 지표를 리포트 옆에 저장')
+    parser.add_argument('--windows', type=int, nargs='+', default=list(DEFAULT_WINDOWS), help='롤링 윈도우 (일)')
+    parser.add_argument('--exposure', action='store_true',
+                        help='보유 금액/동시 포지션 타임라인과 자본 활용률을 <output>.exposure.npz로 저장')
+    parser.add_argument('--window-index', action='store_true',
+                        help='기간별 승률/손익/샤프 조회용 누적합 인덱스를 <output>.prefix.npz로 저장')
+    parser.add_argument('--bootstrap', type=int, nargs='?', const=DEFAULT_RESAMPLES, metavar='N',
+                        help=f'승률/샤프/손익비 부트스트랩 95%% 신뢰구간과 표본 부족 표시 추가 (재표본 수, 기본 {DEFAULT_RESAMPLES})')
+    parser.add_argument('--validate', action='store_true',
+                        help='분석 전 타입/일관성 검증 후 문제 행을 <output>.quarantine.csv로 격리하고 요약을 <output>.validation.json에 저장')
+    parser.add_argument('--benchmarks', help='지수 대비 베타/알파 계산용 벤치마크 CSV (예: data/market_benchmarks.csv)')
+    parser.add_argument('--stream', action='store_true', help='거래 CSV를 청크 단위로 읽어 분석 (대용량 파일용)')
+    parser.add_argument('--chunksize', type=int, default=500_000, help='스트리밍 모드 청크 행 수')
+    parser.add_argument('--msgpack', action='store_true', help='리포트를 <output>.msgpack(MessagePack)으로도 저장 (msgpack 필요)')
+    parser.add_argument('--compact-json', action='store_true', help='들여쓰기 없이 JSON 저장 (파일 크기 축소)')
+    parser.add_argument('--store', action='store_true', help='트레이더별 레코드 샤드와 인덱스를 <output>.store/에 저장 (지식베이스 지연 로딩용)')
+    parser.add_argument('--profile', action='store_true', help='단계별 시간/메모리를 측정해 <output>.profile.json으로 저장')
+    parser.add_argument('--profile-traders', action='store_true',
+                        help='트레이더별 개별 계산 경로로 실행해 트레이더별 소요 시간도 기록 (--profile 포함)')
+    parser.add_argument('--cprofile', action='store_true', help='cProfile 통계를 <output>.prof로 저장 (--profile 포함)')
+    args = parser.parse_args()
+    if args.stream and args.lot_method:
+        parser.error('--lot-method is not supported with --stream')
+    if args.stream and (args.timeseries or args.window_index or args.exposure or args.benchmarks or args.bootstrap
+                        or args.validate):
+        parser.error('--timeseries/--window-index/--exposure/--benchmarks/--bootstrap/--validate are not supported with --stream')
+    if args.profile_traders and (args.stream or args.incremental or args.workers > 1):
+        parser.error('--profile-traders requires the default single-process report')
+    
+    sources = [f for f in (args.transactions, args.profiles, args.benchmarks) if f]
+    if args.incremental and sources_unchanged(
+        default_checkpoint_path(args.output), sources, args.output, lot_method=args.lot_method,
+        bootstrap=args.bootstrap, formats=output_formats(args.msgpack, args.compact_json, args.store)
+    ) and not (
+        args.msgpack and not os.path.exists(report_path(args.output, 'msgpack'))
+    ) and not (
+        args.store and not is_store(report_path(args.output, 'store'))
+    ) and os.path.exists(default_activity_path(args.output)) and os.path.exists(
+        default_cohort_path(args.output)
+    ) and not (
+        args.timeseries and not os.path.exists(default_timeseries_path(args.output))
+    ) and not (
+        args.window_index and not os.path.exists(default_window_index_path(args.output))
+    ) and not (
+        args.exposure and not os.path.exists(default_exposure_path(args.output))
+    ) and not (
+        args.validate and not os.path.exists(default_validation_path(args.output))
+    ):
+        print("[OK] No changes since last run")
+        raise SystemExit(0)
+    
+    profiling = args.profile or args.profile_traders or args.cprofile
+    profiler = StageProfiler(per_trader=args.profile_traders, cprofile=args.cprofile).start() if profiling else None
+    
+    if args.stream:
+        analyzer = StreamingAnalyzer(
+            args.transactions, args.profiles, chunksize=args.chunksize, msgpack=args.msgpack,
+            compact_json=args.compact_json, store=args.store
+        )
+        with (profiler or NULL_PROFILER).stage('stream_analysis'):
+            results = analyzer.generate_full_report(args.output)
+    else:
+        analyzer = TradingPerformanceAnalyzer(
+            args.transactions, args.profiles, use_cache=not args.no_cache, lot_method=args.lot_method,
+            benchmarks_file=args.benchmarks, profiler=profiler, msgpack=args.msgpack,
+            compact_json=args.compact_json, store=args.store, bootstrap=args.bootstrap, validate=args.validate
+        )
+        if args.incremental:
+            results = analyzer.update_report(args.output)
+        else:
+            results = analyzer.generate_full_report(
+                args.output, batch=not args.profile_traders, workers=args.workers
+            )
+        if args.timeseries:
+            analyzer.write_equity_curves(args.output, args.windows)
+        if args.window_index:
+            analyzer.write_window_index(args.output)
+        if args.exposure:
+            analyzer.write_exposure(args.output)
+        if args.validate:
+            analyzer.write_validation(args.output)
+    
+    if profiler:
+        profiler.stop()
+        profiler.print_summary()
+        profiler.export(default_profile_path(args.output))
+        profiler.dump_cprofile(default_profile_path(args.output, 'prof'))
     
     # 샘플 출력
     for trader_id, data in list(results.items())[:2]:
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+from segments import segment_bounds, segment_cumsum, segment_sum
+
+DAY_NAMES = np.array(
+    ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    dtype=object
+)
+
+
+def _ordered_counts(segment_ids, codes, n_codes):
+    """구간별 value_counts (빈도 내림차순, 동률은 먼저 등장한 값 우선)"""
+    key = segment_ids.astype(np.int64) * n_codes + codes
+    key_codes, uniques = pd.factorize(key, sort=False)
+    counts = np.bincount(key_codes)
+    order = np.lexsort((-counts, uniques // n_codes))
+    return uniques[order] // n_codes, uniques[order] % n_codes, counts[order]
+
+
+def _count_dicts(segment_ids, codes, labels, n_segments):
+    """구간별 {값: 빈도} 딕셔너리 목록"""
+    seg, code, count = _ordered_counts(segment_ids, codes, len(labels))
+    dicts = [{} for _ in range(n_segments)]
+    for s, label, n in zip(seg.tolist(), labels[code].tolist(), count.tolist()):
+        dicts[s][label] = n
+    return dicts
+
+
+def performance_record(trader_id, total_trades, winning_trades, losing_trades, mean_win, mean_loss,
+                       total_pnl, mean_return, std_return, max_drawdown, peak, mean_hold, top_symbols):
+    """집계값으로 calculate_trader_metrics와 같은 타입/반올림의 성과 딕셔너리 생성"""
+    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+
+    avg_win = mean_win if winning_trades > 0 else 0
+    avg_loss = abs(mean_loss) if losing_trades > 0 else 0
+    profit_factor = avg_win / avg_loss if avg_loss != 0 else 0
+
+    sharpe_ratio = (mean_return / std_return * np.sqrt(252)) if std_return != 0 else 0
+    max_drawdown_pct = (max_drawdown / peak * 100) if peak != 0 else 0
+
+    return {
+        'trader_id': trader_id,
+        'total_trades': total_trades,
+        'win_rate': round(win_rate, 2),
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'total_pnl': round(total_pnl, 2),
+        'avg_return_pct': round(mean_return, 2),
+        'avg_win': round(avg_win, 2),
+        'avg_loss': round(avg_loss, 2),
+        'profit_factor': round(profit_factor, 2),
+        'sharpe_ratio': round(sharpe_ratio, 2),
+        'max_drawdown': round(max_drawdown, 2),
+        'max_drawdown_pct': round(max_drawdown_pct, 2),
+        'avg_hold_days': round(mean_hold, 1),
+        'top_symbols': top_symbols
+    }
+
+
+def pattern_record(trader_id, hourly, weekly, avg_position):
+    """집계값으로 analyze_patterns와 같은 스키마의 패턴 딕셔너리 생성"""
+    return {
+        'trader_id': trader_id,
+        'hourly_distribution': hourly,
+        'weekly_distribution': weekly,
+        'avg_position_size': round(avg_position, 2),
+        'most_active_hour': max(hourly, key=hourly.get),
+        'most_active_day': max(weekly, key=weekly.get)
+    }
+
+
+def compute_all_metrics(round_trips):
+    """전체 트레이더 성과 지표를 구간 집계 한 번으로 계산
+
+    round_trips는 match_round_trips 결과처럼 트레이더별로 연속되어 있어야 하며,
+    반환값은 trader_id → calculate_trader_metrics와 같은 스키마의 딕셔너리다.
+    """
+    if len(round_trips) == 0:
+        return {}
+
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    n_traders = len(starts)
+    seg = np.repeat(np.arange(n_traders), counts)
+
+    pnl = round_trips['pnl'].to_numpy(dtype=np.float64)
+    returns = round_trips['pnl_pct'].to_numpy(dtype=np.float64)
+    hold_days = round_trips['hold_days'].to_numpy(dtype=np.float64)
+
+    wins = pnl > 0
+    losses = pnl < 0
+    n_wins = np.bincount(seg[wins], minlength=n_traders)
+    n_losses = np.bincount(seg[losses], minlength=n_traders)
+    mean_win = segment_sum(pnl[wins], n_wins) / np.maximum(n_wins, 1)
+    mean_loss = segment_sum(pnl[losses], n_losses) / np.maximum(n_losses, 1)
+    total_pnl = segment_sum(pnl, counts)
+
+    # pandas Series.std와 같은 two-pass 분산 (ddof=1)
+    mean_return = segment_sum(returns, counts) / counts
+    squared = (mean_return[seg] - returns) ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std_return = np.where(counts > 1, np.sqrt(segment_sum(squared, counts) / (counts - 1)), np.nan)
+    mean_hold = segment_sum(hold_days, counts) / counts
+
+    # MDD: 트레이더별 누적 손익과 누적 최고점
+    cumulative = segment_cumsum(pnl, counts)
+    running_max = pd.Series(cumulative).groupby(seg).cummax().to_numpy()
+    max_drawdown = np.minimum.reduceat(cumulative - running_max, starts)
+    peak = np.maximum.reduceat(running_max, starts)
+
+    symbol_codes, symbol_labels = pd.factorize(round_trips['symbol'], sort=False)
+    top_symbols = _count_dicts(seg, symbol_codes, np.asarray(symbol_labels, dtype=object), n_traders)
+
+    results = {}
+    for i, trader_id in enumerate(trader_ids[starts].tolist()):
+        results[trader_id] = performance_record(
+            trader_id, int(counts[i]), int(n_wins[i]), int(n_losses[i]),
+            mean_win[i], mean_loss[i], total_pnl[i], mean_return[i], std_return[i],
+            max_drawdown[i], peak[i], mean_hold[i], top_symbols[i]
+        )
+
+    return results
+
+
+def compute_all_patterns(transactions):
+    """전체 트레이더 거래 패턴을 한 번의 정렬로 계산 (analyze_patterns와 같은 스키마)"""
+    if len(transactions) == 0:
+        return {}
+
+    trader_codes, trader_uniques = pd.factorize(transactions['trader_id'], sort=False)
+    order = np.argsort(trader_codes, kind='stable')
+    seg = trader_codes[order]
+    starts, counts = segment_bounds(seg)
+    n_traders = len(starts)
+
+    datetimes = transactions['datetime'].dt
+    hours = datetimes.hour.to_numpy(dtype=np.int64)[order]
+    weekdays = datetimes.dayofweek.to_numpy(dtype=np.int64)[order]
+    amounts = transactions['total_amount'].to_numpy(dtype=np.float64)[order]
+
+    hourly = _count_dicts(seg, hours, np.arange(24, dtype=object), n_traders)
+    weekly = _count_dicts(seg, weekdays, DAY_NAMES, n_traders)
+    avg_position = segment_sum(amounts, counts) / counts
+
+    results = {}
+    for i, trader_id in enumerate(np.asarray(trader_uniques, dtype=object).tolist()):
+        results[trader_id] = pattern_record(trader_id, hourly[i], weekly[i], avg_position[i])
+
+    return results
+
+
+def profiles_by_trader(profiles):
+    """trader_id → 프로필 딕셔너리 (트레이더별 첫 행)"""
+    profiles = profiles.drop_duplicates('trader_id', keep='first')
+    return {profile['trader_id']: profile for profile in profiles.to_dict('records')}
+
+
+def assemble_results(profiles, performances, patterns, inventory=None, benchmarks=None, confidence=None):
+    """일괄 계산 결과를 트레이더 등장 순서의 리포트로 조립 (라운드트립이 없는 트레이더 제외)
+
+    inventory(trader_id → 미실현 포지션 목록)가 주어지면 각 트레이더에 'inventory'로,
+    benchmarks(trader_id → 지수 대비 지표)가 주어지면 'benchmark'로,
+    confidence(trader_id → 부트스트랩 신뢰구간)가 주어지면 'confidence'로 붙인다.
+    """
+    profiles = profiles_by_trader(profiles)
+    results = {}
+
+    for trader_id, pattern in patterns.items():
+        profile = profiles[trader_id]
+        performance = performances.get(trader_id)
+
+        if performance:
+            results[trader_id] = {
+                'profile': profile,
+                'performance': performance,
+                'pattern': pattern
+            }
+            if inventory is not None:
+                results[trader_id]['inventory'] = inventory.get(trader_id, [])
+            if benchmarks is not None:
+                results[trader_id]['benchmark'] = benchmarks.get(trader_id)
+            if confidence is not None:
+                results[trader_id]['confidence'] = confidence.get(trader_id)
+
+    return results
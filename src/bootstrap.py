@@ -0,0 +1,131 @@
+import numpy as np
+
+from segments import segment_bounds
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_SEED = 42
+CONFIDENCE = 0.95
+MIN_TRADES = 30  # 이보다 거래가 적으면 low_sample로 표시
+_BLOCK = 256  # 난수 표의 (재표본 x 추출 순번) 블록 크기
+_BLOCK_CELLS = 1 << 22  # 한 번에 펼치는 (재표본 x 라운드트립) 크기
+_TABLE_CELLS = 1 << 24  # 길이별로 재사용하는 난수 표의 최대 크기 (넘으면 길이마다 생성)
+# 재표본에서 더하는 행별 값
+SUM_COLUMNS = ('wins', 'win_pnl', 'losses', 'loss_pnl', 'returns', 'returns_sq')
+
+
+def _uniforms(seed, b0, b1, width):
+    """난수 표 u[b0:b1, :width]
+
+    _BLOCK x _BLOCK 블록마다 (시드, 행 블록, 열 블록)으로 생성기를 따로 두므로 표를 어떤
+    크기로 잘라 만들어도 같은 위치에는 같은 값이 나온다. b0는 _BLOCK의 배수여야 한다.
+    """
+    col_blocks = (width - 1) // _BLOCK + 1
+    table = np.vstack([
+        np.hstack([np.random.default_rng([seed, rb, cb]).random((_BLOCK, _BLOCK)) for cb in range(col_blocks)])
+        for rb in range(b0 // _BLOCK, (b1 - 1) // _BLOCK + 1)
+    ])
+    return table[:b1 - b0, :width]
+
+
+def _pick_counts(seed, b0, b1, n, table=None):
+    """재표본 [b0, b1)에서 길이 n 구간의 각 행이 뽑힌 횟수 [재표본, n]
+
+    재표본 b의 k번째 추출은 u[b, k] * n 번째 행이므로 횟수는 n에만 달려 있고,
+    길이가 같은 트레이더는 같은 횟수 행렬을 공유한다. table은 미리 만든 난수 표다.
+    """
+    uniforms = table[b0:b1, :n] if table is not None else _uniforms(seed, b0, b1, n)
+    picks = (uniforms * n).astype(np.int64)
+    picks += (np.arange(b1 - b0) * n)[:, None]
+    return np.bincount(picks.ravel(), minlength=(b1 - b0) * n).reshape(b1 - b0, n).astype(np.float64)
+
+
+def _resampled_sums(values, n, seed, n_resamples, table=None):
+    """길이가 n인 트레이더 묶음의 재표본별 합계 [재표본, 트레이더, SUM_COLUMNS]
+
+    values는 [n, 트레이더, SUM_COLUMNS] 배열이며 (뽑힌 횟수 x 행 값) 행렬 곱 한 번으로
+    모든 트레이더/값의 합계를 구한다.
+    """
+    n_traders = values.shape[1]
+    flat = values.reshape(n, -1)
+    sums = np.empty((n_resamples, flat.shape[1]))
+    step = max(_BLOCK, _BLOCK_CELLS // n // _BLOCK * _BLOCK)
+    for b0 in range(0, n_resamples, step):
+        b1 = min(n_resamples, b0 + step)
+        sums[b0:b1] = _pick_counts(seed, b0, b1, n, table) @ flat
+    return sums.reshape(n_resamples, n_traders, len(SUM_COLUMNS))
+
+
+def _interval(samples, confidence):
+    """재표본 값 [재표본, 트레이더] → 트레이더별 (하한, 상한)
+
+    정의되지 않은(NaN/inf) 재표본은 빼고 남은 값으로 np.quantile(linear)과 같은 보간을 한다.
+    """
+    samples = np.sort(np.where(np.isfinite(samples), samples, np.nan), axis=0)  # NaN은 뒤로
+    valid = np.isfinite(samples).sum(axis=0)
+    alpha = (1 - confidence) / 2
+    bounds = np.full((2, samples.shape[1]), np.nan)
+    columns = np.flatnonzero(valid)
+    for i, q in enumerate((alpha, 1 - alpha)):
+        h = (valid[columns] - 1) * q
+        lo = np.floor(h).astype(np.int64)
+        hi = np.minimum(lo + 1, valid[columns] - 1)
+        below, above = samples[lo, columns], samples[hi, columns]
+        bounds[i, columns] = below + (above - below) * (h - lo)
+    return bounds
+
+
+def _round(value):
+    """NaN(모든 재표본에서 정의되지 않음)은 None"""
+    return round(float(value), 2) if np.isfinite(value) else None
+
+
+def bootstrap_intervals(round_trips, n_resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED,
+                        confidence=CONFIDENCE, min_trades=MIN_TRADES):
+    """전체 트레이더의 승률/샤프/손익비 부트스트랩 신뢰구간과 표본 부족 표시
+
+    라운드트립을 트레이더별로 복원 추출한 재표본 n_resamples개를 (재표본 x 라운드트립)
+    배열로 한꺼번에 만들고 구간 합계로 지표를 계산한다. 지표 정의는 performance_record와
+    같고, 손실 거래가 없거나 분산이 0이라 정의되지 않는 재표본은 구간 계산에서 뺀다.
+    반환값은 trader_id → {'win_rate': [하한, 상한], 'sharpe_ratio': ..., 'profit_factor': ...,
+    'confidence', 'resamples', 'low_sample'} 딕셔너리다.
+    """
+    if len(round_trips) == 0:
+        return {}
+
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    pnl = round_trips['pnl'].to_numpy(dtype=np.float64)
+    returns = round_trips['pnl_pct'].to_numpy(dtype=np.float64)
+    values = np.column_stack([
+        pnl > 0, np.where(pnl > 0, pnl, 0), pnl < 0, np.where(pnl < 0, pnl, 0), returns, returns ** 2
+    ]).astype(np.float64)
+
+    intervals = {name: np.full((2, len(starts)), np.nan) for name in ('win_rate', 'sharpe_ratio', 'profit_factor')}
+    max_length = int(counts.max())
+    table = _uniforms(seed, 0, n_resamples, max_length) if n_resamples * max_length <= _TABLE_CELLS else None
+    per_group = max(1, _BLOCK_CELLS // (n_resamples * len(SUM_COLUMNS)))
+    by_length = np.argsort(counts, kind='stable')
+    lengths, first = np.unique(counts[by_length], return_index=True)
+    for n, group in zip(lengths.tolist(), np.split(by_length, first[1:])):
+        for lo in range(0, len(group), per_group):
+            traders = group[lo:lo + per_group]
+            rows = starts[traders][None, :] + np.arange(n)[:, None]
+            s = _resampled_sums(values[rows], n, seed, n_resamples, table)
+            wins, win_pnl, losses, loss_pnl, total, squares = np.moveaxis(s, 2, 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean = total / n
+                std = np.sqrt(np.maximum(squares - total * mean, 0) / (n - 1))
+                sharpe = np.where(std > 0, mean / std * np.sqrt(252), np.nan)
+                profit_factor = (win_pnl / np.maximum(wins, 1)) / (np.abs(loss_pnl) / losses)
+            intervals['win_rate'][:, traders] = _interval(wins / n * 100, confidence)
+            intervals['sharpe_ratio'][:, traders] = _interval(sharpe, confidence)
+            intervals['profit_factor'][:, traders] = _interval(profit_factor, confidence)
+
+    results = {}
+    for i, trader_id in enumerate(trader_ids[starts].tolist()):
+        record = {name: [_round(bounds[0, i]), _round(bounds[1, i])] for name, bounds in intervals.items()}
+        record['confidence'] = confidence
+        record['resamples'] = n_resamples
+        record['low_sample'] = bool(counts[i] < min_trades)
+        results[trader_id] = record
+    return results
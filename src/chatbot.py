@@ -1,4 +1,5 @@
 import os
+import re
 from typing import Dict, List, Optional
 from pathlib import Path
 from rag_system import TradingKnowledgeBase
@@ -12,6 +13,37 @@ logging.basicConfig(
     format='%(asctime)s - %(message)s'
 )
 
+# 기간 질의로 답할 수 있는 지표 (누적합 인덱스 기반)
+WINDOW_METRICS = ['win_rate', 'total_pnl', 'avg_return_pct', 'sharpe_ratio']
+
+# 복합 조건 질의 ("저위험 스윙 트레이더 중 샤프 2 이상") - 프로필 값과 질의 표현
+RISK_WORDS = {
+    '저위험': ['저위험', 'low-risk', 'low risk'],
+    '중위험': ['중위험', 'medium-risk', 'medium risk', 'moderate-risk', 'moderate risk'],
+    '고위험': ['고위험', 'high-risk', 'high risk'],
+}
+STYLE_WORDS = {
+    '단기매매': ['단기매매', '단기', 'day trader', 'short-term'],
+    '스윙트레이딩': ['스윙트레이딩', '스윙', 'swing'],
+    '중기투자': ['중기투자', '중기', 'mid-term', 'medium-term'],
+    '장기투자': ['장기투자', '장기', 'long-term'],
+}
+METRIC_WORDS = {
+    'sharpe_ratio': ['샤프', 'sharpe'],
+    'win_rate': ['승률', 'win rate'],
+    'total_pnl': ['손익', '수익', 'pnl', 'profit'],
+    'max_drawdown_pct': ['mdd', '낙폭', 'drawdown'],
+    'avg_hold_days': ['보유 기간', '보유기간', 'hold days', 'holding'],
+}
+_METRIC_ALT = '|'.join(re.escape(w) for words in METRIC_WORDS.values() for w in words)
+# "샤프 2 이상", "승률 60% 초과" / "sharpe > 2", "win rate above 60"
+_KO_THRESHOLD = re.compile(rf'({_METRIC_ALT})[^\d\-]{{0,12}}?(-?\d+(?:\.\d+)?)\s*%?\s*(이상|이하|초과|미만)')
+_EN_THRESHOLD = re.compile(rf'({_METRIC_ALT})[a-z_ ]{{0,10}}?(>=|<=|>|<|above|over|below|under|at least|at most)\s*(-?\d+(?:\.\d+)?)')
+# 자유 텍스트 검색 결과로 쓸 최소 프로필 텍스트 코사인 유사도
+TEXT_MATCH_SCORE = 0.15
+_THRESHOLD_OPS = {'이상': '>=', '이하': '<=', '초과': '>', '미만': '<', 'above': '>', 'over': '>',
+                  'below': '<', 'under': '<', 'at least': '>=', 'at most': '<='}
+
 class TraderAnalysisChatbot:
     """Trader Performance Analysis AI Chatbot"""
     
@@ -44,17 +76,34 @@ class TraderAnalysisChatbot:
         
         self.kb = TradingKnowledgeBase(data_path)
         self.mcp = DesktopCommanderClient()
+        # 리포트/사이드카가 바뀌면 백그라운드에서 지식베이스와 인덱스를 새로 만들어 교체
+        # (mcp_config.json의 auto_refresh / refresh_interval)
+        self.refresher = self.mcp.watch(
+            lambda: TradingKnowledgeBase(data_path).warm_indexes(), self.kb.source_files(),
+            on_swap=self._swap_kb, initial=self.kb
+        )
         self.conversation_history = []
     
+    def _swap_kb(self, kb: TradingKnowledgeBase):
+        """새 지식베이스로 교체 (참조 하나만 바꾸므로 읽는 쪽은 잠그지 않음)"""
+        self.kb = kb
+    
     def _analyze_intent(self, query: str) -> Dict:
         """강화된 의도 분석 - 타입, 메트릭, 필터 반환"""
         query_lower = query.lower()
         result = {
             'type': 'trader_query',
             'metric': None,
-            'filter': None
+            'filter': None,
+            'window_days': None,
+            'exposure': False,
+            'conditions': []
         }
         
+        # 복합 조건 (리스크/스타일/지표 임계값) - 찾은 표현은 지우고 나머지로 필터를 분석
+        # ("low-risk"의 'low'가 'lowest' 필터로 잡히지 않도록)
+        result['conditions'], query_lower = self._parse_conditions(query_lower)
+        
         # 메트릭 먼저 분석
         if any(w in query_lower for w in ['승률', 'win', 'rate']):
             result['metric'] = 'win_rate'
@@ -67,6 +116,19 @@ class TraderAnalysisChatbot:
         elif any(w in query_lower for w in ['보유', 'hold', '기간']):
             result['metric'] = 'avg_hold_days'
         
+        # 노출/자본 활용 질의
+        if any(w in query_lower for w in ['노출', '활용률', '자본 활용', '동시 포지션', 'exposure', 'utilization']):
+            result['exposure'] = True
+        
+        # 기간 분석 ("최근 30일", "last 30 days", "최근 일주일/한달")
+        days_match = re.search(r'(?:최근|지난)\s*(\d+)\s*일|last\s+(\d+)\s*days?', query_lower)
+        if days_match:
+            result['window_days'] = int(days_match.group(1) or days_match.group(2))
+        elif any(w in query_lower for w in ['일주일', '1주일', 'last week']):
+            result['window_days'] = 7
+        elif any(w in query_lower for w in ['한달', '한 달', '1개월', 'last month']):
+            result['window_days'] = 30
+        
         # 필터 분석
         if any(w in query_lower for w in ['높은', 'high', 'best', '많은', '긴', '큰']):
             result['filter'] = 'highest'
@@ -82,6 +144,8 @@ class TraderAnalysisChatbot:
         # 타입 분석 (메트릭과 필터를 고려)
         if any(w in query_lower for w in ['비교', '차이', 'compare', 'vs', 'difference']):
             result['type'] = 'comparison'
+        elif any(w in query_lower for w in ['비슷한', '유사한', '닮은', 'similar', 'traders like', 'trader like']):
+            result['type'] = 'similar'
         elif any(w in query_lower for w in ['조언', '제안', '개선', 'advice', 'suggest', 'improve', '배워야', '학습']):
             result['type'] = 'advice'
         elif any(w in query_lower for w in ['패턴', '스타일', 'pattern', 'style', 'trend', '시간', '요일']) or result['filter'] in ['morning', 'thursday']:
@@ -92,28 +156,78 @@ class TraderAnalysisChatbot:
         
         return result
     
+    def _parse_conditions(self, query_lower: str) -> tuple:
+        """질의의 리스크/스타일/지표 임계값 → ([(field, op, value)], 그 표현을 지운 질의)"""
+        conditions = []
+        for field, table in (('profile.risk_tolerance', RISK_WORDS), ('profile.trading_style', STYLE_WORDS)):
+            for value, words in table.items():
+                word = next((w for w in words if w in query_lower), None)
+                if word:
+                    conditions.append((field, '==', value))
+                    query_lower = query_lower.replace(word, ' ')
+                    break
+        
+        metric_of = {w: metric for metric, words in METRIC_WORDS.items() for w in words}
+        for pattern, groups in ((_KO_THRESHOLD, (1, 2, 3)), (_EN_THRESHOLD, (1, 3, 2))):
+            for match in list(pattern.finditer(query_lower)):
+                word, number, op = (match.group(g) for g in groups)
+                conditions.append((f'performance.{metric_of[word]}', _THRESHOLD_OPS.get(op, op), float(number)))
+                query_lower = query_lower.replace(match.group(0), ' ')
+        return conditions, query_lower
+    
     def _search_data(self, query: str, intent: Dict) -> List[Dict]:
         """강화된 검색 로직 - 패턴 우선"""
         intent_type = intent['type']
         metric = intent['metric']
         filter_type = intent['filter']
         
+        # 노출 질의 ("자본 활용률이 가장 높은 트레이더") - 노출 타임라인이 있을 때만
+        if intent['exposure'] and self.kb.exposure is not None:
+            exposed = self._search_exposure(query)
+            if exposed:
+                return exposed
+        
+        # 기간 질의 ("최근 30일 승률") - 누적합 인덱스가 있을 때만
+        if intent.get('window_days') and self.kb.windows is not None:
+            windowed = self._search_window(query, intent)
+            if windowed:
+                return windowed
+        
+        # "목요일 아침"처럼 요일/시간대가 오면 활동 큐브의 해당 칸 조건
+        query_lower = query.lower()
+        day = 'Thursday' if any(w in query_lower for w in ['목요일', 'thursday']) else None
+        hours = 'morning' if any(w in query_lower for w in ['아침', 'morning', '9시', '10시']) else None
+        when = [('activity', 'during', {'days': day, 'hours': hours})] if day or hours else []
+        
+        # 복합 조건 ("저위험 스윙 트레이더 중 샤프 2 이상, 목요일 아침") - 모두 만족하는 트레이더
+        if intent['conditions'] and intent_type not in ('comparison', 'similar'):
+            where = intent['conditions'] + when
+            logging.info(f"Compound query plan: {self.kb.explain_query(where)}")
+            if when:
+                return self.kb.query(where, order_by='activity', limit=10)
+            return self.kb.query(where, order_by=metric or 'total_pnl', ascending=filter_type == 'lowest', limit=10)
+        
         # 패턴 검색 우선 (이름보다 먼저)
         if intent_type == 'pattern' or filter_type in ['morning', 'thursday']:
-            if filter_type == 'morning':
-                return self.kb.search_by_time_pattern((9, 11))
-            elif filter_type == 'thursday':
-                return self.kb.search_by_weekday('Thursday')
-            else:
-                return self.kb.get_all_traders()
+            if when:
+                return self.kb.query(when, order_by='activity', limit=10)
+            return self.kb.get_all_traders()
         
         # 랭킹 검색
         if intent_type == 'ranking':
             if not metric:
                 metric = 'total_pnl'  # 기본값
             
-            order = 'asc' if filter_type == 'lowest' else 'desc'
-            return self.kb.search_by_metric_complex(metric, order, 3)
+            return self.kb.query([], order_by=metric, ascending=filter_type == 'lowest', limit=3)
+        
+        # 유사 트레이더 ("김민수와 비슷한 트레이더") - 기준 트레이더 뒤에 프로필/지표 임베딩 상위를 붙임
+        elif intent_type == 'similar':
+            anchors = self._find_traders(query)
+            if anchors:
+                similar = self.kb.similar_traders([anchor['trader_id'] for anchor in anchors], top_n=3)
+                return [row for anchor, found in zip(anchors, similar) for row in [anchor, *found]]
+            matched = self.kb.semantic_search(query, top_n=5, min_score=TEXT_MATCH_SCORE)
+            return matched or self.kb.get_all_traders()
         
         # 비교
         elif intent_type == 'comparison':
@@ -191,20 +305,58 @@ class TraderAnalysisChatbot:
             
             # 검색 실패 시 필터 적용
             if filter_type == 'morning':
-                return self.kb.search_by_time_pattern((9, 11))
+                return self.kb.query([('pattern.most_active_hour', 'between', (9, 11))])
             elif filter_type == 'thursday':
-                return self.kb.search_by_weekday('Thursday')
+                return self.kb.query([('pattern.most_active_day', 'contains', 'Thursday')])
             elif filter_type == 'stable':
                 # 안정적 = 낮은 MDD
-                return self.kb.search_by_metric_complex('max_drawdown_pct', 'asc', 3)
+                return self.kb.query([], order_by='max_drawdown_pct', ascending=True, limit=3)
             
-            # 아무것도 없으면 전체 반환
-            return self.kb.get_all_traders()
+            # 프로필 텍스트가 비슷한 트레이더 ("CFA 있는 반도체 섹터"), 아무것도 없으면 전체 반환
+            matched = self.kb.semantic_search(query, top_n=5, min_score=TEXT_MATCH_SCORE)
+            return matched or self.kb.get_all_traders()
         
         # 조언 (전체 데이터 필요)
         else:
             return self.kb.get_all_traders()
     
+    def _find_traders(self, query: str) -> List[Dict]:
+        """질의에 나온 트레이더 ID(T001)와 한글 이름 (조사 제거, 중복 제외)"""
+        query_cleaned = re.sub(r'([가-힣]{2,4})(와|과|을|를|이|가|은|는|랑|처럼)', r'\1 ', query)
+        candidates = re.findall(r'T\d{3,}', query.upper()) + re.findall(r'[가-힣]{2,4}', query_cleaned)
+        found = {}
+        for candidate in candidates:
+            trader = self.kb.search_by_trader(candidate)
+            if trader is not None and trader['trader_id'] not in found:
+                found[trader['trader_id']] = trader
+        return list(found.values())
+    
+    def _search_exposure(self, query: str) -> List[Dict]:
+        """지목한 트레이더가 있으면 그 트레이더의 노출 지표, 없으면 최대 자본 활용률 상위"""
+        candidates = re.findall(r'T\d{3,}', query.upper()) + re.findall(r'[가-힣]{2,4}', query)
+        for candidate in candidates:
+            trader = self.kb.search_by_trader(candidate)
+            if trader:
+                trader['exposure'] = self.kb.exposure.stats(trader['trader_id'])
+                return [trader]
+        return self.kb.get_top_exposure('peak_utilization_pct', 3)
+    
+    def _search_window(self, query: str, intent: Dict) -> List[Dict]:
+        """최근 N일 기간 지표 검색: 랭킹이면 기간 지표 순위, 아니면 지목한 트레이더의 기간 지표"""
+        start, end = self.kb.recent_window(intent['window_days'])
+        if intent['type'] == 'ranking' or intent['filter'] in ['highest', 'lowest']:
+            metric = intent['metric'] if intent['metric'] in WINDOW_METRICS else 'total_pnl'
+            return self.kb.get_top_in_window(metric, start, end, top_n=3, ascending=intent['filter'] == 'lowest')
+        
+        candidates = re.findall(r'T\d{3,}', query.upper()) + re.findall(r'[가-힣]{2,4}', query)
+        for candidate in candidates:
+            trader = self.kb.search_by_trader(candidate)
+            if trader:
+                trader['window'] = self.kb.windows.metrics_between(trader['trader_id'], start, end)
+                logging.info(f"Window query: {trader['trader_id']} last {intent['window_days']} days")
+                return [trader]
+        return []
+    
     def _build_prompt(self, query: str, context: List[Dict]) -> str:
         # 유사 이름 제안 처리
         if context and len(context) == 1 and context[0].get('not_found'):
@@ -252,6 +404,39 @@ Trader: {t['profile']['name']} ({t.get('trader_id', 'N/A')})
 - MDD: {t['performance']['max_drawdown_pct']}%
 - Active: {t['pattern']['most_active_hour']}h, {t['pattern']['most_active_day']}
 """
+            if 'activity' in t:
+                context_text += f"- Trades in queried window: {t['activity']['trades']} ({t['activity']['share_pct']}% of all trades)\n"
+            if t.get('similarity') is not None:
+                context_text += f"- Similarity score (cosine): {t['similarity']}\n"
+            if t.get('exposure'):
+                ex = t['exposure']
+                context_text += (
+                    f"- Exposure: peak ${ex['peak_exposure']} ({ex['peak_utilization_pct']}% of account), "
+                    f"avg ${ex['avg_exposure']} ({ex['avg_utilization_pct']}%), "
+                    f"max {ex['max_concurrent_positions']} concurrent positions, open now ${ex['open_exposure']}\n"
+                )
+            if t.get('confidence'):
+                ci = t['confidence']
+                context_text += (
+                    f"- {int(ci['confidence'] * 100)}% CI: Win Rate {ci['win_rate']}, Sharpe {ci['sharpe_ratio']}, "
+                    f"Profit Factor {ci['profit_factor']}"
+                    f"{' (LOW SAMPLE: too few trades, treat metrics as unreliable)' if ci['low_sample'] else ''}\n"
+                )
+            rank = self.kb.cohorts.rank(t.get('trader_id')) if self.kb.cohorts is not None and len(context) <= 3 else None
+            if rank:
+                peers = self.kb.cohorts.cells[rank['cohort']]['traders']
+                pct = rank['percentiles']
+                context_text += (
+                    f"- Peer percentile (same style/risk/experience band, {peers} traders): "
+                    f"Win Rate {pct['win_rate']}, Sharpe {pct['sharpe_ratio']}, P&L {pct['total_pnl']}\n"
+                )
+            if t.get('window'):
+                w = t['window']
+                context_text += (
+                    f"- Period {w['start'][:10]} ~ {w['end'][:10]} (end exclusive): {w['total_trades']} trades, "
+                    f"Win Rate {w['win_rate']}%, P&L ${w['total_pnl']}, Avg Return {w['avg_return_pct']}%, "
+                    f"Sharpe {w['sharpe_ratio']}\n"
+                )
         
         prompt = f"""You are a trading analyst. Answer in Korean.
 
@@ -0,0 +1,145 @@
+import json
+import numbers
+import os
+from bisect import bisect_right
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+# 코호트 차원 (프로필 필드)과 차원을 묶지 않는 값
+COHORT_DIMENSIONS = ('trading_style', 'risk_tolerance', 'years_experience')
+ALL = 'all'
+# 경력은 연수 그대로가 아니라 구간으로 묶는다 (라벨, 하한) - 다음 구간 하한 전까지
+EXPERIENCE_BUCKETS = (('0-2', 0), ('3-5', 3), ('6-10', 6), ('11+', 11))
+COHORT_METRICS = [
+    'total_trades', 'win_rate', 'total_pnl', 'avg_return_pct', 'profit_factor',
+    'sharpe_ratio', 'max_drawdown_pct', 'avg_hold_days'
+]
+QUANTILES = {'p10': 0.10, 'p25': 0.25, 'median': 0.50, 'p75': 0.75, 'p90': 0.90}
+
+
+def default_cohort_path(output_file):
+    """리포트 파일 옆에 두는 코호트 통계 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.cohorts.json"
+
+
+def experience_bucket(years):
+    """경력 연수 → 구간 라벨 (예: 4 → '3-5', 구간 라벨은 그대로, 없거나 음수면 None)"""
+    if isinstance(years, str):
+        return years if years in dict(EXPERIENCE_BUCKETS) else None
+    if not isinstance(years, numbers.Real) or isinstance(years, bool) or years != years:
+        return None
+    i = bisect_right([low for _, low in EXPERIENCE_BUCKETS], years) - 1
+    return EXPERIENCE_BUCKETS[i][0] if i >= 0 else None
+
+
+def experience_bounds(label):
+    """구간 라벨 → (하한, 다음 구간 하한) (마지막 구간은 상한 None)"""
+    labels = [name for name, _ in EXPERIENCE_BUCKETS]
+    i = labels.index(label)
+    upper = EXPERIENCE_BUCKETS[i + 1][1] if i + 1 < len(EXPERIENCE_BUCKETS) else None
+    return EXPERIENCE_BUCKETS[i][1], upper
+
+
+def cohort_key(style=None, risk=None, years=None):
+    """(스타일, 리스크, 경력) → 코호트 키 (None은 'all', 경력은 연수나 구간 라벨 → 구간 라벨)"""
+    if years is not None:
+        years = experience_bucket(years) or years  # 구간에 없는 값은 그대로 (맞는 셀 없음)
+    return '|'.join(ALL if value is None else str(value) for value in (style, risk, years))
+
+
+def _frame(results):
+    """리포트 결과 → 트레이더별 (차원 + 지표) DataFrame"""
+    rows = []
+    for trader_id, record in results.items():
+        profile, performance = record['profile'], record['performance']
+        row = {'trader_id': trader_id}
+        row.update({dim: profile.get(dim) for dim in COHORT_DIMENSIONS})
+        row['years_experience'] = experience_bucket(row['years_experience'])
+        row.update({metric: performance.get(metric) for metric in COHORT_METRICS})
+        rows.append(row)
+    frame = pd.DataFrame(rows, columns=['trader_id', *COHORT_DIMENSIONS, *COHORT_METRICS])
+    frame[COHORT_METRICS] = frame[COHORT_METRICS].astype(np.float64)
+    return frame
+
+
+def _cell(values):
+    """지표 값 배열 하나의 count/mean/median/p10~p90"""
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return {'count': 0, 'mean': None, **{name: None for name in QUANTILES}}
+    quantiles = np.quantile(values, list(QUANTILES.values()))
+    stats = {'count': int(len(values)), 'mean': round(float(values.mean()), 4)}
+    stats.update({name: round(float(q), 4) for name, q in zip(QUANTILES, quantiles)})
+    return stats
+
+
+def _percentiles(row):
+    """백분위 행 → {지표: 소수 첫째 자리 백분위}"""
+    return {metric: None if pd.isna(value) else round(float(value), 1) for metric, value in row.items()}
+
+
+def build_cohorts(results):
+    """차원 조합(각 차원 'all' 포함)별 지표 분포와 트레이더별 코호트 내 백분위
+
+    경력 차원은 EXPERIENCE_BUCKETS 구간 라벨로 묶는다 (대시보드 경력 슬라이더와 같은 구간). cells는 cohort_key → {'traders': 인원, 지표: 통계}이며, ranks는 trader_id →
+    {'cohort': 자기 (스타일, 리스크, 경력) 코호트 키, 'percentiles': 코호트 내 백분위,
+    'overall': 전체 대비 백분위}이다. 백분위는 값이 클수록 높고 동률은 평균 순위를 쓴다.
+    """
+    frame = _frame(results)
+    cells = {}
+    for mask in product((False, True), repeat=len(COHORT_DIMENSIONS)):
+        dims = [dim for dim, rolled in zip(COHORT_DIMENSIONS, mask) if not rolled]
+        groups = frame.groupby(dims, sort=True) if dims else [((), frame)]
+        for values, group in groups:
+            values = iter(values if isinstance(values, tuple) else (values,))
+            key = cohort_key(*(None if rolled else next(values) for rolled in mask))
+            cell = {'traders': int(len(group))}
+            for metric in COHORT_METRICS:
+                cell[metric] = _cell(group[metric].to_numpy())
+            cells[key] = cell
+
+    dims = list(COHORT_DIMENSIONS)
+    within = frame.groupby(dims)[COHORT_METRICS].rank(pct=True) * 100
+    overall = frame[COHORT_METRICS].rank(pct=True) * 100
+    ranks = {}
+    for i, row in enumerate(frame.itertuples(index=False)):
+        ranks[row.trader_id] = {
+            'cohort': cohort_key(*(getattr(row, dim) for dim in dims)),
+            'percentiles': _percentiles(within.iloc[i]),
+            'overall': _percentiles(overall.iloc[i])
+        }
+    return {'dimensions': dims, 'experience_buckets': [label for label, _ in EXPERIENCE_BUCKETS],
+            'metrics': COHORT_METRICS, 'cells': cells, 'ranks': ranks}
+
+
+def save_cohorts(path, cohorts):
+    """코호트 통계를 JSON으로 저장 (임시 파일 후 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cohorts, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+class CohortTable:
+    """save_cohorts로 저장한 코호트 통계 조회 (키 조회 한 번)"""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.metrics = data['metrics']
+        self.cells = data['cells']
+        self.ranks = data['ranks']
+
+    def stats(self, style=None, risk=None, years=None, metric=None):
+        """코호트 셀 (years는 경력 연수나 구간 라벨, metric을 주면 해당 지표 통계만, 없는 코호트면 None)"""
+        cell = self.cells.get(cohort_key(style, risk, years))
+        if cell is None or metric is None:
+            return cell
+        return cell.get(metric)
+
+    def rank(self, trader_id):
+        """트레이더의 코호트 키와 코호트 내/전체 백분위 (없으면 None)"""
+        return self.ranks.get(trader_id)
@@ -0,0 +1,158 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from incremental import file_signature, write_json_atomic
+from profiling import NULL_PROFILER
+
+CACHE_VERSION = 2  # 1: --validate 실행이 NaT가 든 캐시를 남길 수 있었음
+CATEGORY_COLUMNS = ['trader_id', 'date', 'time', 'symbol', 'side']
+
+
+def default_cache_dir(csv_file):
+    """원본 CSV 옆 .cache/<파일명> 디렉터리"""
+    directory, name = os.path.split(csv_file)
+    return os.path.join(directory, '.cache', os.path.splitext(name)[0])
+
+
+def parse_datetimes(dates, times, errors='raise'):
+    """date/time 문자열을 고유값 단위로 파싱해 결합
+
+    행마다 문자열을 이어 붙여 파싱하는 대신 고유한 날짜와 시각만 한 번씩 변환한다.
+    형식이 맞지 않으면 기존 방식(문자열 결합 후 pd.to_datetime)으로 처리한다.
+    errors='coerce'면 비었거나 파싱할 수 없는 값은 NaT가 된다 (검증 단계에서 격리).
+    """
+    date_codes, date_values = pd.factorize(dates, sort=False)
+    time_codes, time_values = pd.factorize(times, sort=False)
+    if errors == 'raise' and ((date_codes < 0).any() or (time_codes < 0).any()):
+        return pd.to_datetime(dates.astype(object) + ' ' + times.astype(object))
+    try:
+        days = pd.to_datetime(pd.Index(np.asarray(date_values, dtype=object)), errors=errors)
+        offsets = pd.to_timedelta(pd.Index(np.asarray(time_values, dtype=object)), errors=errors)
+    except (ValueError, TypeError):
+        return pd.to_datetime(dates.astype(object) + ' ' + times.astype(object), errors=errors)
+    combined = days.take(date_codes, allow_fill=True) + offsets.take(time_codes, allow_fill=True)
+    return pd.Series(combined, index=dates.index)
+
+
+def to_category(series):
+    """등장 순서 범주를 갖는 범주형으로 변환 (astype('category')의 정렬 생략)"""
+    codes, uniques = pd.factorize(series, sort=False)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index, name=series.name)
+
+
+def read_transactions_csv(transactions_file, profiler=NULL_PROFILER, errors='raise'):
+    """거래 CSV(.parquet도 가능)를 문자열 컬럼은 범주형으로 읽고 datetime 컬럼 추가"""
+    with profiler.stage('read_csv') as stage:
+        if transactions_file.endswith('.parquet'):
+            transactions = pd.read_parquet(transactions_file)
+        else:
+            transactions = pd.read_csv(transactions_file)
+        for column in CATEGORY_COLUMNS:
+            if column in transactions.columns:
+                transactions[column] = to_category(transactions[column])
+        stage['rows'] = len(transactions)
+    with profiler.stage('parse_datetime', rows=len(transactions)):
+        transactions['datetime'] = parse_datetimes(transactions['date'], transactions['time'], errors)
+    return transactions
+
+
+def _column_spec(series):
+    """컬럼 저장 방식: 범주형 코드 / int64 epoch / 숫자 배열"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return {'kind': 'category', 'categories': series.cat.categories.astype(object).tolist()}
+    if pd.api.types.is_datetime64_dtype(series.dtype):
+        return {'kind': 'datetime', 'dtype': str(series.dtype)}
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return {'kind': 'numeric'}
+    return None
+
+
+def write_cache(transactions, cache_dir, source_file):
+    """타입이 지정된 프레임을 컬럼별 .npy와 meta.json으로 저장
+
+    meta.json을 마지막에 쓰므로 중간에 중단돼도 불완전한 캐시를 읽지 않는다.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_file = os.path.join(cache_dir, 'meta.json')
+    if os.path.exists(meta_file):
+        os.remove(meta_file)
+
+    columns = []
+    for i, name in enumerate(transactions.columns):
+        series = transactions[name]
+        if _column_spec(series) is None:
+            series = to_category(series)
+        spec = _column_spec(series)
+
+        if spec['kind'] == 'category':
+            values = series.cat.codes.to_numpy()
+        elif spec['kind'] == 'datetime':
+            values = series.to_numpy().view(np.int64)
+        else:
+            values = series.to_numpy()
+
+        spec.update({'name': name, 'file': f"{i:03d}.npy"})
+        np.save(os.path.join(cache_dir, spec['file']), values)
+        columns.append(spec)
+
+    write_json_atomic(meta_file, {
+        'version': CACHE_VERSION,
+        'source': file_signature(source_file),
+        'rows': len(transactions),
+        'columns': columns
+    }, ensure_ascii=False)
+
+
+def load_cache(cache_dir, source_file):
+    """원본 CSV와 시그니처가 같은 캐시를 memory-map으로 로드 (없거나 오래됐으면 None)"""
+    meta_file = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_file):
+        return None
+    try:
+        with open(meta_file, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable cache {cache_dir}: {e}")
+        return None
+    if meta.get('version') != CACHE_VERSION or meta.get('source') != file_signature(source_file):
+        return None
+
+    columns = {}
+    for spec in meta['columns']:
+        values = np.load(os.path.join(cache_dir, spec['file']), mmap_mode='r')
+        if spec['kind'] == 'category':
+            columns[spec['name']] = pd.Categorical.from_codes(values, categories=spec['categories'])
+        elif spec['kind'] == 'datetime':
+            columns[spec['name']] = values.view(spec['dtype'])
+        else:
+            columns[spec['name']] = values
+    return pd.DataFrame(columns)
+
+
+def load_transactions(transactions_file, cache_dir=None, use_cache=True, profiler=NULL_PROFILER, errors='raise'):
+    """거래 데이터 로드 (캐시가 최신이면 캐시, 아니면 CSV를 읽고 캐시 재생성)"""
+    if not use_cache:
+        return read_transactions_csv(transactions_file, profiler, errors)
+
+    cache_dir = cache_dir or default_cache_dir(transactions_file)
+    with profiler.stage('load_cache') as stage:
+        transactions = load_cache(cache_dir, transactions_file)
+        stage['rows'] = 0 if transactions is None else len(transactions)
+    if transactions is not None:
+        return transactions
+
+    transactions = read_transactions_csv(transactions_file, profiler, errors)
+    if transactions['datetime'].isna().any():
+        # errors='coerce'로 NaT가 생긴 프레임은 errors='raise' 로드와 다르므로 캐시하지 않는다
+        print(f"[INFO] Skipping columnar cache: {transactions_file} has unparseable dates")
+        return transactions
+    try:
+        with profiler.stage('write_cache', rows=len(transactions)):
+            write_cache(transactions, cache_dir, transactions_file)
+        print(f"[CACHE] Built columnar cache: {cache_dir}")
+    except OSError as e:
+        print(f"[WARNING] Could not write cache {cache_dir}: {e}")
+    return transactions
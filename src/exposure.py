@@ -0,0 +1,185 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from segments import run_starts, segment_bounds, segment_cumsum
+
+# 트레이더별 요약 지표 (타임라인 파일에 함께 저장)
+EXPOSURE_STATS = [
+    'peak_exposure', 'avg_exposure', 'open_exposure', 'max_concurrent_positions',
+    'peak_utilization_pct', 'avg_utilization_pct'
+]
+
+
+def default_exposure_path(output_file):
+    """리포트 파일 옆에 두는 노출 타임라인 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.exposure.npz"
+
+
+def _seconds(value):
+    """Timestamp/문자열 → epoch 초"""
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[s]').astype(np.int64))
+
+
+def _events(round_trips, open_lots):
+    """포지션 구간 → (trader_id, 시각, 금액 변화, 포지션 수 변화) 이벤트 배열
+
+    라운드트립은 매수 원가(buy_price x quantity)를 두 시각 중 이른 때 열고 늦은 때 닫는다
+    (순번 매칭은 매도가 매수보다 앞설 수 있다). open_lots(trader_id, datetime, total_amount)는
+    아직 닫히지 않은 매수로 여는 이벤트만 만든다.
+    """
+    buy = round_trips['buy_date'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    sell = round_trips['sell_date'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    notional = (round_trips['buy_price'].to_numpy(dtype=np.float64)
+                * round_trips['quantity'].to_numpy(dtype=np.float64))
+    trader_ids = [round_trips['trader_id'].to_numpy(), round_trips['trader_id'].to_numpy()]
+    times = [np.minimum(buy, sell), np.maximum(buy, sell)]
+    amounts = [notional, -notional]
+    if open_lots is not None and len(open_lots):
+        trader_ids.append(open_lots['trader_id'].to_numpy())
+        times.append(open_lots['datetime'].to_numpy(dtype='datetime64[s]').astype(np.int64))
+        amounts.append(open_lots['total_amount'].to_numpy(dtype=np.float64))
+    amounts = np.concatenate(amounts)
+    return np.concatenate(trader_ids), np.concatenate(times), amounts, np.sign(amounts).astype(np.int32)
+
+
+def _event_order(trader_codes, times, is_open):
+    """(트레이더, 시각, 닫기 먼저) 정렬 순서 - 범위가 맞으면 키 하나로 합쳐 한 번에 정렬"""
+    offset = times.min()
+    span = int(times.max() - offset) + 1
+    if (int(trader_codes.max()) + 1) * span * 2 < 2 ** 62:
+        key = (trader_codes.astype(np.int64) * span + (times - offset)) * 2 + is_open
+        return np.argsort(key, kind='stable')
+    return np.lexsort((is_open, times, trader_codes))
+
+
+def exposure_timeline(round_trips, open_lots=None, account_sizes=None, end_time=None):
+    """전체 트레이더의 보유 금액/동시 포지션 수 타임라인과 요약 지표를 한 번의 정렬로 계산
+
+    이벤트를 (트레이더, 시각, 닫기 먼저) 순으로 정렬해 트레이더별 누적합을 내는 스윕라인이며
+    O(n log n)이다. 같은 시각의 이벤트는 마지막 상태 한 행으로 합친다. 평균 노출은 첫 이벤트부터
+    마지막 이벤트(열린 포지션이 남으면 end_time)까지의 시간 가중 평균이고, 활용률은
+    account_size 대비 비율(%)이다. 반환값은 save_exposure로 저장할 배열 딕셔너리다.
+    """
+    trader_ids, times, amounts, counts = _events(round_trips, open_lots)
+    if len(times) == 0:
+        empty = {'trader_ids': np.array([], dtype=str), 'offsets': np.zeros(1, dtype=np.int64),
+                 'time': np.array([], dtype=np.int64), 'exposure': np.zeros(0), 'positions': np.zeros(0, np.int32)}
+        empty.update({name: np.zeros(0) for name in EXPOSURE_STATS})
+        return empty
+
+    trader_codes, trader_labels = pd.factorize(trader_ids, sort=False)
+    order = _event_order(trader_codes, times, amounts > 0)
+    trader_codes, times, amounts, counts = trader_codes[order], times[order], amounts[order], counts[order]
+
+    starts, lengths = segment_bounds(trader_codes)
+    exposure = segment_cumsum(amounts, lengths)
+    positions = np.rint(segment_cumsum(counts, lengths)).astype(np.int32)
+
+    # 같은 (트레이더, 시각)은 마지막 행만 남긴다
+    last = np.append(run_starts(trader_codes, times)[1:], True)
+    trader_codes, times = trader_codes[last], times[last]
+    positions = positions[last]
+    # 다 닫힌 시점의 누적합 잔차(부동소수 오차)는 0으로
+    exposure = np.where(positions > 0, np.maximum(exposure[last], 0), 0)
+    starts, lengths = segment_bounds(trader_codes)
+    ends = starts + lengths - 1
+
+    # 구간별 지속 시간: 다음 이벤트까지, 마지막 행은 열린 포지션이 남았으면 end_time까지
+    duration = np.append(np.diff(times), 0).astype(np.float64)
+    final_end = times.max() if end_time is None else max(_seconds(end_time), int(times.max()))
+    duration[ends] = np.where(positions[ends] > 0, final_end - times[ends], 0)
+    span = np.add.reduceat(duration, starts)
+    weighted = np.add.reduceat(exposure * duration, starts)
+
+    labels = np.asarray(trader_labels, dtype=object)[trader_codes[starts]]
+    capital = np.array([(account_sizes or {}).get(t, np.nan) for t in labels.tolist()], dtype=np.float64)
+    capital[~(capital > 0)] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_exposure = np.where(span > 0, weighted / span, 0)
+    peak = np.maximum.reduceat(exposure, starts)
+    return {
+        'trader_ids': labels.astype(str),
+        'offsets': np.append(starts, len(times)).astype(np.int64),
+        'time': times,
+        'exposure': exposure,
+        'positions': positions,
+        'peak_exposure': peak,
+        'avg_exposure': avg_exposure,
+        'open_exposure': exposure[ends],
+        'max_concurrent_positions': np.maximum.reduceat(positions, starts).astype(np.float64),
+        'peak_utilization_pct': peak / capital * 100,
+        'avg_utilization_pct': avg_exposure / capital * 100
+    }
+
+
+def save_exposure(path, timeline):
+    """노출 타임라인과 요약 지표를 압축 .npz로 저장 (임시 파일 후 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **timeline)
+    os.replace(tmp_path, path)
+
+
+class ExposureTimeline:
+    """save_exposure로 저장한 타임라인 조회 (요약 지표는 배열 조회, 시점 노출은 이진 탐색)"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        self.trader_ids = arrays.pop('trader_ids').tolist()
+        self._offsets = arrays.pop('offsets')
+        self._time = arrays.pop('time')
+        self._exposure = arrays.pop('exposure')
+        self._positions = arrays.pop('positions')
+        self._stats = arrays
+        self._index = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+
+    def __contains__(self, trader_id):
+        return trader_id in self._index
+
+    def stats(self, trader_id):
+        """트레이더의 최대/평균/현재 노출, 최대 동시 포지션 수, 활용률 (없으면 None)"""
+        i = self._index.get(trader_id)
+        if i is None:
+            return None
+        stats = {}
+        for name in EXPOSURE_STATS:
+            value = float(self._stats[name][i])
+            if name == 'max_concurrent_positions':
+                stats[name] = int(value)
+            else:
+                stats[name] = round(value, 2) if np.isfinite(value) else None
+        return stats
+
+    def get(self, trader_id):
+        """트레이더 한 명의 (time, exposure, positions) 단계 함수 DataFrame (없으면 None)"""
+        i = self._index.get(trader_id)
+        if i is None:
+            return None
+        rows = slice(self._offsets[i], self._offsets[i + 1])
+        return pd.DataFrame({
+            'time': self._time[rows].astype('datetime64[s]'),
+            'exposure': self._exposure[rows],
+            'positions': self._positions[rows]
+        })
+
+    def at(self, trader_id, when):
+        """시점 when의 (보유 금액, 포지션 수) - 첫 이벤트 이전이면 (0, 0)"""
+        i = self._index.get(trader_id)
+        if i is None:
+            return None
+        lo, hi = self._offsets[i], self._offsets[i + 1]
+        k = lo + int(np.searchsorted(self._time[lo:hi], _seconds(when), 'right')) - 1
+        if k < lo:
+            return 0.0, 0
+        return float(self._exposure[k]), int(self._positions[k])
+
+    def top(self, metric='peak_utilization_pct', top_n=5):
+        """요약 지표 상위 트레이더 [(trader_id, 값)] (NaN 제외)"""
+        values = self._stats[metric]
+        valid = np.flatnonzero(np.isfinite(values))
+        ranked = valid[np.argsort(-values[valid], kind='stable')][:top_n]
+        return [(self.trader_ids[i], float(values[i])) for i in ranked.tolist()]
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from matching import unmatched_rows
+
+CHECKPOINT_VERSION = 1
+
+
+def default_checkpoint_path(output_file):
+    """리포트 파일 옆에 두는 체크포인트 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.checkpoint.json"
+
+
+def file_signature(path):
+    """파일 변경 감지용 (크기, 수정 시각)"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def file_digest(path):
+    """파일 내용 해시 (작은 보조 입력 파일용)"""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+
+def write_json_atomic(path, data, **kwargs):
+    """임시 파일에 쓴 뒤 교체해 읽는 쪽이 반쯤 쓰인 파일을 보지 않도록 저장"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    """체크포인트 로드 (없거나 버전이 다르면 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Ignoring unreadable checkpoint {path}: {e}")
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+
+def output_formats(msgpack=False, compact_json=False, store=False):
+    """체크포인트에 기록하는 리포트 출력 형식 목록"""
+    return ['compact_json' if compact_json else 'json'] + (['msgpack'] if msgpack else []) + (['store'] if store else [])
+
+
+def save_checkpoint(path, source_files, output_file, traders, lot_method=None, bootstrap=None, formats=None):
+    """원본/리포트 파일 시그니처, 매칭 방식, 부트스트랩 재표본 수, 출력 형식과 트레이더별 상태 저장"""
+    write_json_atomic(path, {
+        'version': CHECKPOINT_VERSION,
+        'sources': {source: file_signature(source) for source in source_files},
+        'output': file_signature(output_file),
+        'lot_method': lot_method,
+        'bootstrap': bootstrap,
+        'formats': formats or output_formats(),
+        'traders': traders
+    }, ensure_ascii=False)
+
+
+def sources_unchanged(checkpoint_file, source_files, output_file, lot_method=None, bootstrap=None, formats=None):
+    """원본 CSV와 리포트가 마지막 실행 이후 그대로인지 확인 (CSV 로드 없이)
+
+    출력 형식(msgpack/압축 JSON/저장소)이 지난 실행과 다르면 다시 써야 하므로 False.
+    """
+    checkpoint = load_checkpoint(checkpoint_file)
+    if checkpoint is None or checkpoint['output'] != file_signature(output_file):
+        return False
+    if checkpoint.get('lot_method') != lot_method or checkpoint.get('bootstrap') != bootstrap:
+        return False
+    if checkpoint.get('formats') != (formats or output_formats()):
+        return False
+    if set(checkpoint['sources']) != set(source_files):
+        return False
+    return all(
+        checkpoint['sources'].get(source) == file_signature(source)
+        for source in source_files
+    )
+
+
+def trader_hashes(transactions, profiles, salt=None):
+    """트레이더별 거래 행 + 프로필 행의 내용 해시 (트레이더 등장 순서)
+
+    salt(예: 벤치마크 파일 해시)가 주어지면 모든 트레이더 해시에 섞는다.
+    """
+    columns = [c for c in transactions.columns if c != 'datetime']
+    row_hashes = pd.util.hash_pandas_object(transactions[columns], index=False).to_numpy()
+    profile_hashes = dict(zip(
+        profiles['trader_id'].tolist(),
+        pd.util.hash_pandas_object(profiles, index=False).to_numpy().tolist()
+    ))
+
+    trader_codes, trader_ids = pd.factorize(transactions['trader_id'], sort=False)
+    order = np.argsort(trader_codes, kind='stable')
+    counts = np.bincount(trader_codes, minlength=len(trader_ids))
+    bounds = np.concatenate(([0], np.cumsum(counts)))
+    sorted_hashes = row_hashes[order]
+
+    hashes = {}
+    for i, trader_id in enumerate(np.asarray(trader_ids, dtype=object).tolist()):
+        digest = hashlib.blake2b(sorted_hashes[bounds[i]:bounds[i + 1]].tobytes(), digest_size=16)
+        digest.update(str(profile_hashes.get(trader_id)).encode())
+        if salt is not None:
+            digest.update(salt.encode())
+        hashes[trader_id] = digest.hexdigest()
+    return hashes
+
+
+def open_lots_by_trader(transactions):
+    """짝이 맞지 않아 남은 매수/매도 로트 (trader_id → 로트 목록)"""
+    rows = unmatched_rows(transactions)
+    lots = transactions.iloc[rows]
+    records = pd.DataFrame({
+        'trader_id': lots['trader_id'].to_numpy(dtype=object),
+        'symbol': lots['symbol'].to_numpy(dtype=object),
+        'side': lots['side'].to_numpy(dtype=object),
+        'datetime': lots['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy(dtype=object),
+        'quantity': lots['quantity'].to_numpy(),
+        'price': lots['price'].to_numpy(),
+        'total_amount': lots['total_amount'].to_numpy()
+    }).to_dict('records')
+
+    result = {}
+    for record in records:
+        result.setdefault(record.pop('trader_id'), []).append(record)
+    return result
@@ -0,0 +1,337 @@
+import numpy as np
+import pandas as pd
+
+from segments import run_starts, expand_ranges, affine_scan
+from matching import ROUND_TRIP_COLUMNS
+
+LOT_METHODS = ('fifo', 'lifo', 'average')
+STACK_TAIL = 16  # LIFO 스택 걷어내기에서 남은 질의가 이 이하면 배열 연산 대신 루프로 마무리
+POSITION_COLUMNS = ['trader_id', 'symbol', 'quantity', 'cost_basis', 'unmatched_sell_quantity']
+# 미청산 로트: 매수 시각(datetime)과 남은 수량, 남은 원가(total_amount, 매수 행과 같은 이름)
+OPEN_LOT_COLUMNS = ['trader_id', 'symbol', 'datetime', 'quantity', 'total_amount']
+
+
+def _segmented(values, keys, how):
+    """정렬된 키 구간별 누적 연산 (cumsum / cummin)"""
+    return getattr(pd.Series(values).groupby(keys, sort=False), how)().to_numpy()
+
+
+def _events(transactions):
+    """(트레이더, 종목, 시간) 순으로 정렬한 체결 이벤트와 보유 수량 흐름
+
+    보유 수량은 0 아래로 내려가지 않는다 (공매도 미지원). 보유량을 넘는 매도 수량은
+    체결되지 않은 것으로 보고 unmatched_sell_quantity로 따로 집계한다.
+    """
+    trader_codes, trader_uniques = pd.factorize(transactions['trader_id'], sort=False)
+    symbol_codes, symbol_uniques = pd.factorize(transactions['symbol'], sort=False)
+    pair_codes, _ = pd.factorize(
+        trader_codes.astype(np.int64) * len(symbol_uniques) + symbol_codes, sort=False
+    )
+    ts = transactions['datetime'].to_numpy(dtype='datetime64[ns]')
+    # 트레이더 등장 순서 → 트레이더 내부 종목 등장 순서 → 시간 (안정 정렬)
+    order = np.lexsort((ts.view(np.int64), pair_codes, trader_codes))
+
+    starts = run_starts(pair_codes[order])
+    pair = np.cumsum(starts) - 1
+    is_sell = (transactions['side'] != 'Buy').to_numpy(dtype=bool)[order]
+    quantity = transactions['quantity'].to_numpy()[order]
+
+    # 0에서 반사되는 누적 수량: q[k] = D[k] - min(0, min(D[..k]))
+    raw_level = _segmented(np.where(is_sell, -quantity, quantity), pair, 'cumsum')
+    level = raw_level - np.minimum(_segmented(raw_level, pair, 'cummin'), 0)
+    before = np.where(starts, 0, np.roll(level, 1))
+    filled = np.where(is_sell, before - level, 0)
+
+    return {
+        'trader_id': np.asarray(trader_uniques, dtype=object)[trader_codes[order]],
+        'symbol': np.asarray(symbol_uniques, dtype=object)[symbol_codes[order]],
+        'pair': pair,
+        'starts': starts,
+        'ends': np.append(starts[1:], True),
+        'is_sell': is_sell,
+        'quantity': quantity,
+        'level': level,
+        'before': before,
+        'filled': filled,
+        'ts': ts[order],
+        'price': transactions['price'].to_numpy(dtype=np.float64)[order],
+        'total_amount': transactions['total_amount'].to_numpy(dtype=np.float64)[order]
+    }
+
+
+def _pro_rata(total, part, whole):
+    """수량 비율로 금액 배분 (전량이면 원래 금액 그대로)"""
+    return np.where(part == whole, total, total * part / whole)
+
+
+def _round_trip_table(ev, sell_rows, quantity, cost, buy_price, buy_date):
+    """체결 조각별 라운드트립 테이블 (ROUND_TRIP_COLUMNS)"""
+    proceeds = _pro_rata(ev['total_amount'][sell_rows], quantity, ev['quantity'][sell_rows])
+    pnl = proceeds - cost
+    sell_date = ev['ts'][sell_rows]
+    return pd.DataFrame({
+        'trader_id': ev['trader_id'][sell_rows],
+        'symbol': ev['symbol'][sell_rows],
+        'buy_date': buy_date,
+        'sell_date': sell_date,
+        'buy_price': buy_price,
+        'sell_price': ev['price'][sell_rows],
+        'quantity': quantity,
+        'pnl': pnl,
+        'pnl_pct': (pnl / cost) * 100,
+        'hold_days': (sell_date - buy_date) // np.timedelta64(1, 'D')
+    }, columns=ROUND_TRIP_COLUMNS)
+
+
+def _positions(ev, cost_basis):
+    """종목별 잔여 보유 수량, 원가, 미체결 매도 수량 (pair 순서)"""
+    ends = ev['ends']
+    unmatched = np.bincount(
+        ev['pair'], weights=np.where(ev['is_sell'], ev['quantity'] - ev['filled'], 0)
+    )
+    positions = pd.DataFrame({
+        'trader_id': ev['trader_id'][ends],
+        'symbol': ev['symbol'][ends],
+        'quantity': ev['level'][ends],
+        'cost_basis': cost_basis,
+        'unmatched_sell_quantity': unmatched.astype(ev['quantity'].dtype)
+    }, columns=POSITION_COLUMNS)
+    return positions[(positions['quantity'] > 0) | (positions['unmatched_sell_quantity'] > 0)]
+
+
+def _open_lots(ev, rows, quantity, cost):
+    """남은 로트 테이블 (rows는 로트를 연 매수 이벤트, cost는 남은 수량분 원가)"""
+    return pd.DataFrame({
+        'trader_id': ev['trader_id'][rows],
+        'symbol': ev['symbol'][rows],
+        'datetime': ev['ts'][rows],
+        'quantity': quantity,
+        'total_amount': cost
+    }, columns=OPEN_LOT_COLUMNS)
+
+
+def _match_fifo(ev):
+    """FIFO: 매수 수량 누적 구간과 매도 체결 누적 구간의 교집합으로 조각 생성"""
+    n_pairs = ev['pair'][-1] + 1
+    buys = np.flatnonzero(~ev['is_sell'])
+    buy_qty = ev['quantity'][buys]
+    buy_end = np.cumsum(buy_qty)
+    buy_start = buy_end - buy_qty
+
+    # pair 시작 전까지의 전체 매수 수량 = 해당 pair 매수 대기열의 전역 좌표 원점
+    bought = np.where(ev['is_sell'], 0, ev['quantity'])
+    bought_before = np.cumsum(bought) - bought
+    origin = bought_before[ev['starts']]
+    sold = _segmented(ev['filled'], ev['pair'], 'cumsum')
+
+    sells = np.flatnonzero(ev['filled'] > 0)
+    sell_end = origin[ev['pair'][sells]] + sold[sells]
+    sell_start = sell_end - ev['filled'][sells]
+    first = np.searchsorted(buy_end, sell_start, side='right')
+    n_pieces = np.searchsorted(buy_end, sell_end, side='left') - first + 1
+
+    piece_buy = expand_ranges(first, n_pieces)
+    sell_rows = np.repeat(sells, n_pieces)
+    quantity = (
+        np.minimum(np.repeat(sell_end, n_pieces), buy_end[piece_buy])
+        - np.maximum(np.repeat(sell_start, n_pieces), buy_start[piece_buy])
+    )
+    buy_rows = buys[piece_buy]
+    cost = _pro_rata(ev['total_amount'][buy_rows], quantity, buy_qty[piece_buy])
+    round_trips = _round_trip_table(
+        ev, sell_rows, quantity, cost, ev['price'][buy_rows], ev['ts'][buy_rows]
+    )
+
+    # 대기열에서 아직 소진되지 않은 매수 수량
+    consumed = origin + sold[ev['ends']]
+    remaining = np.clip(buy_end - np.maximum(buy_start, consumed[ev['pair'][buys]]), 0, buy_qty)
+    remaining_cost = _pro_rata(ev['total_amount'][buys], remaining, buy_qty)
+    cost_basis = np.bincount(ev['pair'][buys], weights=remaining_cost, minlength=n_pairs)
+    held = remaining > 0
+    lots = _open_lots(ev, buys[held], remaining[held], remaining_cost[held])
+    return round_trips, _positions(ev, cost_basis), lots
+
+
+def _previous_lower(level, starts):
+    """pair 안에서 각 이벤트보다 보유 수량이 작은 직전 이벤트 번호 (없으면 pair 시작 - 1)
+
+    포인터 점프: 가리키는 이벤트의 수량이 작지 않으면 그 이벤트의 포인터로 건너뛴다.
+    건너뛴 구간은 모두 수량이 더 크거나 같으므로 매 단계 불변식이 유지된다. 대부분은 몇 단계에
+    끝나고, 긴 사슬을 따라가야 하는 몇 개(깊은 스택을 한 번에 비우는 매도 등)는 루프로 마무리한다.
+    """
+    idx = np.arange(len(level))
+    floor = np.maximum.accumulate(np.where(starts, idx, 0))
+    prev = idx - 1
+    active = np.flatnonzero(~starts)
+    while len(active) > STACK_TAIL:
+        target = prev[active]
+        active = active[(target >= floor[active]) & (level[target] >= level[active])]
+        prev[active] = prev[prev[active]]
+    for i in active.tolist():
+        target, lowest, value = prev.item(i), floor.item(i), level.item(i)
+        while target >= lowest and level.item(target) >= value:
+            target = prev.item(target)
+        prev[i] = target
+    return prev, floor
+
+
+def _pop_stack(level, prev, floor, cursor, top, bottom):
+    """LIFO 스택을 보유 수량 top에서 bottom까지 위에서부터 걷어낸 조각 (질의 번호, 매수 행, 수량)
+
+    깊이 d의 수량은 '직전 이벤트 중 수량이 d 이하로 내려간 마지막 이벤트'의 바로 다음 매수가
+    채운 것이다. 그 이벤트는 cursor에서 _previous_lower 포인터를 따라 내려가며 찾고, 한 번
+    건너뛸 때마다 조각 하나가 나온다. 모든 질의를 한꺼번에 한 단계씩 진행한다.
+    """
+    query = np.arange(len(cursor))
+    floor = floor[cursor]
+    found = []
+    while len(query) > STACK_TAIL:
+        cursor = prev[cursor]
+        inside = cursor >= floor
+        low = np.maximum(np.where(inside, level[cursor], 0), bottom)
+        found.append((query, np.where(inside, cursor + 1, floor), top - low))
+        keep = low > bottom
+        query, cursor, floor, top, bottom = query[keep], cursor[keep], floor[keep], low[keep], bottom[keep]
+
+    # 남은 몇 개(한 매도가 작은 로트 수천 개를 걷어내는 깊은 스택 등)는 단계마다 배열 연산을
+    # 하는 것보다 포인터를 직접 따라가는 편이 빠르다
+    tail_query, tail_rows, tail_quantity = [], [], []
+    for q, c, f, t, b in zip(query.tolist(), cursor.tolist(), floor.tolist(), top.tolist(), bottom.tolist()):
+        while t > b:
+            c = prev.item(c)
+            if c >= f:
+                low = level.item(c)
+                low = b if low < b else low
+                tail_rows.append(c + 1)
+            else:
+                low = b
+                tail_rows.append(f)
+            tail_query.append(q)
+            tail_quantity.append(t - low)
+            t = low
+    found.append((np.array(tail_query, dtype=np.int64), np.array(tail_rows, dtype=np.int64),
+                  np.array(tail_quantity, dtype=level.dtype)))
+    query, rows, quantity = (np.concatenate(parts) for parts in zip(*found))
+    order = np.argsort(query, kind='stable')  # 질의별로 위(최근 매수)에서 아래 순서
+    return query[order], rows[order], quantity[order]
+
+
+def _match_lifo(ev):
+    """LIFO: 매도마다 보유 수량 [매도 후, 매도 전) 구간을 스택 위에서부터 매수별 조각으로 분할"""
+    n_pairs = ev['pair'][-1] + 1
+    level = ev['level']
+    prev, floor = _previous_lower(level, ev['starts'])
+
+    sells = np.flatnonzero(ev['filled'] > 0)
+    query, buy_rows, quantity = _pop_stack(level, prev, floor, sells - 1, ev['before'][sells], level[sells])
+    sell_rows = sells[query]
+    cost = _pro_rata(ev['total_amount'][buy_rows], quantity, ev['quantity'][buy_rows])
+    round_trips = _round_trip_table(
+        ev, sell_rows, quantity, cost, ev['price'][buy_rows], ev['ts'][buy_rows]
+    )
+
+    # pair 끝에 남은 스택 = 끝 수량에서 0까지 걷어낸 조각 (매수 순서로)
+    ends = np.flatnonzero(ev['ends'])
+    ends = ends[level[ends] > 0]
+    _, leftover_rows, leftover_qty = _pop_stack(level, prev, floor, ends, level[ends], np.zeros_like(level[ends]))
+    order = np.argsort(leftover_rows, kind='stable')
+    leftover_rows, leftover_qty = leftover_rows[order], leftover_qty[order]
+    leftover_cost = _pro_rata(ev['total_amount'][leftover_rows], leftover_qty, ev['quantity'][leftover_rows])
+    cost_basis = np.bincount(ev['pair'][leftover_rows], weights=leftover_cost, minlength=n_pairs)
+    lots = _open_lots(ev, leftover_rows, leftover_qty, leftover_cost)
+    return round_trips, _positions(ev, cost_basis), lots
+
+
+def _match_average(ev):
+    """평균단가: 보유 원가를 선형 점화식 스캔으로 추적하고 매도마다 평균 원가로 실현"""
+    is_sell, before = ev['is_sell'], ev['before']
+    # 매도는 보유 원가를 (남은 수량 / 직전 수량) 비율로 줄이고, 매수는 원가를 더한다
+    ratio = np.ones(len(is_sell))
+    shrink = is_sell & (before > 0)
+    ratio[shrink] = ev['level'][shrink] / before[shrink]
+    cost = affine_scan(ratio, np.where(is_sell, 0, ev['total_amount']), ev['starts'])
+    price_basis = affine_scan(ratio, np.where(is_sell, 0, ev['price'] * ev['quantity']), ev['starts'])
+
+    # 보유량이 0에서 다시 생긴 시점을 포지션 진입일로 사용
+    idx = np.arange(len(is_sell))
+    opened = np.maximum.accumulate(np.where(~is_sell & (before == 0), idx, 0))
+
+    # 체결된 매도는 구간 첫 이벤트가 아니므로 직전 이벤트 값이 같은 pair의 보유 원가다
+    sells = np.flatnonzero(ev['filled'] > 0)
+    quantity = ev['filled'][sells]
+    held = before[sells]
+    realized_cost = _pro_rata(cost[sells - 1], quantity, held)
+    round_trips = _round_trip_table(
+        ev, sells, quantity, realized_cost, price_basis[sells - 1] / held, ev['ts'][opened[sells]]
+    )
+    # 평균단가는 pair별 보유분 전체가 로트 하나 (진입일은 보유량이 0에서 다시 생긴 시점)
+    ends = np.flatnonzero(ev['ends'])
+    ends = ends[ev['level'][ends] > 0]
+    lots = _open_lots(ev, opened[ends], ev['level'][ends], cost[ends])
+    return round_trips, _positions(ev, cost[ev['ends']]), lots
+
+
+def match_lots(transactions, method='fifo', open_lots=False):
+    """수량 기준 로트 매칭 (FIFO / LIFO / 평균단가, 부분 체결 분할)
+
+    반환값은 (라운드트립 테이블, 잔여 포지션 테이블)이다. 라운드트립은 체결 조각 단위이며
+    match_round_trips와 같은 컬럼과 트레이더 → 종목 등장 순서를 따른다. open_lots=True면
+    매칭 후 남은 매수 로트 테이블(OPEN_LOT_COLUMNS)을 세 번째로 함께 반환한다.
+    """
+    if method not in LOT_METHODS:
+        raise ValueError(f"Unknown lot method: {method} (choose from {', '.join(LOT_METHODS)})")
+    if len(transactions) == 0:
+        result = (pd.DataFrame(columns=ROUND_TRIP_COLUMNS), pd.DataFrame(columns=POSITION_COLUMNS),
+                  pd.DataFrame(columns=OPEN_LOT_COLUMNS))
+    else:
+        ev = _events(transactions)
+        result = {'fifo': _match_fifo, 'lifo': _match_lifo, 'average': _match_average}[method](ev)
+    return result if open_lots else result[:2]
+
+
+def last_prices(transactions):
+    """종목별 마지막 체결 가격 (평가 기준가)"""
+    if len(transactions) == 0:
+        return {}
+    symbol_codes, symbol_uniques = pd.factorize(transactions['symbol'], sort=False)
+    ts = transactions['datetime'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    order = np.lexsort((ts, symbol_codes))
+    last = order[np.append(np.diff(symbol_codes[order]) != 0, True)]
+    prices = transactions['price'].to_numpy(dtype=np.float64)[last]
+    return dict(zip(np.asarray(symbol_uniques, dtype=object)[symbol_codes[last]].tolist(), prices.tolist()))
+
+
+def position_records(positions):
+    """잔여 포지션 테이블 → trader_id → 포지션 목록 (평가 전)"""
+    result = {}
+    for record in positions.to_dict('records'):
+        result.setdefault(record.pop('trader_id'), []).append(record)
+    return result
+
+
+def mark_positions(records, prices):
+    """포지션을 종목별 마지막 체결 가격으로 평가한 미실현 인벤토리"""
+    inventory = []
+    for record in records:
+        quantity, cost_basis = record['quantity'], float(record['cost_basis'])
+        last_price = prices.get(record['symbol'])
+        market_value = quantity * last_price if last_price is not None else None
+        inventory.append({
+            'symbol': record['symbol'],
+            'quantity': quantity,
+            'avg_cost': round(cost_basis / quantity, 2) if quantity else 0,
+            'cost_basis': round(cost_basis, 2),
+            'last_price': last_price,
+            'market_value': round(market_value, 2) if market_value is not None else None,
+            'unrealized_pnl': round(market_value - cost_basis, 2) if market_value is not None else None,
+            'unmatched_sell_quantity': record['unmatched_sell_quantity']
+        })
+    return inventory
+
+
+def inventory_by_trader(positions, prices):
+    """trader_id → 평가된 미실현 인벤토리 목록"""
+    return {
+        trader_id: mark_positions(records, prices)
+        for trader_id, records in position_records(positions).items()
+    }
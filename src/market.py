@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+from segments import segment_bounds
+
+CLOSE_SUFFIX = '_close'
+SENTIMENT_COLUMN = 'market_sentiment'
+MIN_PERIODS = 3
+
+
+def load_benchmarks(benchmarks_file):
+    """지수 종가/시장 심리 CSV 로드 (날짜 오름차순)"""
+    benchmarks = pd.read_csv(benchmarks_file)
+    benchmarks['date'] = pd.to_datetime(benchmarks['date'])
+    return benchmarks.sort_values('date', kind='stable').reset_index(drop=True)
+
+
+def benchmark_symbols(benchmarks):
+    """'<심볼>_close' 컬럼에서 지수 심볼 목록"""
+    return [c[:-len(CLOSE_SUFFIX)] for c in benchmarks.columns if c.endswith(CLOSE_SUFFIX)]
+
+
+def _round(values, digits=2):
+    """NaN/inf는 None, 나머지는 반올림한 float"""
+    return [round(v, digits) if np.isfinite(v) else None for v in values.tolist()]
+
+
+def benchmark_stats(round_trips, account_sizes, benchmarks):
+    """전체 트레이더의 지수 대비 베타/알파/상관/추적오차/정보비율과 시장 심리 구간별 성과
+
+    벤치마크 행 사이를 한 구간으로 보고, 청산일 기준 실현 손익을 다음 벤치마크 날짜에
+    as-of로 붙여 구간 수익률(손익 / account_size)을 만든다. 트레이더의 첫 구간부터 마지막
+    구간까지를 활동 구간으로 두고 (트레이더 x 구간) 행렬 곱 한 번으로 모든 지수를 회귀한다.
+    반환값은 trader_id → 지표 딕셔너리이며, 겹치는 구간이 없는 트레이더는 빠진다.
+    """
+    dates = benchmarks['date'].to_numpy(dtype='datetime64[D]')
+    if len(round_trips) == 0 or len(dates) < 2:
+        return {}
+
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    traders = trader_ids[starts]
+    capital = np.array([account_sizes.get(t, np.nan) for t in traders.tolist()], dtype=np.float64)
+    capital[~(capital > 0)] = np.nan
+
+    # 청산일 → 그 날짜 이후 첫 벤치마크 날짜가 끝나는 구간 (구간 p = (date[p-1], date[p]])
+    sell_days = round_trips['sell_date'].to_numpy(dtype='datetime64[D]')
+    period = np.searchsorted(dates, sell_days, side='left')
+    seg = np.repeat(np.arange(len(traders)), counts)
+    inside = (period >= 1) & (period < len(dates))
+    n_traders, n_periods = len(traders), len(dates) - 1
+
+    cell = seg[inside] * n_periods + (period[inside] - 1)
+    pnl = np.bincount(
+        cell, weights=round_trips['pnl'].to_numpy(dtype=np.float64)[inside],
+        minlength=n_traders * n_periods
+    ).reshape(n_traders, n_periods)
+    returns = pnl / capital[:, None]
+
+    # 활동 구간 마스크: 트레이더의 첫 구간 ~ 마지막 구간
+    first = np.full(n_traders, n_periods)
+    last = np.full(n_traders, -1)
+    np.minimum.at(first, seg[inside], period[inside] - 1)
+    np.maximum.at(last, seg[inside], period[inside] - 1)
+    columns = np.arange(n_periods)
+    active = ((columns >= first[:, None]) & (columns <= last[:, None])).astype(np.float64)
+    active[np.isnan(capital)] = 0
+    returns = np.where(active > 0, returns, 0)
+
+    symbols = benchmark_symbols(benchmarks)
+    closes = benchmarks[[f'{s}{CLOSE_SUFFIX}' for s in symbols]].to_numpy(dtype=np.float64)
+    market = closes[1:] / closes[:-1] - 1  # (구간 x 지수)
+    gap_days = (dates[-1] - dates[0]).astype(np.int64) / n_periods
+    periods_per_year = 365 / gap_days
+
+    n = active.sum(axis=1)[:, None]
+    sum_y = returns.sum(axis=1)[:, None]
+    sum_yy = (returns ** 2).sum(axis=1)[:, None]
+    sum_x = active @ market
+    sum_xx = active @ market ** 2
+    sum_xy = returns @ market
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_y, mean_x = sum_y / n, sum_x / n
+        var_y = (sum_yy - sum_y * mean_y) / (n - 1)
+        var_x = (sum_xx - sum_x * mean_x) / (n - 1)
+        cov = (sum_xy - sum_y * mean_x) / (n - 1)
+        beta = cov / var_x
+        alpha = (mean_y - beta * mean_x) * periods_per_year * 100
+        correlation = cov / np.sqrt(var_x * var_y)
+        active_var = np.maximum(var_y + var_x - 2 * cov, 0)
+        tracking_error = np.sqrt(active_var * periods_per_year) * 100
+        information_ratio = (mean_y - mean_x) / np.sqrt(active_var) * np.sqrt(periods_per_year)
+    enough = (n >= MIN_PERIODS) & (var_x > 0)
+    metrics = {
+        'beta': beta, 'alpha_pct': alpha, 'correlation': correlation,
+        'tracking_error_pct': tracking_error, 'information_ratio': information_ratio
+    }
+    metrics = {name: np.where(enough, values, np.nan) for name, values in metrics.items()}
+
+    # 시장 심리 구간별 성과: 구간 지시 행렬과의 곱
+    regimes = {}
+    if SENTIMENT_COLUMN in benchmarks.columns:
+        sentiment = benchmarks[SENTIMENT_COLUMN].to_numpy(dtype=object)[1:]
+        for label in pd.unique(sentiment).tolist():
+            mask = active * (sentiment == label)
+            periods = mask.sum(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                regimes[label] = {
+                    'periods': periods,
+                    'total_pnl': (pnl * mask).sum(axis=1),
+                    'avg_return_pct': (returns * mask).sum(axis=1) / periods * 100,
+                    'hit_rate': ((returns > 0) * mask).sum(axis=1) / periods * 100
+                }
+
+    results = {}
+    rounded = {name: [_round(values[:, j]) for j in range(len(symbols))] for name, values in metrics.items()}
+    regime_rows = {
+        label: {name: _round(values) for name, values in stats.items()}
+        for label, stats in regimes.items()
+    }
+    for i, trader_id in enumerate(traders.tolist()):
+        if n[i, 0] == 0:
+            continue
+        record = {'periods': int(n[i, 0])}
+        for j, symbol in enumerate(symbols):
+            record[symbol] = {name: rounded[name][j][i] for name in metrics}
+        record['regimes'] = {
+            label: {
+                'periods': int(regimes[label]['periods'][i]),
+                'total_pnl': rows['total_pnl'][i],
+                'avg_return_pct': rows['avg_return_pct'][i],
+                'hit_rate': rows['hit_rate'][i]
+            }
+            for label, rows in regime_rows.items()
+            if regimes[label]['periods'][i] > 0
+        }
+        results[trader_id] = record
+    return results
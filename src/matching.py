@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from segments import run_starts, rank_within_runs, segment_bounds
+
+ROUND_TRIP_COLUMNS = [
+    'trader_id', 'symbol', 'buy_date', 'sell_date', 'buy_price',
+    'sell_price', 'quantity', 'pnl', 'pnl_pct', 'hold_days'
+]
+
+
+def _rank_sides(transactions):
+    """(trader, symbol, side) 그룹 내 시간순 순번과 매칭 여부 계산"""
+    trader_codes, trader_uniques = pd.factorize(transactions['trader_id'], sort=False)
+    symbol_codes, symbol_uniques = pd.factorize(transactions['symbol'], sort=False)
+    pair_key = trader_codes.astype(np.int64) * len(symbol_uniques) + symbol_codes
+    # 전역 등장 순서 = 트레이더 내부의 종목 등장 순서
+    pair_codes, _ = pd.factorize(pair_key, sort=False)
+
+    is_sell = (transactions['side'] != 'Buy').to_numpy(dtype=bool)
+    ts = transactions['datetime'].to_numpy(dtype='datetime64[ns]')
+
+    # (종목 그룹, 매수/매도, 시간) 안정 정렬 후 그룹 내 순번 부여
+    order = np.lexsort((ts.view(np.int64), is_sell, pair_codes))
+    pair_sorted = pair_codes[order]
+    sell_sorted = is_sell[order]
+    rank = rank_within_runs(run_starts(pair_sorted, sell_sorted))
+
+    n_pairs = pair_codes.max() + 1
+    n_buys = np.bincount(pair_sorted[~sell_sorted], minlength=n_pairs)
+    n_sells = np.bincount(pair_sorted[sell_sorted], minlength=n_pairs)
+    n_matched = np.minimum(n_buys, n_sells)
+
+    return {
+        'trader_codes': trader_codes,
+        'trader_uniques': np.asarray(trader_uniques, dtype=object),
+        'symbol_codes': symbol_codes,
+        'symbol_uniques': np.asarray(symbol_uniques, dtype=object),
+        'pair_codes': pair_codes,
+        'ts': ts,
+        'order': order,
+        'sell_sorted': sell_sorted,
+        'rank': rank,
+        'keep': rank < n_matched[pair_sorted]
+    }
+
+
+def match_round_trips(transactions):
+    """전체 트레이더의 매수/매도를 (trader, symbol) 그룹별 순번으로 일괄 매칭
+
+    기존 로직과 동일하게 그룹 내 시간순 i번째 매수와 i번째 매도를 짝짓고,
+    결과는 트레이더 등장 순서 → 종목 등장 순서 → 순번 순으로 정렬된다.
+    """
+    if len(transactions) == 0:
+        return pd.DataFrame(columns=ROUND_TRIP_COLUMNS)
+    return _build_round_trips(transactions, _rank_sides(transactions))
+
+
+def match_with_leftovers(transactions):
+    """라운드트립 테이블과 짝이 없는 행 위치를 함께 반환 (청크 간 미청산 로트 이월용)"""
+    if len(transactions) == 0:
+        return pd.DataFrame(columns=ROUND_TRIP_COLUMNS), np.array([], dtype=np.int64)
+    ranked = _rank_sides(transactions)
+    return _build_round_trips(transactions, ranked), np.sort(ranked['order'][~ranked['keep']])
+
+
+def _build_round_trips(transactions, ranked):
+    """순번이 매겨진 매수/매도 행으로 라운드트립 테이블 구성"""
+    trader_codes = ranked['trader_codes']
+    order, keep, sell_sorted = ranked['order'], ranked['keep'], ranked['sell_sorted']
+    buy_rows = order[keep & ~sell_sorted]
+    sell_rows = order[keep & sell_sorted]
+
+    # 트레이더 → 종목 등장 순서 → 순번으로 재정렬
+    out_order = np.lexsort((ranked['rank'][keep & ~sell_sorted], ranked['pair_codes'][buy_rows], trader_codes[buy_rows]))
+    buy_rows = buy_rows[out_order]
+    sell_rows = sell_rows[out_order]
+    ts = ranked['ts']
+
+    buy_total = transactions['total_amount'].to_numpy(dtype=np.float64)[buy_rows]
+    sell_total = transactions['total_amount'].to_numpy(dtype=np.float64)[sell_rows]
+    price = transactions['price'].to_numpy()
+    pnl = sell_total - buy_total
+    buy_date = ts[buy_rows]
+    sell_date = ts[sell_rows]
+
+    return pd.DataFrame({
+        'trader_id': ranked['trader_uniques'][trader_codes[buy_rows]],
+        'symbol': ranked['symbol_uniques'][ranked['symbol_codes'][buy_rows]],
+        'buy_date': buy_date,
+        'sell_date': sell_date,
+        'buy_price': price[buy_rows],
+        'sell_price': price[sell_rows],
+        'quantity': transactions['quantity'].to_numpy()[buy_rows],
+        'pnl': pnl,
+        'pnl_pct': (pnl / buy_total) * 100,
+        'hold_days': (sell_date - buy_date) // np.timedelta64(1, 'D')
+    })
+
+
+def unmatched_rows(transactions):
+    """짝이 없는 매수/매도(미청산 로트)의 원본 행 위치 (원래 순서)"""
+    if len(transactions) == 0:
+        return np.array([], dtype=np.int64)
+    ranked = _rank_sides(transactions)
+    return np.sort(ranked['order'][~ranked['keep']])
+
+
+def trader_slices(round_trips):
+    """트레이더별로 연속된 라운드트립 구간 (trader_id → slice)"""
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    return {trader_ids[s]: slice(s, s + n) for s, n in zip(starts, counts)}
@@ -3,12 +3,17 @@ import os
 from pathlib import Path
 from typing import Optional, Dict, List
 
+from refresher import DataRefresher
+from trader_store import TraderStore, default_store_dir, is_store
+
 class DesktopCommanderClient:
     """MCP Desktop Commander 클라이언트"""
     
     def __init__(self, config_path: str = 'mcp_config.json'):
         self.config = self._load_config(config_path)
         self.data_dir = self.config.get('data_directory', 'data')
+        self._stores = {}
+        self.refresher = None
         
     def _load_config(self, config_path: str) -> Dict:
         """MCP 설정 로드"""
@@ -58,6 +63,36 @@ class DesktopCommanderClient:
             print(f"[ERROR] Failed to read {filename}: {e}")
             return None
     
+    def _store(self, filename: str) -> Optional[TraderStore]:
+        """리포트 옆 트레이더 저장소 (analyzer.py --store로 생성, 인덱스가 바뀌면 다시 연다)"""
+        store_dir = default_store_dir(os.path.join(self.data_dir, filename))
+        if not is_store(store_dir):
+            print(f"[ERROR] Trader store not found: {store_dir} (run analyzer.py --store)")
+            return None
+        mtime = os.path.getmtime(os.path.join(store_dir, 'index.json'))
+        cached = self._stores.get(store_dir)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, TraderStore(store_dir))
+            self._stores[store_dir] = cached
+        return cached[1]
+    
+    def read_index(self, filename: str = 'analysis_results.json') -> Optional[List[Dict]]:
+        """트레이더 인덱스(ID, 이름, 핵심 지표)만 읽기 - 전체 리포트를 파싱하지 않음"""
+        store = self._store(filename)
+        if store is None:
+            return None
+        return [store.index_row(trader_id) for trader_id in store]
+    
+    def read_trader(self, trader_id: str, filename: str = 'analysis_results.json') -> Optional[Dict]:
+        """트레이더 한 명의 전체 레코드 읽기 (저장소 샤드에서 해당 레코드만)"""
+        store = self._store(filename)
+        if store is None:
+            return None
+        record = store.get(trader_id)
+        if record is None:
+            print(f"[ERROR] Trader not found: {trader_id}")
+        return record
+    
     def list_files(self, directory: Optional[str] = None) -> List[str]:
         """디렉토리 파일 목록"""
         target_dir = directory if directory else self.data_dir
@@ -97,10 +132,28 @@ class DesktopCommanderClient:
             print(f"[ERROR] Failed to get file info: {e}")
             return None
     
+    def watch(self, build, paths: List[str] = (), on_swap=None, initial=None) -> DataRefresher:
+        """watch_files(+ paths)가 바뀌면 build()로 새로 만들어 교체하는 리프레셔
+        
+        auto_refresh가 켜져 있으면 refresh_interval초마다 확인하는 백그라운드 스레드를 시작한다.
+        """
+        watched = [os.path.join(self.data_dir, f) for f in self.config.get('watch_files', [])]
+        watched += [path for path in paths if path not in watched]
+        self.refresher = DataRefresher(build, watched, self.config.get('refresh_interval', 60), on_swap, initial)
+        if self.config.get('auto_refresh', False):
+            self.refresher.start()
+        return self.refresher
+    
     def refresh_data(self) -> bool:
-        """데이터 새로고침"""
+        """데이터 새로고침 (리프레셔가 있으면 바뀐 파일이 있을 때 바로 다시 로드)"""
         print("[INFO] Refreshing data...")
         
+        if self.refresher is not None:
+            reloaded = self.refresher.refresh()
+            if not reloaded and self.refresher.last_error is None:
+                print("[OK] Data files are up to date")
+            return self.refresher.last_error is None
+        
         # analysis_results.json 존재 확인
         if self.file_exists('analysis_results.json'):
             print("[OK] Data files are up to date")
@@ -116,6 +169,14 @@ class DesktopCommanderClient:
             'files': {},
             'total_files': 0
         }
+        if self.refresher is not None:
+            status['refresh'] = {
+                'running': self.refresher.running,
+                'interval': self.refresher.interval,
+                'version': self.refresher.version,
+                'loaded_at': self.refresher.loaded_at,
+                'last_error': self.refresher.last_error
+            }
         
         for filename in self.config.get('watch_files', []):
             if self.file_exists(filename):
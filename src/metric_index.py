@@ -0,0 +1,89 @@
+import math
+import numbers
+
+import numpy as np
+
+# search_by_metric 비교 연산자 → (searchsorted 하한 side, 상한 side) (None은 끝까지)
+OPERATORS = {
+    '>': ('right', None),
+    '>=': ('left', None),
+    '<': (None, 'left'),
+    '<=': (None, 'right'),
+    '==': ('left', 'right'),
+}
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def is_metric_value(value):
+    """정렬 인덱스에 넣을 수 있는 숫자 값인지 (bool/None/딕셔너리/NaN/inf 제외)"""
+    return _is_number(value) and math.isfinite(value)
+
+
+class SortedMetricIndex:
+    """지표 하나의 정렬된 값 배열과 순열 (상위 N은 슬라이스, 임계값/범위는 이진 탐색)
+
+    값이 없는(None/숫자가 아닌/NaN/inf) 트레이더는 빠진다 (NaN은 argsort에서 맨 뒤로 가
+    '>' 결과에 섞이므로). 동률은 원래 트레이더 순서를 유지해 기존 sorted(..., reverse=...)
+    결과와 같은 순서를 낸다.
+    """
+
+    def __init__(self, pairs):
+        pairs = [(trader_id, value) for trader_id, value in pairs if _is_number(value)]
+        trader_ids = np.array([trader_id for trader_id, _ in pairs], dtype=object)
+        values = np.array([value for _, value in pairs], dtype=np.float64)
+        finite = np.isfinite(values)
+        self.trader_ids, values = trader_ids[finite], values[finite]
+        self._ascending = np.argsort(values, kind='stable')
+        self._descending = np.argsort(-values, kind='stable')
+        self.values = values[self._ascending]
+
+    def __len__(self):
+        return len(self.values)
+
+    def top(self, top_n, ascending=False):
+        """값 순 상위 top_n개 trader_id"""
+        order = self._ascending if ascending else self._descending
+        return self.trader_ids[order[:top_n]].tolist()
+
+    def ranked_ids(self):
+        """값 오름차순 trader_id 배열 (span()이 돌려주는 위치와 같은 순서)"""
+        return self.trader_ids[self._ascending]
+
+    def _ids(self, lo, hi):
+        """정렬 위치 [lo, hi) → 원래 트레이더 순서의 trader_id 목록"""
+        return self.trader_ids[np.sort(self._ascending[lo:hi])].tolist()
+
+    def span(self, threshold, operator='>'):
+        """조건을 만족하는 정렬 위치 구간 (lo, hi) (모르는 연산자면 None)
+
+        operator가 'between'이면 threshold는 (low, high) 닫힌 구간이며 None은 열린 경계다.
+        """
+        if operator == 'between':
+            low, high = threshold
+            lo = 0 if low is None else int(np.searchsorted(self.values, low, 'left'))
+            hi = len(self.values) if high is None else int(np.searchsorted(self.values, high, 'right'))
+            return lo, max(lo, hi)
+        sides = OPERATORS.get(operator)
+        if sides is None:
+            return None
+        lo_side, hi_side = sides
+        lo = 0 if lo_side is None else int(np.searchsorted(self.values, threshold, lo_side))
+        hi = len(self.values) if hi_side is None else int(np.searchsorted(self.values, threshold, hi_side))
+        return lo, max(lo, hi)
+
+    def count(self, threshold, operator='>'):
+        """조건을 만족하는 트레이더 수 (이진 탐색만, 모르는 연산자면 None)"""
+        bounds = self.span(threshold, operator)
+        return None if bounds is None else bounds[1] - bounds[0]
+
+    def select(self, threshold, operator='>'):
+        """값 operator threshold인 trader_id 목록 (원래 순서, 모르는 연산자면 [])"""
+        bounds = self.span(threshold, operator)
+        return [] if bounds is None else self._ids(*bounds)
+
+    def between(self, low=None, high=None):
+        """low <= 값 <= high인 trader_id 목록 (None은 열린 경계, 원래 순서)"""
+        return self._ids(*self.span((low, high), 'between'))
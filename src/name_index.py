@@ -0,0 +1,139 @@
+from collections import defaultdict
+
+import numpy as np
+
+# 한글 음절 → 초성/중성/종성 분해 상수 (유니코드 조합형 자모)
+_HANGUL_BASE, _HANGUL_LAST = 0xAC00, 0xD7A3
+_CHOSEONG, _JUNGSEONG, _JONGSEONG = 0x1100, 0x1161, 0x11A7
+_BOUNDARY = '\x00'  # 이름 앞뒤 경계 표시 (유사 이름 후보용 n-gram)
+NGRAM = 2
+CANDIDATES = 12  # 편집 거리를 계산할 후보 (고유 이름) 수
+
+
+def decompose(text):
+    """한글 음절은 자모로 풀고 나머지 글자는 소문자로 (예: '김민' → '김민')"""
+    out = []
+    for char in text.strip().lower():
+        code = ord(char)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            offset = code - _HANGUL_BASE
+            out.append(chr(_CHOSEONG + offset // 588))
+            out.append(chr(_JUNGSEONG + offset % 588 // 28))
+            if offset % 28:
+                out.append(chr(_JONGSEONG + offset % 28))
+        else:
+            out.append(char)
+    return ''.join(out)
+
+
+def ngrams(jamo, bounded=False):
+    """자모 문자열의 n-gram 집합 (bounded면 앞뒤 경계 포함)"""
+    if bounded:
+        jamo = f"{_BOUNDARY}{jamo}{_BOUNDARY}"
+    return {jamo[i:i + NGRAM] for i in range(len(jamo) - NGRAM + 1)}
+
+
+def edit_distance(a, b):
+    """레벤슈타인 거리 (후보 몇 개에만 쓰는 짧은 문자열용)"""
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, cb in enumerate(b):
+            cost = previous[j] if ca == cb else previous[j] + 1
+            if previous[j + 1] + 1 < cost:
+                cost = previous[j + 1] + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left = cost
+        previous = current
+    return previous[-1]
+
+
+def _top_overlap(overlap, top_n):
+    """겹친 n-gram 수 상위 top_n개 이름 번호 (같은 수는 번호 순)
+
+    값이 작은 정수라 동률이 많아 argpartition이 느리므로, 값별 개수로 하한을 정한 뒤
+    그 이상인 후보만 정렬한다.
+    """
+    counts = np.bincount(overlap)
+    counts[0] = 0
+    at_least = np.cumsum(counts[::-1])[::-1]
+    cut = int(np.flatnonzero(at_least >= top_n)[-1]) if at_least[1] >= top_n else 1
+    hits = np.flatnonzero(overlap >= cut)
+    return hits[np.argsort(-overlap[hits], kind='stable')[:top_n]]
+
+
+class NameIndex:
+    """트레이더 ID/이름 조회용 해시 맵과 자모 n-gram 역색인
+
+    ID와 이름은 해시 조회 한 번으로 찾고, 부분 문자열은 질의 n-gram의 역색인 교집합만
+    확인한다. 역색인은 고유 이름 단위이며, 유사 이름은 겹치는 n-gram이 많은 후보 몇 개에만
+    자모 단위 편집 거리를 계산한다.
+    """
+
+    def __init__(self, pairs):
+        self.trader_ids = []
+        self._by_id = {}
+        self._by_name = {}  # 이름 → 그 이름의 첫 트레이더 위치
+        postings = defaultdict(list)
+        for position, (trader_id, name) in enumerate(pairs):
+            name = '' if name is None else str(name)
+            self.trader_ids.append(trader_id)
+            self._by_id.setdefault(str(trader_id).upper(), position)
+            if name not in self._by_name:
+                name_id = len(self._by_name)
+                self._by_name[name] = position
+                for gram in ngrams(decompose(name), bounded=True):
+                    postings[gram].append(name_id)
+        self.names = list(self._by_name)
+        self._first = np.array(list(self._by_name.values()), dtype=np.int64)
+        self._jamo = [decompose(name) for name in self.names]
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.trader_ids)
+
+    def find(self, query):
+        """ID 또는 이름으로 trader_id 찾기 (ID → 이름 일치 → 이름에 질의가 포함된 첫 트레이더)
+
+        부분 문자열 비교는 기존 search_by_trader처럼 대문자로 바꾼 질의로 한다.
+        """
+        query = query.strip().upper()
+        for exact in (self._by_id, self._by_name):
+            position = exact.get(query)
+            if position is not None:
+                return self.trader_ids[position]
+
+        grams = ngrams(decompose(query))
+        if not all(gram in self._postings for gram in grams):
+            return None
+        if grams:
+            lists = sorted((self._postings[gram] for gram in grams), key=len)
+            candidates = lists[0]
+            for ids in lists[1:]:
+                candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            candidates = candidates.tolist()
+        else:
+            candidates = range(len(self.names))  # n-gram보다 짧은 질의 (예: 한 글자 영문)
+        positions = [self._first[i] for i in candidates if query in self.names[i]]
+        return self.trader_ids[min(positions)] if positions else None
+
+    def similar(self, query, top_n=3):
+        """질의와 비슷한 이름 (겹치는 n-gram 상위 후보 중 자모 편집 거리 순)"""
+        jamo = decompose(query)
+        lists = [self._postings[gram] for gram in ngrams(jamo, bounded=True) if gram in self._postings]
+        if not lists or not jamo:
+            return []
+        overlap = np.bincount(np.concatenate(lists), minlength=len(self.names))
+
+        scored = []
+        for name_id in _top_overlap(overlap, CANDIDATES).tolist():
+            name_jamo = self._jamo[name_id]
+            distance = edit_distance(jamo, name_jamo)
+            # 길이 차이를 뺀 나머지 편집이 짧은 쪽의 절반 이하인 이름만 제안
+            if distance - abs(len(jamo) - len(name_jamo)) <= min(len(jamo), len(name_jamo)) // 2:
+                scored.append((distance, -int(overlap[name_id]), int(self._first[name_id]), name_id))
+        scored.sort()
+        return [self.names[name_id] for *_, name_id in scored[:top_n]]
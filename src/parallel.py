@@ -0,0 +1,140 @@
+import heapq
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from segments import segment_bounds, expand_ranges
+from matching import match_round_trips
+from lots import match_lots
+from market import benchmark_stats
+from bootstrap import bootstrap_intervals
+from batch_metrics import compute_all_metrics, compute_all_patterns
+
+
+def shard_traders(row_counts, n_shards):
+    """행 수 가중치로 트레이더를 균형 분할 (큰 트레이더부터 가장 가벼운 샤드에 배정)"""
+    row_counts = np.asarray(row_counts)
+    heap = [(0, i) for i in range(n_shards)]
+    shards = [[] for _ in range(n_shards)]
+    for trader in np.argsort(-row_counts, kind='stable').tolist():
+        load, i = heapq.heappop(heap)
+        shards[i].append(trader)
+        heapq.heappush(heap, (load + int(row_counts[trader]), i))
+    return [np.sort(np.array(shard, dtype=np.int64)) for shard in shards if shard]
+
+
+def _encode(transactions):
+    """트레이더 순으로 안정 정렬한 숫자 컬럼과 라벨"""
+    trader_codes, trader_labels = pd.factorize(transactions['trader_id'], sort=False)
+    symbol_codes, symbol_labels = pd.factorize(transactions['symbol'], sort=False)
+    order = np.argsort(trader_codes, kind='stable')
+    columns = {
+        'trader': trader_codes[order].astype(np.int32),
+        'symbol': symbol_codes[order].astype(np.int32),
+        'is_sell': (transactions['side'] != 'Buy').to_numpy(dtype=bool)[order],
+        'datetime': transactions['datetime'].to_numpy(dtype='datetime64[ns]')[order],
+        'quantity': transactions['quantity'].to_numpy()[order],
+        'price': transactions['price'].to_numpy(dtype=np.float64)[order],
+        'total_amount': transactions['total_amount'].to_numpy(dtype=np.float64)[order]
+    }
+    labels = {
+        'trader_id': np.asarray(trader_labels, dtype=object),
+        'symbol': np.asarray(symbol_labels, dtype=object)
+    }
+    return columns, labels
+
+
+def _decode(columns, labels):
+    """공유 메모리에서 꺼낸 컬럼으로 분석용 DataFrame 복원"""
+    return pd.DataFrame({
+        'trader_id': pd.Categorical.from_codes(columns['trader'], labels['trader_id']),
+        'symbol': pd.Categorical.from_codes(columns['symbol'], labels['symbol']),
+        'side': pd.Categorical.from_codes(columns['is_sell'].astype(np.int8), ['Buy', 'Sell']),
+        'datetime': columns['datetime'],
+        'quantity': columns['quantity'],
+        'price': columns['price'],
+        'total_amount': columns['total_amount']
+    })
+
+
+def _analyze_shard(specs, labels, starts, counts, lot_method=None, benchmarks=None, account_sizes=None,
+                   bootstrap=None):
+    """워커: 공유 메모리에서 담당 트레이더 행만 복사해 일괄 분석"""
+    rows = expand_ranges(starts, counts)
+    columns = {}
+    for name, (shm_name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        try:
+            columns[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[rows]
+        finally:
+            shm.close()
+
+    frame = _decode(columns, labels)
+    if lot_method:
+        round_trips, positions = match_lots(frame, lot_method)
+    else:
+        round_trips, positions = match_round_trips(frame), None
+    stats = benchmark_stats(round_trips, account_sizes, benchmarks) if benchmarks is not None else None
+    confidence = bootstrap_intervals(round_trips, bootstrap) if bootstrap else None
+    return compute_all_metrics(round_trips), compute_all_patterns(frame), positions, stats, confidence
+
+
+def analyze_in_parallel(transactions, workers, lot_method=None, benchmarks=None, account_sizes=None,
+                        bootstrap=None):
+    """트레이더 샤드를 프로세스 풀에서 분석하고 트레이더 등장 순서로 병합
+
+    반환값은 (performances, patterns, positions, benchmark_stats, confidence)로 compute_all_metrics /
+    compute_all_patterns와 같은 딕셔너리, 로트 매칭 잔여 포지션 테이블(기존 순번 매칭이면 None),
+    지수 대비 지표(벤치마크가 없으면 None), 부트스트랩 신뢰구간(bootstrap이 없으면 None)이다.
+    """
+    columns, labels = _encode(transactions)
+    starts, counts = segment_bounds(columns['trader'])
+    shards = shard_traders(counts, workers)
+
+    blocks = []
+    try:
+        specs = {}
+        for name, array in columns.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[:] = array
+            specs[name] = (shm.name, array.shape, array.dtype.str)
+        del columns
+
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            futures = [
+                pool.submit(
+                    _analyze_shard, specs, labels, starts[shard], counts[shard],
+                    lot_method, benchmarks, account_sizes, bootstrap
+                )
+                for shard in shards
+            ]
+            parts = [future.result() for future in futures]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    performances, patterns = {}, {}
+    for shard_performances, shard_patterns, _, _, _ in parts:
+        performances.update(shard_performances)
+        patterns.update(shard_patterns)
+
+    # 완료 순서와 무관하게 트레이더 등장 순서로 정렬
+    trader_ids = labels['trader_id'].tolist()
+    performances = {tid: performances[tid] for tid in trader_ids if tid in performances}
+    patterns = {tid: patterns[tid] for tid in trader_ids}
+    positions = stats = confidence = None
+    if lot_method:
+        positions = pd.concat([part[2] for part in parts], ignore_index=True)
+    if benchmarks is not None:
+        stats = {}
+        for part in parts:
+            stats.update(part[3])
+    if bootstrap:
+        confidence = {}
+        for part in parts:
+            confidence.update(part[4])
+    return performances, patterns, positions, stats, confidence
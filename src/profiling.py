@@ -0,0 +1,168 @@
+import cProfile
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from incremental import write_json_atomic
+
+SLOWEST_TRADERS = 20
+_MB = 1024 * 1024
+
+
+def default_profile_path(output_file, extension='profile.json'):
+    """리포트 파일 옆에 두는 프로파일 결과 경로 (.profile.json / .prof)"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.{extension}"
+
+
+def _max_rss_mb():
+    """프로세스 최대 RSS (resource 모듈이 없는 플랫폼이면 None)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux는 KB 단위
+
+
+class StageProfiler:
+    """단계별 벽시계/CPU 시간, 처리 행 수, 피크 메모리 계측
+
+    같은 이름의 단계는 호출마다 누적되고, 중첩된 단계의 시간은 바깥 단계에도 포함된다.
+    피크 메모리는 tracemalloc 기준으로 단계 시작 시점 대비 추가로 잡힌 최대 할당량이다.
+    enabled=False면 stage()가 아무것도 측정하지 않아 계측 코드를 그대로 둘 수 있다.
+    """
+
+    def __init__(self, enabled=True, track_memory=True, per_trader=False, cprofile=False):
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.per_trader = enabled and per_trader
+        self.stages = {}
+        self.traders = {}
+        self._cprofile = cprofile and enabled
+        self._profile = None
+        self._peaks = []
+        self._started = None
+
+    def start(self):
+        """메모리 추적과 cProfile 시작 (분석 시작 전 1회)"""
+        if not self.enabled:
+            return self
+        self._started = time.perf_counter()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if self._cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        """계측 종료"""
+        if self._profile is not None:
+            self._profile.disable()
+        if self.track_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name, rows=None, trader_id=None):
+        """with 블록 하나를 한 단계로 측정 (yield한 딕셔너리의 'rows'를 블록 안에서 채울 수 있음)"""
+        info = {'rows': rows}
+        if not self.enabled:
+            yield info
+            return
+
+        tracing = self.track_memory and tracemalloc.is_tracing()
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            self._peaks.append(0)
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            stage_peak = None
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                peak = max(self._peaks.pop(), peak)
+                if self._peaks:
+                    # 바깥 단계 피크에 이 단계 피크를 넘기고 이후 구간을 새로 측정
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+                tracemalloc.reset_peak()
+                stage_peak = max(peak - current, 0)
+            self._record(name, wall, cpu, info.get('rows'), stage_peak, trader_id)
+
+    def _record(self, name, wall, cpu, rows, peak, trader_id):
+        stats = self.stages.setdefault(
+            name, {'calls': 0, 'wall_sec': 0.0, 'cpu_sec': 0.0, 'rows': 0, 'peak_mb': None}
+        )
+        stats['calls'] += 1
+        stats['wall_sec'] += wall
+        stats['cpu_sec'] += cpu
+        stats['rows'] += int(rows or 0)
+        if peak is not None:
+            stats['peak_mb'] = max(stats['peak_mb'] or 0, peak / _MB)
+        if self.per_trader and trader_id is not None:
+            timings = self.traders.setdefault(trader_id, {})
+            timings[name] = timings.get(name, 0.0) + wall
+
+    def slowest_traders(self, limit=SLOWEST_TRADERS):
+        """단계 합계 시간이 긴 트레이더 순 [(trader_id, 총 시간, 단계별 시간)]"""
+        totals = [(tid, sum(timings.values()), timings) for tid, timings in self.traders.items()]
+        return sorted(totals, key=lambda row: row[1], reverse=True)[:limit]
+
+    def summary(self):
+        """JSON으로 내보낼 계측 결과"""
+        stages = []
+        for name, stats in self.stages.items():
+            wall = stats['wall_sec']
+            stages.append({
+                'stage': name,
+                'calls': stats['calls'],
+                'wall_sec': round(wall, 4),
+                'cpu_sec': round(stats['cpu_sec'], 4),
+                'rows': stats['rows'],
+                'rows_per_sec': round(stats['rows'] / wall) if stats['rows'] and wall > 0 else None,
+                'peak_mb': round(stats['peak_mb'], 1) if stats['peak_mb'] is not None else None
+            })
+        return {
+            'total_wall_sec': round(time.perf_counter() - self._started, 4) if self._started else None,
+            'max_rss_mb': _max_rss_mb(),
+            'stages': stages,
+            'slowest_traders': [
+                {'trader_id': tid, 'total_sec': round(total, 6),
+                 'stages': {name: round(sec, 6) for name, sec in timings.items()}}
+                for tid, total, timings in self.slowest_traders()
+            ]
+        }
+
+    def print_summary(self):
+        """단계별 표 출력"""
+        summary = self.summary()
+        print(f"\n[PROFILE] {'stage':<18} {'calls':>7} {'wall(s)':>9} {'cpu(s)':>9} {'rows':>12} {'peak(MB)':>9}")
+        for row in summary['stages']:
+            peak = '-' if row['peak_mb'] is None else f"{row['peak_mb']:.1f}"
+            print(f"[PROFILE] {row['stage']:<18} {row['calls']:>7} {row['wall_sec']:>9.3f} "
+                  f"{row['cpu_sec']:>9.3f} {row['rows']:>12,} {peak:>9}")
+        for row in summary['slowest_traders'][:5]:
+            print(f"[PROFILE] slow trader {row['trader_id']}: {row['total_sec'] * 1000:.1f}ms")
+
+    def export(self, path):
+        """계측 결과 JSON 저장"""
+        write_json_atomic(path, self.summary(), ensure_ascii=False, indent=2)
+        print(f"[SAVED] {path}")
+
+    def dump_cprofile(self, path):
+        """cProfile 통계를 pstats 형식으로 저장 (snakeviz / python -m pstats로 열람)"""
+        if self._profile is None:
+            return None
+        self._profile.dump_stats(path)
+        print(f"[SAVED] {path}")
+        return path
+
+
+# 계측을 끈 기본 프로파일러 (profiler 인자를 생략한 호출용)
+NULL_PROFILER = StageProfiler(enabled=False)
@@ -0,0 +1,263 @@
+import numpy as np
+
+from activity import DAYPARTS
+from trader_table import TABLE_SECTIONS, Column
+
+# 지원 연산자 ('between'은 (low, high) 닫힌 구간, 'in'은 값 목록, 'contains'는 대소문자 무시 부분 문자열,
+# 'during'은 activity 필드 전용 {'days', 'hours', 'min_share', 'min_trades'})
+COMPARISONS = ('>', '>=', '<', '<=')
+OPERATORS = COMPARISONS + ('==', '!=', 'between', 'in', 'contains', 'during')
+ACTIVITY = 'activity'
+
+
+class Predicate:
+    """필드 조건 하나 (field는 'performance.sharpe_ratio' 또는 섹션 없이 'sharpe_ratio', 활동은 'activity')"""
+
+    __slots__ = ('field', 'op', 'value')
+
+    def __init__(self, field, op, value=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op} (choose from {', '.join(OPERATORS)})")
+        if (field == ACTIVITY) != (op == 'during'):
+            raise ValueError("'during' is only for the activity field")
+        self.field, self.op, self.value = field, op, value
+
+    def __repr__(self):
+        return f"{self.field} {self.op} {self.value!r}"
+
+
+def as_predicate(item):
+    """Predicate 또는 (field, op, value) 튜플 → Predicate"""
+    return item if isinstance(item, Predicate) else Predicate(*item)
+
+
+class QueryEngine:
+    """TraderTable 위의 다중 조건(AND/OR) 질의와 간단한 실행 계획
+
+    AND 질의는 인덱스로 후보 수를 바로 셀 수 있는 조건(지표 정렬 인덱스의 비교/범위,
+    문자열 필드의 값 → 행 번호 해시) 중 가장 적은 것으로 후보를 만들고, 나머지 조건은
+    선택도가 높은 순으로 후보 위의 벡터 마스크로 거른다. OR 질의는 조건별 결과를 합친다.
+    결과는 행 번호 배열이며 order_by/limit을 적용한다.
+
+    performance 지표 조건은 인덱스 경로와 마스크 경로 모두 정렬 인덱스(NaN 제외)로 판정하므로
+    실행 순서와 상관없이 결과가 같다. 엔진은 세션/스레드 사이에 공유되므로 질의별 상태(활동 조건
+    결과)는 인스턴스에 두지 않고 hits 딕셔너리로 넘긴다.
+    """
+
+    def __init__(self, table, metric_index, activity=None):
+        self.table = table
+        self._metric_index = metric_index  # 지표 이름 → SortedMetricIndex (없으면 만들어 캐시)
+        self.activity = activity
+        self._value_indexes = {}
+        self._metric_ranks = {}
+
+    def _resolve(self, field):
+        """필드 이름 → (섹션, 키) (섹션이 없으면 performance → profile → pattern 순으로 찾음)"""
+        if field == ACTIVITY:
+            return ACTIVITY, None
+        section, _, key = field.rpartition('.')
+        if section:
+            if section not in TABLE_SECTIONS:
+                raise ValueError(f"Unknown section: {section}")
+            return section, key
+        for section in TABLE_SECTIONS:
+            if self.table.column(section, key) is not None:
+                return section, key
+        return 'performance', key
+
+    def _column(self, section, key):
+        """(섹션, 키) 컬럼 (테이블에 없는 필드는 레코드에서 한 번 읽어 캐시)"""
+        column = self.table.column(section, key)
+        if column is None:
+            column = self.table.columns[(section, key)] = Column(self.table.values(section, key))
+        return column
+
+    def _value_index(self, section, key):
+        """문자열 필드의 값 → 행 번호 배열 (처음 쓸 때 생성)"""
+        index = self._value_indexes.get((section, key))
+        if index is None:
+            values = self._column(section, key).values
+            order = np.argsort(values.astype(str), kind='stable')
+            labels, starts = np.unique(values[order].astype(str), return_index=True)
+            groups = np.split(order, starts[1:])
+            raw = {str(value): value for value in values.tolist()}
+            index = self._value_indexes[(section, key)] = {
+                raw[label]: np.sort(group) for label, group in zip(labels.tolist(), groups)
+            }
+        return index
+
+    def _ranked(self, key):
+        """지표 → (정렬 인덱스, 값 오름차순 행 번호, 행별 정렬 위치 (인덱스에 없으면 -1)) (처음 쓸 때 생성)"""
+        ranked = self._metric_ranks.get(key)
+        if ranked is None:
+            index = self._metric_index(key)
+            rows = np.array([self.table.position(tid) for tid in index.ranked_ids().tolist()], dtype=np.int64)
+            rank = np.full(len(self.table), -1, dtype=np.int64)
+            rank[rows] = np.arange(len(rows))
+            ranked = self._metric_ranks[key] = (index, rows, rank)
+        return ranked
+
+    def _metric_positions(self, key, op, value):
+        """performance 지표 조건을 만족하는 행 번호 (오름차순, 정렬 인덱스 기준이라 NaN/결측 제외)"""
+        index, rows, _ = self._ranked(key)
+        lo, hi = index.span(value, op)
+        return np.sort(rows[lo:hi])
+
+    def _metric_mask(self, key, op, value, positions):
+        """_metric_positions와 같은 판정을 positions 행(None이면 전체)의 bool 배열로 (행별 정렬 위치 비교)"""
+        index, _, rank = self._ranked(key)
+        ranks = rank if positions is None else rank[positions]
+        lo, hi = index.span(value, '==' if op == '!=' else op)
+        inside = (ranks >= lo) & (ranks < hi)
+        return (ranks >= 0) & ~inside if op == '!=' else inside
+
+    def activity_hits(self, value, hits=None):
+        """활동 조건 → {행 번호: (건수, 비중%)} (비중 내림차순, 큐브가 없으면 most_active_* 기준이며 값은 None)
+
+        hits는 질의 한 번 동안 같은 조건의 결과를 재사용하는 캐시 딕셔너리다 (None이면 캐시하지 않음).
+        """
+        value = value or {}
+        days, hours = value.get('days'), value.get('hours')
+        cache_key = repr(sorted(value.items()))
+        if hits is not None and cache_key in hits:
+            return hits[cache_key]
+        if self.activity is None:
+            mask = np.ones(len(self.table), dtype=bool)
+            if hours is not None:
+                low, high = DAYPARTS[hours.lower()] if isinstance(hours, str) else hours
+                mask &= self._mask(Predicate('pattern.most_active_hour', 'between', (low, high)), None, hits)
+            if days is not None:
+                for day in [days] if isinstance(days, str) else days:
+                    mask &= self._mask(Predicate('pattern.most_active_day', 'contains', day), None, hits)
+            positions = {int(i): None for i in np.flatnonzero(mask)}
+        else:
+            found = self.activity.search(days, hours, value.get('min_share', 0.0), value.get('min_trades', 1),
+                                         sort_by='share')
+            positions = {}
+            for trader_id, trades, share in found:
+                i = self.table.position(trader_id)
+                if i is not None:
+                    positions[i] = (trades, share)
+        if hits is not None:
+            hits[cache_key] = positions
+        return positions
+
+    def _indexed(self, predicate):
+        """인덱스로 바로 구할 수 있는 조건이면 (예상 건수, 행 번호를 만드는 함수), 아니면 None"""
+        section, key = self._resolve(predicate.field)
+        op, value = predicate.op, predicate.value
+        numeric = op in COMPARISONS or op == 'between' or (op == '==' and not isinstance(value, str))
+        if section == 'performance' and numeric:
+            return self._metric_index(key).count(value, op), lambda: self._metric_positions(key, op, value)
+        if section in TABLE_SECTIONS and op in ('==', 'in') and self._column(section, key).kind in (str, object):
+            index = self._value_index(section, key)
+            groups = [index[v] for v in ([value] if op == '==' else value) if v in index]
+            return sum(map(len, groups)), lambda: (np.sort(np.concatenate(groups)) if groups
+                                                   else np.zeros(0, dtype=np.int64))
+        return None
+
+    def _mask(self, predicate, positions, hits=None):
+        """positions 행(None이면 전체)에서 조건을 만족하는지 bool 배열 (hits는 activity_hits 캐시)"""
+        section, key = self._resolve(predicate.field)
+        op, value = predicate.op, predicate.value
+        if section == ACTIVITY:
+            found = self.activity_hits(value, hits)
+            rows = np.arange(len(self.table)) if positions is None else positions
+            return np.fromiter((i in found for i in rows.tolist()), dtype=bool, count=len(rows))
+
+        if op in COMPARISONS or op == 'between' or (op in ('==', '!=') and not isinstance(value, str)):
+            if section == 'performance':
+                # 인덱스 경로(_indexed)와 같은 정의를 쓰도록 정렬 인덱스로 판정
+                return self._metric_mask(key, op, value, positions)
+            column = self._column(section, key)
+            numeric = column.numeric() if positions is None else column.numeric()[positions]
+            with np.errstate(invalid='ignore'):
+                if op == 'between':
+                    low, high = value
+                    mask = np.isfinite(numeric)
+                    if low is not None:
+                        mask &= numeric >= low
+                    if high is not None:
+                        mask &= numeric <= high
+                    return mask
+                return {
+                    '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+                    '==': np.equal, '!=': np.not_equal
+                }[op](numeric, value) & np.isfinite(numeric)
+
+        column = self._column(section, key)
+        values = column.values if positions is None else column.values[positions]
+        if column.missing is not None:
+            present = ~(column.missing if positions is None else column.missing[positions])
+        else:
+            present = np.ones(len(values), dtype=bool)
+        if op == '==':
+            return (values == value) & present
+        if op == '!=':
+            return (values != value) & present
+        if op == 'in':
+            return np.isin(values, list(value)) & present
+        needle = str(value).lower()
+        return np.fromiter((needle in str(v).lower() for v in values.tolist()), dtype=bool, count=len(values)) & present
+
+    def _steps(self, predicates, mode):
+        """[(조건, 인덱스 정보 또는 None)] - AND면 인덱스 조건을 예상 건수가 적은 순으로 앞에, 스캔 조건은 뒤에"""
+        steps = [(predicate, self._indexed(predicate)) for predicate in map(as_predicate, predicates)]
+        if mode == 'all':
+            steps.sort(key=lambda step: (step[1] is None, step[1][0] if step[1] else 0))
+        return steps
+
+    def plan(self, predicates, mode='all'):
+        """실행 순서의 [(조건, 'index' 또는 'scan', 예상 건수)] (scan은 예상 건수 None)"""
+        return [(predicate, 'index' if indexed else 'scan', indexed[0] if indexed else None)
+                for predicate, indexed in self._steps(predicates, mode)]
+
+    def run(self, predicates, mode='all', order_by=None, ascending=False, limit=None, hits=None):
+        """조건을 만족하는 행 번호 배열 (order_by가 없으면 리포트 순서)
+
+        mode는 'all'(AND) 또는 'any'(OR)이다. order_by는 필드 이름이며 값이 없는 행은 뒤로 간다.
+        order_by='activity'면 activity 조건의 구간 거래 비중 순이다. 조건 없이 performance 지표로
+        정렬하면 정렬 인덱스를 그대로 써서 값이 없는 트레이더는 빠진다. hits에 딕셔너리를 넘기면
+        이번 질의의 활동 조건 결과가 담긴다 (호출한 쪽이 activity_hits로 다시 꺼내 쓸 수 있음).
+        """
+        if mode not in ('all', 'any'):
+            raise ValueError(f"Unknown mode: {mode} (choose 'all' or 'any')")
+        hits = {} if hits is None else hits
+        predicates = [as_predicate(item) for item in predicates]
+        if not predicates and order_by not in (None, ACTIVITY) and self._resolve(order_by)[0] == 'performance':
+            # 조건 없는 지표 순위는 정렬 인덱스 슬라이스 (값이 없는 트레이더는 빠짐)
+            index = self._metric_index(self._resolve(order_by)[1])
+            top = index.top(len(index) if limit is None else limit, ascending)
+            return np.array([self.table.position(tid) for tid in top], dtype=np.int64)
+        steps = self._steps(predicates, mode)
+        n = len(self.table)
+        if not steps:
+            positions = np.arange(n)
+        elif mode == 'all':
+            positions = np.arange(n)
+            for i, (predicate, indexed) in enumerate(steps):
+                if len(positions) == 0:
+                    break
+                if i == 0 and indexed:
+                    positions = indexed[1]()
+                else:
+                    positions = positions[self._mask(predicate, positions, hits)]
+        else:
+            mask = np.zeros(n, dtype=bool)
+            for predicate, indexed in steps:
+                if indexed:
+                    mask[indexed[1]()] = True
+                else:
+                    mask |= self._mask(predicate, None, hits)
+            positions = np.flatnonzero(mask)
+
+        if order_by == ACTIVITY:
+            activity = [p for p in predicates if p.field == ACTIVITY]
+            rank = {i: r for r, i in enumerate(self.activity_hits(activity[0].value if activity else None, hits))}
+            positions = positions[np.argsort([rank.get(i, n) for i in positions.tolist()], kind='stable')]
+        elif order_by is not None:
+            section, key = self._resolve(order_by)
+            keys = self._column(section, key).numeric()[positions]
+            order = np.argsort(keys if ascending else -keys, kind='stable')  # NaN은 뒤로
+            positions = positions[order]
+        return positions[:limit] if limit is not None else positions
@@ -1,67 +1,139 @@
-import json
-from typing import List, Dict, Optional
+import os
+from typing import List, Dict, Optional, Union
+
+import pandas as pd
+
+from activity import DAYPARTS, ActivityCube, default_activity_path
+from cohorts import CohortTable, default_cohort_path
+from exposure import ExposureTimeline, default_exposure_path
+from metric_index import SortedMetricIndex, is_metric_value
+from name_index import NameIndex
+from query_engine import ACTIVITY, QueryEngine, as_predicate
+from report_io import LazyReport, load_report, report_path
+from trader_table import TraderTable
+from vector_index import METRIC_FIELDS, PROFILE_FIELDS, VectorIndex
+from window_metrics import WindowMetrics, default_window_index_path
 
 class TradingKnowledgeBase:
     """트레이더 성과 데이터 검색 시스템"""
     
     def __init__(self, json_path: str):
-        with open(json_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
-        self.traders = list(self.data.keys())
+        # 리포트 옆 트레이더 저장소(<리포트>.store)가 있으면 인덱스만 읽고 레코드는 필요할 때 로드,
+        # 없으면 JSON/.msgpack 전체 로드
+        self.json_path = json_path
+        self.data = load_report(json_path)
+        self.store = self.data.store if isinstance(self.data, LazyReport) else None
+        # 스칼라 필드의 타입 지정 컬럼 (검색은 행 번호로, 결과는 레코드를 복사하지 않는 읽기 전용 뷰로)
+        self.table = TraderTable(self.data, self.store)
+        self.traders = self.table.trader_ids
+        # 리포트 옆 (트레이더 x 요일 x 시각) 활동 큐브 (없으면 most_active_* 기반 검색)
+        activity_path = default_activity_path(json_path)
+        self.activity = ActivityCube(activity_path) if os.path.exists(activity_path) else None
+        # 기간 지표 누적합 인덱스 (analyzer.py --window-index, 없으면 기간 질의 불가)
+        window_path = default_window_index_path(json_path)
+        self.windows = WindowMetrics(window_path) if os.path.exists(window_path) else None
+        # 스타일/리스크/경력 코호트 통계 (없으면 코호트 질의 불가)
+        cohort_path = default_cohort_path(json_path)
+        self.cohorts = CohortTable(cohort_path) if os.path.exists(cohort_path) else None
+        # 보유 금액 타임라인과 자본 활용률 (analyzer.py --exposure, 없으면 노출 질의 불가)
+        exposure_path = default_exposure_path(json_path)
+        self.exposure = ExposureTimeline(exposure_path) if os.path.exists(exposure_path) else None
+        # performance 숫자 지표별 정렬 값 + 순열 (상위 N/임계값 질의용)
+        self.metric_indexes = self._build_metric_indexes()
+        # ID/이름 해시 맵 + 자모 n-gram 역색인 (이름 검색, 유사 이름 제안)
+        self.names = NameIndex(self._field_values('profile', 'name'))
+        # 다중 조건 질의 (가장 선택적인 인덱스 조건부터, 나머지는 벡터 마스크)
+        self.query_engine = QueryEngine(self.table, self._metric_index, self.activity)
+        # 프로필 텍스트 + 지표 임베딩 (유사 트레이더/자유 텍스트 검색, 처음 질의할 때 생성)
+        self.vectors = None
+    
+    def _build_metric_indexes(self) -> Dict[str, SortedMetricIndex]:
+        """컬럼이 있는 숫자 지표별 정렬 인덱스 생성 (저장소 기반이면 인덱스 컬럼 지표만, 나머지는 처음 질의할 때)"""
+        metrics = [key for (section, key), column in self.table.columns.items()
+                   if section == 'performance' and any(is_metric_value(value) for value in column.values.tolist())]
+        return {metric: SortedMetricIndex(self._field_values('performance', metric)) for metric in sorted(metrics)}
+    
+    def _metric_index(self, metric: str) -> SortedMetricIndex:
+        """지표 정렬 인덱스 (없으면 만들어 캐시)"""
+        index = self.metric_indexes.get(metric)
+        if index is None:
+            index = self.metric_indexes[metric] = SortedMetricIndex(self._field_values('performance', metric))
+        return index
+    
+    def source_files(self) -> List[str]:
+        """지식베이스가 읽는 파일 (리포트, MessagePack/저장소 인덱스, 사이드카) - 없는 파일 포함, 변경 감지용"""
+        path = self.json_path
+        return [
+            path, report_path(path, 'msgpack'), os.path.join(report_path(path, 'store'), 'index.json'),
+            default_activity_path(path), default_window_index_path(path), default_cohort_path(path),
+            default_exposure_path(path)
+        ]
+    
+    def warm_indexes(self) -> 'TradingKnowledgeBase':
+        """처음 질의할 때 만드는 인덱스(임베딩)를 미리 생성 (백그라운드 재로딩용)"""
+        self._vector_index()
+        return self
+    
+    def _vector_index(self) -> VectorIndex:
+        """프로필/지표 임베딩 인덱스 (없으면 만들어 캐시)"""
+        if self.vectors is None:
+            self.vectors = VectorIndex(
+                {field: self.table.values('profile', field) for field in PROFILE_FIELDS},
+                {metric: self.table.values('performance', metric) for metric in METRIC_FIELDS}
+            )
+        return self.vectors
+    
+    def _field_values(self, section: str, key: str) -> List[tuple]:
+        """[(trader_id, 값)] - 컬럼에 있는 필드면 레코드를 읽지 않음"""
+        return list(zip(self.table.trader_ids, self.table.values(section, key)))
+    
+    def _records(self, trader_ids) -> List[Dict]:
+        """trader_id 목록 → trader_id를 붙인 읽기 전용 뷰 목록 (레코드 복사 없음)"""
+        return self.table.rows([self.table.position(tid) for tid in trader_ids])
     
     def search_by_trader(self, query: str) -> Optional[Dict]:
         """트레이더 이름 또는 ID로 검색"""
-        query = query.strip().upper()
-        
-        # ID로 검색
-        if query in self.data:
-            result = self.data[query].copy()
-            result['trader_id'] = query
-            return result
-        
-        # 이름으로 검색
-        for trader_id, info in self.data.items():
-            if query in info['profile']['name']:
-                result = info.copy()
-                result['trader_id'] = trader_id
-                return result
-        
-        return None
+        trader_id = self.names.find(query)
+        return None if trader_id is None else self.table.row(trader_id)
     
     def search_by_metric(self, metric: str, threshold: float, operator: str = '>') -> List[Dict]:
-        """성과 지표로 필터링"""
-        results = []
-        
-        for trader_id, info in self.data.items():
-            value = info['performance'].get(metric)
-            if value is None:
-                continue
-            
-            if operator == '>' and value > threshold:
-                results.append({**info, 'trader_id': trader_id})
-            elif operator == '<' and value < threshold:
-                results.append({**info, 'trader_id': trader_id})
-            elif operator == '==' and value == threshold:
-                results.append({**info, 'trader_id': trader_id})
-        
-        return results
+        """성과 지표로 필터링 (operator: '>', '>=', '<', '<=', '==')"""
+        return self._records(self._metric_index(metric).select(threshold, operator))
+    
+    def search_by_metric_range(self, metric: str, low: Optional[float] = None,
+                               high: Optional[float] = None) -> List[Dict]:
+        """low <= 지표 <= high 범위 필터링 (None은 열린 경계)"""
+        return self._records(self._metric_index(metric).between(low, high))
     
     def get_top_performers(self, metric: str, top_n: int = 3, ascending: bool = False) -> List[Dict]:
         """상위 성과자 조회"""
-        traders_with_metric = []
-        
-        for trader_id, info in self.data.items():
-            value = info['performance'].get(metric)
-            if value is not None:
-                traders_with_metric.append({
-                    'trader_id': trader_id,
-                    'value': value,
-                    'data': info
-                })
+        return self._records(self._metric_index(metric).top(top_n, ascending))
+    
+    def query(self, where: List, mode: str = 'all', order_by: Optional[str] = None,
+              ascending: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """다중 조건 검색 (where: [(field, op, value)], mode: 'all'=AND, 'any'=OR)
         
-        # 정렬
-        sorted_traders = sorted(traders_with_metric, key=lambda x: x['value'], reverse=not ascending)
-        return [item['data'] for item in sorted_traders[:top_n]]
+        예: [('risk_tolerance', '==', '저위험'), ('trading_style', '==', '스윙트레이딩'),
+             ('sharpe_ratio', '>', 2), ('activity', 'during', {'days': 'Thursday', 'hours': 'morning'})]
+        activity 조건이 있고 활동 큐브가 있으면 'activity'에 구간 건수/비중을 붙인다.
+        """
+        where = [as_predicate(item) for item in where]
+        hits = {}  # 질의별 활동 조건 결과 (엔진은 공유되므로 호출마다 새로)
+        positions = self.query_engine.run(where, mode, order_by, ascending, limit, hits=hits)
+        activity = [predicate for predicate in where if predicate.field == ACTIVITY]
+        if not activity or self.activity is None:
+            return self.table.rows(positions)
+        hits = self.query_engine.activity_hits(activity[0].value, hits)
+        rows = []
+        for i in positions.tolist():
+            hit = hits.get(i)
+            extra = {} if hit is None else {'activity': {'trades': hit[0], 'share_pct': hit[1]}}
+            rows.append(self.table.row(self.table.trader_ids[i], **extra))
+        return rows
+    
+    def explain_query(self, where: List, mode: str = 'all') -> List[tuple]:
+        """query 실행 계획 [(조건, 'index' 또는 'scan', 예상 건수)]"""
+        return self.query_engine.plan(where, mode)
     
     def compare_traders(self, trader1_query: str, trader2_query: str) -> Optional[Dict]:
         """두 트레이더 비교"""
@@ -83,38 +155,115 @@ class TradingKnowledgeBase:
     
     def search_by_pattern(self, pattern_key: str, pattern_value: str) -> List[Dict]:
         """거래 패턴으로 검색"""
-        results = []
+        matched = []
         
-        for trader_id, info in self.data.items():
-            patterns = info.get('pattern', {})
-            
-            if pattern_key in patterns:
-                if str(patterns[pattern_key]) == pattern_value:
-                    results.append({**info, 'trader_id': trader_id})
+        for trader_id, value in self._field_values('pattern', pattern_key):
+            if value is not None and str(value) == pattern_value:
+                matched.append(trader_id)
         
-        return results
+        return self._records(matched)
     
     def search_by_time_pattern(self, hour_range: tuple) -> List[Dict]:
         """시간대별 검색 (예: (9, 11) = 9시~11시)"""
-        results = []
+        matched = []
         
-        for trader_id, info in self.data.items():
-            active_hour = info.get('pattern', {}).get('most_active_hour')
+        for trader_id, active_hour in self._field_values('pattern', 'most_active_hour'):
             if active_hour and hour_range[0] <= active_hour <= hour_range[1]:
-                results.append({**info, 'trader_id': trader_id})
+                matched.append(trader_id)
         
-        return results
+        return self._records(matched)
     
     def search_by_weekday(self, day: str) -> List[Dict]:
         """요일별 검색 (예: 'Monday', 'Thursday')"""
-        results = []
+        matched = []
         
-        for trader_id, info in self.data.items():
-            active_day = info.get('pattern', {}).get('most_active_day')
+        for trader_id, active_day in self._field_values('pattern', 'most_active_day'):
             if active_day and day.lower() in active_day.lower():
-                results.append({**info, 'trader_id': trader_id})
+                matched.append(trader_id)
         
-        return results
+        return self._records(matched)
+    
+    def search_by_activity(self, days=None, hours: Union[str, tuple, None] = None, min_share: float = 0.0,
+                           top_n: Optional[int] = None, sort_by: str = 'share') -> List[Dict]:
+        """요일/시간대 활동 검색 (예: days='Thursday', hours='morning' 또는 (9, 11))
+        
+        활동 큐브의 해당 칸 합계로 찾고 'activity'에 건수/비중을 붙인다.
+        큐브 파일이 없으면 most_active_hour / most_active_day 기준으로 찾는다.
+        """
+        if self.activity is None:
+            results = self.get_all_traders()
+            if hours is not None:
+                hour_range = DAYPARTS[hours.lower()] if isinstance(hours, str) else hours
+                matched = {r['trader_id'] for r in self.search_by_time_pattern(hour_range)}
+                results = [r for r in results if r['trader_id'] in matched]
+            if days is not None:
+                matched = {r['trader_id'] for r in self.search_by_weekday(days)}
+                results = [r for r in results if r['trader_id'] in matched]
+            return results[:top_n] if top_n else results
+        
+        hits = [hit for hit in self.activity.search(days, hours, min_share, sort_by=sort_by) if hit[0] in self.data]
+        return [
+            self.table.row(trader_id, activity={'trades': trades, 'share_pct': share})
+            for trader_id, trades, share in (hits[:top_n] if top_n else hits)
+        ]
+    
+    def metrics_between(self, trader_query: str, start=None, end=None) -> Optional[Dict]:
+        """트레이더(이름 또는 ID)의 [start, end) 기간 승률/손익/평균 수익률/샤프"""
+        if self.windows is None:
+            return None
+        trader = self.search_by_trader(trader_query)
+        if trader is None:
+            return None
+        return self.windows.metrics_between(trader['trader_id'], start, end)
+    
+    def recent_window(self, days: int) -> Optional[tuple]:
+        """데이터 마지막 청산일 기준 최근 days일 구간 (start, end)"""
+        if self.windows is None or self.windows.last_time is None:
+            return None
+        end = self.windows.last_time.normalize() + pd.Timedelta(days=1)
+        return end - pd.Timedelta(days=days), end
+    
+    def recent_metrics(self, trader_query: str, days: int) -> Optional[Dict]:
+        """최근 days일 기간 지표 (예: 최근 30일 승률)"""
+        window = self.recent_window(days)
+        return None if window is None else self.metrics_between(trader_query, *window)
+    
+    def get_top_in_window(self, metric: str, start=None, end=None, top_n: int = 3,
+                          ascending: bool = False, min_trades: int = 1) -> List[Dict]:
+        """기간 지표 기준 상위 트레이더 ('window'에 기간 지표를 붙여 반환)"""
+        if self.windows is None:
+            return []
+        windowed = [w for w in self.windows.all_between(start, end, min_trades) if w['trader_id'] in self.data]
+        windowed.sort(key=lambda w: w[metric], reverse=not ascending)
+        return [self.table.row(w['trader_id'], window=w) for w in windowed[:top_n]]
+    
+    def cohort_stats(self, style: Optional[str] = None, risk: Optional[str] = None,
+                     years: Optional[int] = None, metric: Optional[str] = None) -> Optional[Dict]:
+        """코호트 지표 분포 (None인 차원은 전체, years는 해당 경력 구간, 예: style='단기매매', metric='win_rate')"""
+        if self.cohorts is None:
+            return None
+        return self.cohorts.stats(style, risk, years, metric)
+    
+    def cohort_rank(self, trader_query: str) -> Optional[Dict]:
+        """트레이더(이름 또는 ID)의 코호트 키와 코호트 내/전체 백분위"""
+        if self.cohorts is None:
+            return None
+        trader = self.search_by_trader(trader_query)
+        return None if trader is None else self.cohorts.rank(trader['trader_id'])
+    
+    def exposure_stats(self, trader_query: str) -> Optional[Dict]:
+        """트레이더(이름 또는 ID)의 최대/평균/현재 노출, 최대 동시 포지션 수, 자본 활용률"""
+        if self.exposure is None:
+            return None
+        trader = self.search_by_trader(trader_query)
+        return None if trader is None else self.exposure.stats(trader['trader_id'])
+    
+    def get_top_exposure(self, metric: str = 'peak_utilization_pct', top_n: int = 3) -> List[Dict]:
+        """노출 지표 상위 트레이더 ('exposure'에 노출 지표를 붙여 반환)"""
+        if self.exposure is None:
+            return []
+        ranked = [tid for tid, _ in self.exposure.top(metric, len(self.exposure.trader_ids)) if tid in self.data]
+        return [self.table.row(tid, exposure=self.exposure.stats(tid)) for tid in ranked[:top_n]]
     
     def search_by_metric_complex(self, metric: str, order: str = 'desc', top_n: int = 3) -> List[Dict]:
         """모든 지표 검색 지원 (order: 'desc'=높은순, 'asc'=낮은순)"""
@@ -123,44 +272,39 @@ class TradingKnowledgeBase:
     
     def get_pattern_traders(self, pattern_key: str, pattern_value) -> List[Dict]:
         """패턴 기반 필터링 (유연한 값 비교)"""
-        results = []
-        
-        for trader_id, info in self.data.items():
-            pattern_val = info.get('pattern', {}).get(pattern_key)
-            if pattern_val == pattern_value:
-                results.append({**info, 'trader_id': trader_id})
+        matched = [trader_id for trader_id, value in self._field_values('pattern', pattern_key) if value == pattern_value]
+        return self._records(matched)
+    
+    def similar_traders(self, queries: Union[str, List[str]], top_n: int = 3) -> List:
+        """이름/ID와 프로필·지표가 비슷한 트레이더 ('similarity'에 코사인 점수를 붙여 반환)
         
-        return results
+        queries가 목록이면 한 번의 행렬 곱으로 찾아 질의별 결과 목록을 돌려준다 (못 찾은 이름은 []).
+        """
+        single = isinstance(queries, str)
+        found = [self.names.find(query) for query in ([queries] if single else queries)]
+        positions = [self.table.position(tid) for tid in found if tid is not None]
+        hits = iter(self._vector_index().similar(positions, top_n) if positions else [])
+        results = [[] if tid is None else self._scored_rows(next(hits)) for tid in found]
+        return results[0] if single else results
+    
+    def semantic_search(self, texts: Union[str, List[str]], top_n: int = 5, min_score: float = 0.0) -> List:
+        """자유 텍스트와 프로필 텍스트(스타일/섹터/학력/자격증/목표)가 비슷한 트레이더 (목록이면 한 번에)"""
+        single = isinstance(texts, str)
+        hits = self._vector_index().text_search([texts] if single else list(texts), top_n)
+        results = [self._scored_rows([hit for hit in found if hit[1] > min_score]) for found in hits]
+        return results[0] if single else results
+    
+    def _scored_rows(self, hits: List[tuple]) -> List[Dict]:
+        """[(행 번호, 점수)] → 'similarity'를 붙인 읽기 전용 뷰 목록"""
+        return [self.table.row(self.table.trader_ids[i], similarity=score) for i, score in hits]
     
     def get_all_traders(self) -> List[Dict]:
-        """모든 트레이더 정보"""
-        return [{'trader_id': tid, **data} for tid, data in self.data.items()]
+        """모든 트레이더 정보 (행 번호 배열 위의 지연 뷰 목록)"""
+        return self.table.rows()
     
     def find_similar_names(self, query: str, top_n: int = 3) -> List[str]:
-        """유사한 이름 찾기 (간단한 문자열 매칭)"""
-        query_clean = query.strip()
-        
-        # 모든 트레이더 이름 추출
-        all_names = [info['profile']['name'] for info in self.data.values()]
-        
-        # 유사도 계산 (공통 문자 개수)
-        similarities = []
-        for name in all_names:
-            # 공통 문자 개수
-            common_chars = sum(1 for c in query_clean if c in name)
-            # 길이 차이 페널티
-            length_diff = abs(len(name) - len(query_clean))
-            # 점수 = 공통문자 - 길이차이*0.5
-            score = common_chars - (length_diff * 0.5)
-            
-            similarities.append((name, score))
-        
-        # 점수 높은 순으로 정렬
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        
-        # 상위 N개 반환 (점수 > 0만)
-        result = [name for name, score in similarities[:top_n] if score > 0]
-        return result
+        """유사한 이름 찾기 (자모 n-gram 후보 중 편집 거리가 가까운 순)"""
+        return self.names.similar(query, top_n)
     
     def build_context(self, query: str, search_results: List[Dict]) -> Dict:
         """검색 결과를 컨텍스트로 변환"""
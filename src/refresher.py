@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+
+SETTLE_SECONDS = 1.0  # 변경을 본 뒤 파일이 더 바뀌지 않는지 확인하는 대기 (analyzer가 사이드카를 이어 쓰는 동안)
+
+
+def file_signature(paths):
+    """파일별 (mtime_ns, 크기) 튜플 (없는 파일은 None) - 내용을 읽지 않고 변경 감지"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class DataRefresher:
+    """감시 파일이 바뀌면 백그라운드에서 객체(지식베이스 등)를 새로 만들어 통째로 교체
+
+    새 객체는 요청 경로 밖의 스레드에서 인덱스까지 모두 만든 뒤 참조 하나만 바꿔 끼우므로,
+    읽는 쪽은 current를 잠금 없이 읽고 항상 완성된 이전 또는 새 객체를 본다.
+    """
+
+    def __init__(self, build, paths, interval=60, on_swap=None, initial=None):
+        self.build = build
+        self.paths = list(paths)
+        self.interval = interval
+        self.on_swap = on_swap
+        self.version = 0
+        self.loaded_at = time.time()
+        self.last_error = None
+        self._current = initial
+        self._signature = file_signature(self.paths)
+        self._failed = None  # 재생성에 실패한 파일 상태 (같은 상태로는 다시 시도하지 않음)
+        self._lock = threading.Lock()  # 재생성은 한 번에 하나만 (읽기는 잠그지 않음)
+        self._stop = threading.Event()
+        self._thread = None
+        if initial is None:
+            self._current = build()
+
+    @property
+    def current(self):
+        return self._current
+
+    def changed(self):
+        """마지막으로 읽은 뒤 감시 파일이 바뀌었는지"""
+        return file_signature(self.paths) != self._signature
+
+    def refresh(self, force=False):
+        """바뀌었으면(force면 무조건) 새로 만들어 교체하고 교체 여부 반환
+
+        실패하면 이전 객체를 두고, 파일이 다시 바뀔 때까지 같은 상태로는 재시도하지 않는다.
+        """
+        with self._lock:
+            signature = file_signature(self.paths)
+            if not force and signature in (self._signature, self._failed):
+                return False
+            if not force:
+                time.sleep(SETTLE_SECONDS)
+                settled = file_signature(self.paths)
+                if settled != signature:
+                    return False  # 아직 쓰는 중 - 다음 주기에 다시 확인
+            started = time.perf_counter()
+            try:
+                fresh = self.build()
+            except Exception as e:
+                self.last_error = str(e)
+                self._failed = signature
+                print(f"[WARNING] Refresh failed, keeping previous data: {e}")
+                return False
+            self._current = fresh
+            if self.on_swap is not None:
+                self.on_swap(fresh)
+            # 교체를 마친 뒤 번호를 올려 version을 먼저 읽은 쪽이 이전 객체를 보지 않게 한다
+            self._signature = signature
+            self.loaded_at = time.time()
+            self.last_error = None
+            self.version += 1
+            print(f"[OK] Data reloaded (version {self.version}, {time.perf_counter() - started:.2f}s)")
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+    def start(self):
+        """감시 스레드 시작 (데몬 스레드라 프로세스 종료를 막지 않음)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='data-refresher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
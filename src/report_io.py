@@ -0,0 +1,260 @@
+import json
+import math
+import os
+from collections.abc import Mapping
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+from trader_store import StoreWriter, TraderStore, default_store_dir, is_store
+
+REPORT_FORMATS = ('json', 'msgpack', 'store')
+MSGPACK_HEADER = {'format': 'trader-analysis-report', 'version': 1}
+_EXTENSIONS = {'json': None, 'msgpack': 'msgpack'}
+
+
+def report_path(output_file, fmt='json'):
+    """형식별 리포트 경로 (JSON은 output_file 그대로, 저장소는 디렉터리, 나머지는 확장자만 바꿔서)"""
+    if fmt == 'json':
+        return output_file
+    if fmt == 'store':
+        return default_store_dir(output_file)
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.{_EXTENSIONS[fmt]}"
+
+
+def to_builtin(value):
+    """numpy/pandas 스칼라를 JSON/MessagePack 기본 타입으로 (문자열 변환 없이)"""
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        value = float(value)
+        return value if math.isfinite(value) else None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.datetime64):
+        return str(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if value is pd.NaT:
+        return None
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+def sanitize(value):
+    """레코드 안의 NaN/inf 실수(np.float64 포함)를 None으로 (JSON에는 NaN 리터럴이 없다)
+
+    np.float64는 float의 하위 클래스라 json이 default 훅을 부르지 않고 NaN을 그대로 쓰므로
+    덤프 전에 값을 직접 바꿔야 한다.
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, Mapping):
+        return {key: sanitize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [sanitize(item) for item in value]
+    if isinstance(value, np.floating):
+        return sanitize(float(value))
+    return value
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise SystemExit("[ERROR] MessagePack report requires msgpack: pip install msgpack")
+    return msgpack
+
+
+class _FileSink:
+    """임시 파일에 쓰고 close()에서 교체하는 단일 파일 출력"""
+
+    def __init__(self, path, mode, encoding=None):
+        self._path = path
+        self._f = open(f"{path}.tmp", mode, encoding=encoding)
+
+    def close(self):
+        self._f.close()
+        os.replace(f"{self._path}.tmp", self._path)
+
+    def abort(self):
+        self._f.close()
+        if os.path.exists(f"{self._path}.tmp"):
+            os.remove(f"{self._path}.tmp")
+
+
+class _JsonSink(_FileSink):
+    """{"trader_id": record, ...}를 레코드 단위로 이어 쓰기
+
+    indent=2면 json.dump(results, indent=2)와 바이트 단위로 같은 결과가 나온다.
+    """
+
+    def __init__(self, path, compact=False):
+        super().__init__(path, 'w', encoding='utf-8')
+        f = self._f
+        self._indent = None if compact else 2
+        self._separators = (',', ':') if compact else None
+        self._count = 0
+        f.write('{')
+
+    def write(self, trader_id, record):
+        text = json.dumps(
+            record, ensure_ascii=False, indent=self._indent, separators=self._separators,
+            default=to_builtin, allow_nan=False
+        )
+        key = json.dumps(str(trader_id), ensure_ascii=False)  # json.dump처럼 숫자 ID도 문자열 키로
+        if self._indent is None:
+            self._f.write(f"{',' if self._count else ''}{key}:{text}")
+        else:
+            self._f.write(f"{',' if self._count else ''}\n  {key}: {text.replace(chr(10), chr(10) + '  ')}")
+        self._count += 1
+
+    def close(self):
+        self._f.write('\n}' if self._count and self._indent is not None else '}')
+        super().close()
+
+
+class _MsgpackSink(_FileSink):
+    """헤더 맵 뒤에 [trader_id, record] 배열을 이어 붙인 MessagePack 스트림"""
+
+    def __init__(self, path):
+        packer = _msgpack().Packer(default=to_builtin, use_bin_type=True)
+        super().__init__(path, 'wb')
+        self._packer = packer
+        self._f.write(packer.pack(MSGPACK_HEADER))
+
+    def write(self, trader_id, record):
+        self._f.write(self._packer.pack([trader_id, record]))
+
+
+class ReportWriter:
+    """트레이더 레코드를 완성되는 대로 하나 이상의 형식으로 이어 쓰는 리포트 작성기
+
+    각 형식은 임시 파일(저장소는 임시 디렉터리)에 쓰고 close()에서 교체하므로 읽는 쪽은
+    반쯤 쓰인 파일을 보지 않는다. 예외로 중단되면 임시 파일을 지우고 기존 리포트를 그대로 둔다.
+    """
+
+    def __init__(self, output_file, formats=('json',), compact=False):
+        unknown = set(formats) - set(REPORT_FORMATS)
+        if unknown:
+            raise ValueError(f"Unknown report format: {', '.join(sorted(unknown))}")
+        self.paths = [report_path(output_file, fmt) for fmt in formats]
+        self.count = 0
+        self._sinks = []
+        try:
+            for fmt, path in zip(formats, self.paths):
+                if fmt == 'json':
+                    self._sinks.append(_JsonSink(path, compact))
+                elif fmt == 'msgpack':
+                    self._sinks.append(_MsgpackSink(path))
+                else:
+                    self._sinks.append(StoreWriter(path, default=to_builtin))
+        except BaseException:
+            self.abort()
+            raise
+
+    def write(self, trader_id, record):
+        # JSON 객체 키는 문자열이므로 모든 형식이 같은 키를 쓰도록 (CSV의 숫자 trader_id 등)
+        trader_id = str(trader_id)
+        record = sanitize(record)
+        for sink in self._sinks:
+            sink.write(trader_id, record)
+        self.count += 1
+
+    def write_all(self, results):
+        for trader_id, record in results.items():
+            self.write(trader_id, record)
+
+    def close(self):
+        for sink in self._sinks:
+            sink.close()
+
+    def abort(self):
+        for sink in self._sinks:
+            sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+def write_report(output_file, results, formats=('json',), compact=False):
+    """결과 딕셔너리 전체를 리포트 파일로 저장하고 저장한 경로 목록 반환"""
+    with ReportWriter(output_file, formats, compact) as writer:
+        writer.write_all(results)
+    return writer.paths
+
+
+def read_msgpack_report(path):
+    """MessagePack 리포트를 trader_id → 레코드 딕셔너리로 로드"""
+    results = {}
+    with open(path, 'rb') as f:
+        unpacker = _msgpack().Unpacker(f, raw=False, strict_map_key=False)
+        header = next(unpacker, None)
+        if header != MSGPACK_HEADER:
+            raise ValueError(f"Not a trader report: {path}")
+        for trader_id, record in unpacker:
+            results[trader_id] = record
+    return results
+
+
+def read_report(path):
+    """리포트 로드 (.msgpack이면 MessagePack, JSON이면 옆에 더 최신 MessagePack이 있고
+    msgpack이 설치돼 있을 때 그것을 우선 사용)"""
+    if path.endswith('.msgpack'):
+        return read_msgpack_report(path)
+    binary = report_path(path, 'msgpack')
+    if os.path.exists(binary) and os.path.getmtime(binary) >= os.path.getmtime(path):
+        try:
+            import msgpack  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return read_msgpack_report(binary)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class LazyReport(Mapping):
+    """TraderStore를 trader_id → 레코드 딕셔너리처럼 쓰는 읽기 전용 매핑 (레코드는 접근 시 로드)"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, trader_id):
+        record = self.store.get(trader_id)
+        if record is None:
+            raise KeyError(trader_id)
+        return record
+
+    def __contains__(self, trader_id):
+        return trader_id in self.store
+
+    def __iter__(self):
+        return iter(self.store)
+
+    def __len__(self):
+        return len(self.store)
+
+
+def load_report(path, cache_size=None):
+    """리포트를 읽되 트레이더 저장소가 있으면 인덱스만 읽는 LazyReport로 반환
+
+    path가 저장소 디렉터리이거나, JSON 옆 저장소가 JSON보다 오래되지 않았으면 저장소를 쓴다.
+    그 밖에는 read_report와 같다.
+    """
+    store_dir = path if is_store(path) else default_store_dir(path)
+    if is_store(store_dir) and (store_dir == path or not os.path.exists(path) or
+                                os.path.getmtime(os.path.join(store_dir, 'index.json')) >= os.path.getmtime(path)):
+        store = TraderStore(store_dir) if cache_size is None else TraderStore(store_dir, cache_size)
+        return LazyReport(store)
+    return read_report(path)
@@ -0,0 +1,94 @@
+import numpy as np
+
+
+def run_starts(*keys):
+    """정렬된 키 배열에서 그룹이 시작되는 위치 표시"""
+    starts = np.zeros(len(keys[0]), dtype=bool)
+    if len(starts):
+        starts[0] = True
+    for key in keys:
+        starts[1:] |= key[1:] != key[:-1]
+    return starts
+
+
+def rank_within_runs(starts):
+    """그룹 내 순번 (0부터) 계산"""
+    idx = np.arange(len(starts))
+    return idx - np.maximum.accumulate(np.where(starts, idx, 0))
+
+
+def segment_bounds(*keys):
+    """정렬된 키 배열의 그룹 시작 위치와 길이"""
+    starts = np.flatnonzero(run_starts(*keys))
+    counts = np.diff(np.append(starts, len(keys[0])))
+    return starts, counts
+
+
+def segment_sum(values, counts):
+    """연속 구간별 합계 (빈 구간은 0)
+
+    np.add.reduceat은 앞에서부터 차례로 더해 np.sum(pairwise 합산)과 끝자리가
+    달라질 수 있다. 길이가 같은 구간끼리 2차원으로 모아 행 단위로 합산하면
+    트레이더별 pandas 집계와 비트 단위로 같은 값을 얻는다.
+    """
+    counts = np.asarray(counts)
+    out = np.zeros(len(counts), dtype=np.float64)
+    if len(values) == 0:
+        return out
+
+    values = np.asarray(values, dtype=np.float64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    by_length = np.argsort(counts, kind='stable')
+    lengths, first = np.unique(counts[by_length], return_index=True)
+    for length, segs in zip(lengths, np.split(by_length, first[1:])):
+        if length > 0:
+            out[segs] = values[starts[segs, None] + np.arange(length)].sum(axis=1)
+    return out
+
+
+def segment_cumsum(values, counts):
+    """연속 구간별 누적합 (구간마다 처음부터 차례로 더한 np.cumsum과 비트 단위로 같음)
+
+    pandas groupby cumsum은 보정 합산(Kahan)을 써서 트레이더별 Series.cumsum과
+    끝자리가 달라질 수 있으므로 segment_sum과 같이 길이별 2차원 블록으로 계산한다.
+    """
+    counts = np.asarray(counts)
+    values = np.asarray(values, dtype=np.float64)
+    out = np.empty(len(values), dtype=np.float64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    by_length = np.argsort(counts, kind='stable')
+    lengths, first = np.unique(counts[by_length], return_index=True)
+    for length, segs in zip(lengths, np.split(by_length, first[1:])):
+        if length > 0:
+            rows = starts[segs, None] + np.arange(length)
+            out[rows] = np.cumsum(values[rows], axis=1)
+    return out
+
+
+def expand_ranges(starts, counts):
+    """(시작, 길이) 구간들을 이어 붙인 행 인덱스"""
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.asarray(starts, dtype=np.int64) - (np.cumsum(counts) - counts)
+    return np.repeat(offsets, counts) + np.arange(counts.sum())
+
+
+def affine_scan(a, b, starts):
+    """구간별 점화식 x[i] = a[i] * x[i-1] + b[i]의 해 (구간 시작 직전 x = 0)
+
+    Hillis-Steele 방식으로 합성 범위를 두 배씩 넓히는 O(n log n) 벡터 연산이다.
+    """
+    a = np.array(a, dtype=np.float64)
+    b = np.array(b, dtype=np.float64)
+    idx = np.arange(len(a))
+    first = np.maximum.accumulate(np.where(starts, idx, 0))
+    step = 1
+    while True:
+        valid = np.flatnonzero(idx - step >= first)
+        if len(valid) == 0:
+            return b
+        src = valid - step
+        new_a, new_b = a.copy(), b.copy()
+        new_a[valid] = a[valid] * a[src]
+        new_b[valid] = a[valid] * b[src] + b[valid]
+        a, b = new_a, new_b
+        step *= 2
@@ -0,0 +1,334 @@
+import numpy as np
+import pandas as pd
+
+from segments import segment_bounds, segment_cumsum, segment_sum
+from matching import match_with_leftovers
+from batch_metrics import DAY_NAMES, assemble_results, pattern_record, performance_record
+from report_io import write_report
+from columnar import parse_datetimes
+from activity import CELLS, DAYS, HOURS, default_activity_path, save_activity_cube
+from cohorts import build_cohorts, default_cohort_path, save_cohorts
+
+LOT_COLUMNS = ['trader_id', 'symbol', 'side', 'datetime', 'quantity', 'price', 'total_amount']
+_NO_ROW = np.iinfo(np.int64).max
+_NO_TIME = np.iinfo(np.int64).min
+
+
+class _GrowingArrays:
+    """정수 id로 인덱싱되는 숫자 배열 묶음 (필요할 때 두 배로 확장)"""
+
+    def __init__(self, specs):
+        self.specs = specs
+        self.capacity = 0
+        self.arrays = {
+            name: np.full((0,) + shape, fill, dtype=dtype)
+            for name, (dtype, fill, shape) in specs.items()
+        }
+
+    def reserve(self, size):
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2, 1024)
+        for name, (dtype, fill, shape) in self.specs.items():
+            grown = np.full((capacity,) + shape, fill, dtype=dtype)
+            grown[:self.capacity] = self.arrays[name]
+            self.arrays[name] = grown
+        self.capacity = capacity
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+
+# (trader, symbol) 라운드트립 요약 필드: 이어 붙이기가 결합법칙을 만족하는 모노이드
+_SUMMARY_FIELDS = [
+    'count', 'pnl_sum', 'max_prefix', 'min_prefix', 'drawdown', 'wins', 'losses',
+    'win_sum', 'loss_sum', 'return_mean', 'return_m2', 'hold_sum'
+]
+
+
+def _combine(a, b):
+    """거래 순서상 a 다음에 b가 오는 두 요약을 합침 (a가 비어 있으면 b)"""
+    empty = a['count'] == 0
+    count = a['count'] + b['count']
+    delta = b['return_mean'] - a['return_mean']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return_mean = np.where(empty, b['return_mean'], a['return_mean'] + delta * b['count'] / count)
+        return_m2 = np.where(
+            empty, b['return_m2'],
+            a['return_m2'] + b['return_m2'] + delta ** 2 * a['count'] * b['count'] / count
+        )
+    # b 구간의 누적 손익은 a의 합계만큼 올라간 상태에서 시작
+    shifted_max = a['pnl_sum'] + b['max_prefix']
+    shifted_min = a['pnl_sum'] + b['min_prefix']
+    return {
+        'count': count,
+        'pnl_sum': a['pnl_sum'] + b['pnl_sum'],
+        'max_prefix': np.where(empty, b['max_prefix'], np.maximum(a['max_prefix'], shifted_max)),
+        'min_prefix': np.where(empty, b['min_prefix'], np.minimum(a['min_prefix'], shifted_min)),
+        'drawdown': np.where(
+            empty, b['drawdown'],
+            np.minimum(np.minimum(a['drawdown'], b['drawdown']), shifted_min - a['max_prefix'])
+        ),
+        'wins': a['wins'] + b['wins'],
+        'losses': a['losses'] + b['losses'],
+        'win_sum': a['win_sum'] + b['win_sum'],
+        'loss_sum': a['loss_sum'] + b['loss_sum'],
+        'return_mean': return_mean,
+        'return_m2': return_m2,
+        'hold_sum': a['hold_sum'] + b['hold_sum']
+    }
+
+
+def _summarize(round_trips, segment_ids):
+    """청크의 라운드트립을 (trader, symbol) 구간별 요약으로 축약 (구간은 연속, 순번 순)"""
+    starts, counts = segment_bounds(segment_ids)
+    seg = np.repeat(np.arange(len(starts)), counts)
+    pnl = round_trips['pnl'].to_numpy(dtype=np.float64)
+    returns = round_trips['pnl_pct'].to_numpy(dtype=np.float64)
+    wins = pnl > 0
+    losses = pnl < 0
+
+    cumulative = segment_cumsum(pnl, counts)
+    running_max = pd.Series(cumulative).groupby(seg).cummax().to_numpy()
+    return_mean = segment_sum(returns, counts) / counts
+
+    return {
+        'count': counts.astype(np.float64),
+        'pnl_sum': segment_sum(pnl, counts),
+        'max_prefix': np.maximum.reduceat(cumulative, starts),
+        'min_prefix': np.minimum.reduceat(cumulative, starts),
+        'drawdown': np.minimum.reduceat(cumulative - running_max, starts),
+        'wins': np.bincount(seg, weights=wins, minlength=len(starts)),
+        'losses': np.bincount(seg, weights=losses, minlength=len(starts)),
+        'win_sum': np.bincount(seg, weights=np.where(wins, pnl, 0), minlength=len(starts)),
+        'loss_sum': np.bincount(seg, weights=np.where(losses, pnl, 0), minlength=len(starts)),
+        'return_mean': return_mean,
+        'return_m2': segment_sum((returns - return_mean[seg]) ** 2, counts),
+        'hold_sum': segment_sum(round_trips['hold_days'].to_numpy(dtype=np.float64), counts)
+    }, starts
+
+
+class StreamingAnalyzer:
+    """거래 파일을 청크 단위로 읽으며 트레이더/종목별 누적 상태만 유지하는 분석기
+
+    청크 경계를 넘는 미청산 매수/매도 로트는 다음 청크 앞에 붙여 다시 매칭하므로
+    (trader, symbol)별 행이 파일에서 시간순이라면 메모리 전체 분석과 같은 짝이 만들어진다.
+    최대 메모리는 파일 크기가 아니라 청크 크기 + 미청산 로트 + 트레이더/종목 수에 비례한다.
+    """
+
+    def __init__(self, transactions_file, profiles_file, chunksize=500_000, msgpack=False, compact_json=False,
+                 store=False):
+        self.transactions_file = transactions_file
+        self.profiles = pd.read_csv(profiles_file)
+        self.chunksize = chunksize
+        self.report_formats = ('json',) + (('msgpack',) if msgpack else ()) + (('store',) if store else ())
+        self.compact_json = compact_json
+        self.rows_read = 0
+
+        self._trader_index = {}
+        self._pair_index = {}
+        self._traders = _GrowingArrays({
+            'rows': (np.int64, 0, ()),
+            'amount_sum': (np.float64, 0.0, ()),
+            'hour_counts': (np.int64, 0, (24,)),
+            'hour_first': (np.int64, _NO_ROW, (24,)),
+            'day_counts': (np.int64, 0, (7,)),
+            'day_first': (np.int64, _NO_ROW, (7,)),
+            'activity': (np.int64, 0, (CELLS,))
+        })
+        pair_specs = {name: (np.float64, 0.0, ()) for name in _SUMMARY_FIELDS}
+        pair_specs['trader'] = (np.int64, -1, ())
+        pair_specs['last_time'] = (np.int64, _NO_TIME, ())
+        self._pairs = _GrowingArrays(pair_specs)
+        self._pair_symbols = []
+        self._open_lots = None
+
+    def _ids(self, index, keys):
+        """처음 보는 키에 등장 순서대로 새 id 부여"""
+        return np.array([index.setdefault(key, len(index)) for key in keys], dtype=np.int64)
+
+    def run(self):
+        """파일 전체를 청크 단위로 읽어 누적"""
+        for chunk in pd.read_csv(self.transactions_file, chunksize=self.chunksize):
+            self.consume(chunk)
+        return self
+
+    def consume(self, chunk):
+        """청크 하나를 패턴/매칭 상태에 반영"""
+        chunk = chunk.reset_index(drop=True)
+        chunk['datetime'] = parse_datetimes(chunk['date'], chunk['time'])
+        rows = self.rows_read + np.arange(len(chunk))
+
+        trader_codes, trader_labels = pd.factorize(chunk['trader_id'], sort=False)
+        trader_labels = np.asarray(trader_labels, dtype=object)
+        trader_ids = self._ids(self._trader_index, trader_labels.tolist())[trader_codes]
+        self._traders.reserve(len(self._trader_index))
+
+        symbol_codes, symbol_labels = pd.factorize(chunk['symbol'], sort=False)
+        symbol_labels = np.asarray(symbol_labels, dtype=object)
+        n_symbols = len(symbol_labels)
+        pair_codes, pair_keys = pd.factorize(trader_codes.astype(np.int64) * n_symbols + symbol_codes, sort=False)
+        pair_labels = [
+            (trader_labels[key // n_symbols], symbol_labels[key % n_symbols]) for key in pair_keys.tolist()
+        ]
+        known_pairs = len(self._pair_index)
+        pair_ids = self._ids(self._pair_index, pair_labels)
+        self._pairs.reserve(len(self._pair_index))
+        for (trader_label, symbol), pair_id in zip(pair_labels, pair_ids.tolist()):
+            if pair_id >= known_pairs:
+                self._pair_symbols.append(symbol)
+                self._pairs['trader'][pair_id] = self._trader_index[trader_label]
+        pair_ids = pair_ids[pair_codes]
+
+        self._accumulate_patterns(chunk, trader_ids, rows)
+        self._check_chronological(chunk, pair_ids)
+        self._accumulate_round_trips(chunk)
+        self.rows_read += len(chunk)
+
+    def _accumulate_patterns(self, chunk, trader_ids, rows):
+        """시간대/요일 빈도(첫 등장 행 포함), 요일 x 시각 활동 큐브, 행 수, 거래 금액 합계 누적"""
+        traders = self._traders
+        n_traders = len(self._trader_index)
+        datetimes = chunk['datetime'].dt
+
+        traders['rows'][:n_traders] += np.bincount(trader_ids, minlength=n_traders)
+        traders['amount_sum'][:n_traders] += np.bincount(
+            trader_ids, weights=chunk['total_amount'].to_numpy(dtype=np.float64), minlength=n_traders
+        )
+
+        hours = datetimes.hour.to_numpy(dtype=np.int64)
+        days = datetimes.dayofweek.to_numpy(dtype=np.int64)
+        cell = trader_ids * CELLS + days * HOURS + hours
+        traders['activity'][:n_traders] += np.bincount(cell, minlength=n_traders * CELLS).reshape(n_traders, CELLS)
+
+        for counts, first, values, width in [
+            ('hour_counts', 'hour_first', hours, 24),
+            ('day_counts', 'day_first', days, 7)
+        ]:
+            flat = trader_ids * width + values
+            traders[counts][:n_traders] += np.bincount(flat, minlength=n_traders * width).reshape(n_traders, width)
+            keys, first_pos = np.unique(flat, return_index=True)
+            first_view = traders[first].reshape(-1)
+            first_view[keys] = np.minimum(first_view[keys], rows[first_pos])
+
+    def _check_chronological(self, chunk, pair_ids):
+        """이전 청크에서 이미 매칭된 시점보다 이른 행이 오면 중단"""
+        times = chunk['datetime'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        last_time = self._pairs['last_time']
+        first_time = np.full(len(self._pair_index), np.iinfo(np.int64).max)
+        np.minimum.at(first_time, pair_ids, times)
+        if np.any(first_time < last_time[:len(first_time)]):
+            raise ValueError(
+                "Transactions are not chronological within (trader_id, symbol); "
+                "streaming mode needs time-ordered rows per symbol"
+            )
+        np.maximum.at(last_time, pair_ids, times)
+
+    def _accumulate_round_trips(self, chunk):
+        """이월된 미청산 로트 + 청크를 매칭하고 (trader, symbol) 요약에 합침"""
+        combined = chunk[LOT_COLUMNS]
+        if self._open_lots is not None and len(self._open_lots):
+            combined = pd.concat([self._open_lots, combined], ignore_index=True)
+        round_trips, leftover = match_with_leftovers(combined)
+        self._open_lots = combined.iloc[leftover].reset_index(drop=True)
+        if len(round_trips) == 0:
+            return
+
+        segment_codes, segment_keys = pd.factorize(
+            pd.MultiIndex.from_arrays([round_trips['trader_id'], round_trips['symbol']]), sort=False
+        )
+        summary, starts = _summarize(round_trips, segment_codes)
+        pair_ids = np.array([self._pair_index[key] for key in segment_keys], dtype=np.int64)[segment_codes[starts]]
+
+        state = {name: self._pairs[name][pair_ids] for name in _SUMMARY_FIELDS}
+        for name, values in _combine(state, summary).items():
+            self._pairs[name][pair_ids] = values
+
+    def calculate_all_metrics(self):
+        """종목 요약을 트레이더별로 종목 등장 순서대로 접어 성과 지표 계산"""
+        n_pairs = len(self._pair_symbols)
+        pairs = {name: self._pairs[name][:n_pairs] for name in _SUMMARY_FIELDS}
+        pair_traders = self._pairs['trader'][:n_pairs]
+        active = np.flatnonzero(pairs['count'] > 0)
+        if len(active) == 0:
+            return {}
+
+        # pair id는 전역 등장 순서이므로 트레이더 안에서는 종목 등장 순서
+        active = active[np.argsort(pair_traders[active], kind='stable')]
+        traders = pair_traders[active]
+        starts, counts = segment_bounds(traders)
+        position = np.arange(len(active)) - np.repeat(starts, counts)
+
+        n_traders = len(starts)
+        totals = {name: np.zeros(n_traders) for name in _SUMMARY_FIELDS}
+        for k in range(counts.max()):
+            step = np.flatnonzero(position == k)
+            segs = np.searchsorted(starts, step, side='right') - 1
+            acc = {name: values[segs] for name, values in totals.items()}
+            nxt = {name: pairs[name][active[step]] for name in _SUMMARY_FIELDS}
+            for name, values in _combine(acc, nxt).items():
+                totals[name][segs] = values
+
+        trader_labels = list(self._trader_index)
+        symbols = np.asarray(self._pair_symbols, dtype=object)[active]
+        pair_counts = pairs['count'][active]
+        results = {}
+        for i, (start, n) in enumerate(zip(starts.tolist(), counts.tolist())):
+            order = np.argsort(-pair_counts[start:start + n], kind='stable')
+            top_symbols = {
+                symbol: int(count) for symbol, count in
+                zip(symbols[start:start + n][order].tolist(), pair_counts[start:start + n][order].tolist())
+            }
+            total_trades = int(totals['count'][i])
+            winning_trades = int(totals['wins'][i])
+            losing_trades = int(totals['losses'][i])
+            std_return = np.sqrt(totals['return_m2'][i] / (total_trades - 1)) if total_trades > 1 else np.nan
+            trader_id = trader_labels[traders[start]]
+            results[trader_id] = performance_record(
+                trader_id, total_trades, winning_trades, losing_trades,
+                totals['win_sum'][i] / max(winning_trades, 1),
+                totals['loss_sum'][i] / max(losing_trades, 1),
+                totals['pnl_sum'][i], totals['return_mean'][i], std_return,
+                totals['drawdown'][i], totals['max_prefix'][i],
+                totals['hold_sum'][i] / total_trades, top_symbols
+            )
+
+        # 트레이더 등장 순서로 정렬
+        return {tid: results[tid] for tid in trader_labels if tid in results}
+
+    def analyze_all_patterns(self):
+        """누적된 빈도로 트레이더별 패턴 계산 (빈도 내림차순, 동률은 먼저 등장한 값)"""
+        traders = self._traders
+        results = {}
+        for i, trader_id in enumerate(self._trader_index):
+            distributions = []
+            for counts, first, labels in [
+                ('hour_counts', 'hour_first', list(range(24))),
+                ('day_counts', 'day_first', DAY_NAMES.tolist())
+            ]:
+                present = np.flatnonzero(traders[counts][i])
+                order = present[np.lexsort((traders[first][i][present], -traders[counts][i][present]))]
+                distributions.append({labels[k]: int(traders[counts][i][k]) for k in order.tolist()})
+            avg_position = traders['amount_sum'][i] / traders['rows'][i]
+            results[trader_id] = pattern_record(trader_id, distributions[0], distributions[1], avg_position)
+        return results
+
+    def generate_full_report(self, output_file='data/analysis_results.json'):
+        """파일을 스트리밍으로 읽어 전체 리포트 생성 (TradingPerformanceAnalyzer와 같은 스키마)"""
+        self.run()
+        results = assemble_results(self.profiles, self.calculate_all_metrics(), self.analyze_all_patterns())
+
+        print(f"[OK] Analysis complete: {len(results)} traders ({self.rows_read} rows streamed)")
+        for path in write_report(output_file, results, self.report_formats, self.compact_json):
+            print(f"[SAVED] {path}")
+
+        activity_file = default_activity_path(output_file)
+        n_traders = len(self._trader_index)
+        cube = self._traders['activity'][:n_traders].reshape(n_traders, DAYS, HOURS).astype(np.int32)
+        save_activity_cube(activity_file, list(self._trader_index), cube)
+        print(f"[SAVED] {activity_file}")
+
+        cohort_file = default_cohort_path(output_file)
+        save_cohorts(cohort_file, build_cohorts(results))
+        print(f"[SAVED] {cohort_file}")
+        return results
@@ -0,0 +1,162 @@
+import os
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from segments import segment_bounds, segment_cumsum
+
+DEFAULT_WINDOWS = (20, 60)
+ANNUALIZATION_DAYS = 365  # 달력일 격자이므로 주말 포함 연 365일
+_BLOCK_CELLS = 1 << 22  # 롤링 MDD 계산 시 한 번에 펼치는 (행 x 윈도우) 크기
+
+
+def default_timeseries_path(output_file):
+    """리포트 파일 옆에 두는 시계열 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.timeseries.npz"
+
+
+def _segment_first(lengths):
+    """각 행이 속한 구간의 시작 위치"""
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    return np.repeat(starts, lengths)
+
+
+def _rolling_sum(values, first, window):
+    """구간 경계를 넘지 않는 후행 윈도우 합계와 윈도우 길이 (누적합 차분)"""
+    idx = np.arange(len(values))
+    lo = np.maximum(first, idx - window + 1)
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    return cumulative[idx + 1] - cumulative[lo], idx - lo + 1
+
+
+def _rolling_max_drawdown(equity, first, window):
+    """후행 윈도우 안에서의 최대 낙폭 (윈도우 내 고점 대비, 구간 경계 밖은 제외)"""
+    n = len(equity)
+    out = np.empty(n, dtype=np.float64)
+    padded = np.concatenate((np.full(window - 1, -np.inf), equity))
+    offsets = np.arange(window) - window + 1
+    block = max(1, _BLOCK_CELLS // window)
+    for lo in range(0, n, block):
+        hi = min(n, lo + block)
+        values = sliding_window_view(padded[lo:hi + window - 1], window)
+        valid = (np.arange(lo, hi)[:, None] + offsets) >= first[lo:hi, None]
+        values = np.where(valid, values, -np.inf)
+        peaks = np.maximum.accumulate(values, axis=1)
+        with np.errstate(invalid='ignore'):
+            out[lo:hi] = np.where(valid, values - peaks, 0).min(axis=1)
+    return out
+
+
+def equity_curves(round_trips, windows=DEFAULT_WINDOWS):
+    """트레이더별 일별 자산 곡선과 롤링 지표 (전체 트레이더 일괄 계산)
+
+    실현 손익은 청산일에 반영하고, 트레이더의 첫 거래일부터 마지막 청산일까지
+    빈 날 없이 달력일 격자를 만든다. 롤링 지표는 윈도우가 다 차지 않은 초기
+    구간에서도 가능한 날짜만으로 계산한다.
+    """
+    columns = ['trader_id', 'date', 'daily_pnl', 'trades', 'wins', 'equity', 'drawdown']
+    for window in windows:
+        columns += [f'sharpe_{window}d', f'max_drawdown_{window}d', f'win_rate_{window}d']
+    if len(round_trips) == 0:
+        return pd.DataFrame(columns=columns)
+
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    buy_day = round_trips['buy_date'].to_numpy(dtype='datetime64[D]').view(np.int64)
+    sell_day = round_trips['sell_date'].to_numpy(dtype='datetime64[D]').view(np.int64)
+    # 순번 매칭은 매도가 매수보다 앞설 수 있어 두 날짜 중 이른 날부터 격자를 만든다
+    first_day = np.minimum.reduceat(np.minimum(buy_day, sell_day), starts)
+    last_day = np.maximum.reduceat(sell_day, starts)
+    lengths = last_day - first_day + 1
+
+    # 라운드트립 → (트레이더, 청산일) 격자 위치
+    grid_start = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    seg = np.repeat(np.arange(len(starts)), counts)
+    cell = grid_start[seg] + (sell_day - first_day[seg])
+    n_cells = int(lengths.sum())
+
+    pnl = round_trips['pnl'].to_numpy(dtype=np.float64)
+    daily_pnl = np.bincount(cell, weights=pnl, minlength=n_cells)
+    trades = np.bincount(cell, minlength=n_cells)
+    wins = np.bincount(cell, weights=pnl > 0, minlength=n_cells).astype(np.int64)
+
+    equity = segment_cumsum(daily_pnl, lengths)
+    grid_seg = np.repeat(np.arange(len(starts)), lengths)
+    peaks = pd.Series(equity).groupby(grid_seg).cummax().to_numpy()
+    day_in_segment = np.arange(n_cells) - np.repeat(grid_start, lengths)
+
+    curves = {
+        'trader_id': np.repeat(trader_ids[starts], lengths),
+        'date': (np.repeat(first_day, lengths) + day_in_segment).astype('datetime64[D]'),
+        'daily_pnl': daily_pnl,
+        'trades': trades,
+        'wins': wins,
+        'equity': equity,
+        'drawdown': equity - np.maximum(peaks, 0)
+    }
+
+    first = _segment_first(lengths)
+    for window in windows:
+        total, n_days = _rolling_sum(daily_pnl, first, window)
+        squares, _ = _rolling_sum(daily_pnl ** 2, first, window)
+        mean = total / n_days
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = np.maximum(squares - total * mean, 0) / (n_days - 1)
+            std = np.sqrt(variance)
+            sharpe = np.where((n_days > 1) & (std > 0), mean / std * np.sqrt(ANNUALIZATION_DAYS), np.nan)
+            trade_count, _ = _rolling_sum(trades, first, window)
+            win_count, _ = _rolling_sum(wins, first, window)
+            win_rate = np.where(trade_count > 0, win_count / trade_count * 100, np.nan)
+
+        curves[f'sharpe_{window}d'] = sharpe
+        curves[f'max_drawdown_{window}d'] = _rolling_max_drawdown(equity, first, window)
+        curves[f'win_rate_{window}d'] = win_rate
+
+    return pd.DataFrame(curves, columns=columns)
+
+
+def save_equity_curves(path, curves, windows=DEFAULT_WINDOWS):
+    """자산 곡선을 트레이더별 오프셋이 있는 압축 컬럼 파일(.npz)로 저장"""
+    trader_ids = curves['trader_id'].to_numpy()
+    starts, _ = segment_bounds(trader_ids)
+    arrays = {
+        'trader_ids': np.asarray(trader_ids[starts], dtype=str),
+        'offsets': np.append(starts, len(curves)).astype(np.int64),
+        'windows': np.asarray(windows, dtype=np.int64),
+        'date': curves['date'].to_numpy(dtype='datetime64[D]').view(np.int64).astype(np.int32)
+    }
+    for column in curves.columns[2:]:
+        values = curves[column].to_numpy()
+        arrays[column] = values.astype(np.int32) if column in ('trades', 'wins') else values.astype(np.float64)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+class EquityCurves:
+    """save_equity_curves로 저장한 시계열 파일 조회 (트레이더별 구간 슬라이스)"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self._arrays = {name: data[name] for name in data.files}
+        self.trader_ids = self._arrays.pop('trader_ids').tolist()
+        self.windows = self._arrays.pop('windows').tolist()
+        self._offsets = self._arrays.pop('offsets')
+        self._index = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+
+    def __contains__(self, trader_id):
+        return trader_id in self._index
+
+    def get(self, trader_id):
+        """트레이더 한 명의 일별 시계열 DataFrame (없으면 None)"""
+        i = self._index.get(trader_id)
+        if i is None:
+            return None
+        rows = slice(self._offsets[i], self._offsets[i + 1])
+        frame = pd.DataFrame({name: values[rows] for name, values in self._arrays.items()})
+        frame['date'] = frame['date'].astype(np.int64).astype('datetime64[D]')
+        return frame
@@ -0,0 +1,161 @@
+import json
+import os
+import shutil
+from functools import lru_cache
+
+STORE_VERSION = 1
+SHARD_SIZE = 1000
+CACHE_SIZE = 256
+# 인덱스에 함께 두는 필드 (섹션, 키) - 목록/정렬/필터 질의는 레코드를 열지 않고 처리
+INDEX_FIELDS = [
+    ('profile', 'name'),
+    ('profile', 'trading_style'),
+    ('profile', 'risk_tolerance'),
+    ('profile', 'years_experience'),
+    ('performance', 'total_trades'),
+    ('performance', 'win_rate'),
+    ('performance', 'total_pnl'),
+    ('performance', 'avg_return_pct'),
+    ('performance', 'profit_factor'),
+    ('performance', 'sharpe_ratio'),
+    ('performance', 'max_drawdown'),
+    ('performance', 'max_drawdown_pct'),
+    ('performance', 'avg_hold_days'),
+    ('pattern', 'most_active_hour'),
+    ('pattern', 'most_active_day')
+]
+
+
+def default_store_dir(output_file):
+    """리포트 파일 옆에 두는 트레이더 저장소 디렉터리"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.store"
+
+
+def _encode(record, default):
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=default, allow_nan=False) + '\n').encode('utf-8')
+
+
+class StoreWriter:
+    """트레이더 레코드를 샤드 파일(JSON Lines)에 이어 쓰고 마지막에 인덱스를 기록
+
+    인덱스는 컬럼 단위 JSON으로 trader_id, INDEX_FIELDS 값, 레코드의 (샤드, 오프셋, 길이)를 담는다.
+    임시 디렉터리에 쓴 뒤 close()에서 기존 저장소와 교체한다.
+    """
+
+    def __init__(self, store_dir, shard_size=SHARD_SIZE, default=None):
+        self.store_dir = store_dir
+        self._tmp_dir = f"{store_dir}.tmp"
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        os.makedirs(self._tmp_dir)
+        self._shard_size = shard_size
+        self._default = default
+        self._columns = {'trader_id': [], 'shard': [], 'offset': [], 'length': []}
+        for section, key in INDEX_FIELDS:
+            self._columns[key] = []
+        self._file = None
+        self._shard = -1
+        self._offset = 0
+
+    def write(self, trader_id, record):
+        count = len(self._columns['trader_id'])
+        if count % self._shard_size == 0:
+            if self._file is not None:
+                self._file.close()
+            self._shard += 1
+            self._file = open(os.path.join(self._tmp_dir, f"shard_{self._shard:05d}.jsonl"), 'wb')
+            self._offset = 0
+
+        data = _encode(record, self._default)
+        self._file.write(data)
+        columns = self._columns
+        columns['trader_id'].append(trader_id)
+        columns['shard'].append(self._shard)
+        columns['offset'].append(self._offset)
+        columns['length'].append(len(data))
+        for section, key in INDEX_FIELDS:
+            columns[key].append((record.get(section) or {}).get(key))
+        self._offset += len(data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        with open(os.path.join(self._tmp_dir, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': STORE_VERSION,
+                'shards': self._shard + 1,
+                'columns': self._columns
+            }, f, ensure_ascii=False, separators=(',', ':'), default=self._default, allow_nan=False)
+
+        old_dir = f"{self.store_dir}.old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(self.store_dir):
+            os.rename(self.store_dir, old_dir)
+        os.rename(self._tmp_dir, self.store_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+
+    def abort(self):
+        if self._file is not None:
+            self._file.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+
+def is_store(path):
+    """저장소 디렉터리 여부 (index.json 존재)"""
+    return os.path.isfile(os.path.join(path, 'index.json'))
+
+
+class TraderStore:
+    """인덱스만 먼저 읽고 트레이더 레코드는 요청 시 샤드에서 읽어 LRU 캐시에 두는 저장소
+
+    시작 비용은 인덱스 크기(트레이더당 한 줄 분량)에만 비례하고, 레코드 조회는
+    샤드 파일의 해당 바이트 구간만 읽는다.
+    """
+
+    def __init__(self, store_dir, cache_size=CACHE_SIZE):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, 'index.json'), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"Unsupported store version: {index.get('version')}")
+        self.columns = index['columns']
+        self.trader_ids = self.columns['trader_id']
+        self._position = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+        self._read = lru_cache(maxsize=cache_size)(self._read_record)
+
+    def __len__(self):
+        return len(self.trader_ids)
+
+    def __contains__(self, trader_id):
+        return trader_id in self._position
+
+    def __iter__(self):
+        return iter(self.trader_ids)
+
+    def _read_record(self, i):
+        path = os.path.join(self.store_dir, f"shard_{self.columns['shard'][i]:05d}.jsonl")
+        with open(path, 'rb') as f:
+            f.seek(self.columns['offset'][i])
+            return json.loads(f.read(self.columns['length'][i]))
+
+    def get(self, trader_id):
+        """트레이더 레코드 (없으면 None) - 캐시된 딕셔너리이므로 수정하지 말 것"""
+        i = self._position.get(trader_id)
+        return None if i is None else self._read(i)
+
+    def index_row(self, trader_id):
+        """인덱스에 있는 필드만 담은 요약 딕셔너리"""
+        i = self._position.get(trader_id)
+        if i is None:
+            return None
+        return {name: values[i] for name, values in self.columns.items()
+                if name not in ('shard', 'offset', 'length')}
+
+    def values(self, field):
+        """인덱스 필드의 [(trader_id, 값)] (인덱스에 없는 필드면 None)"""
+        if field not in self.columns or field in ('shard', 'offset', 'length'):
+            return None
+        return list(zip(self.trader_ids, self.columns[field]))
+
+    def cache_info(self):
+        return self._read.cache_info()
@@ -0,0 +1,231 @@
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from trader_store import INDEX_FIELDS
+
+# 컬럼으로 보관하는 리포트 섹션 (스칼라 필드만, 중첩 값은 레코드에서 읽음)
+TABLE_SECTIONS = ('profile', 'performance', 'pattern')
+_SCALARS = (bool, int, float, str)
+
+
+class Column:
+    """필드 하나의 타입 지정 배열 (결측은 mask, 타입이 섞이면 object 배열로 원래 값 유지)"""
+
+    __slots__ = ('values', 'missing', 'kind', '_numeric')
+
+    def __init__(self, values):
+        types = {type(value) for value in values if value is not None}
+        missing = np.array([value is None for value in values], dtype=bool)
+        kind = types.pop() if len(types) == 1 else object
+        if kind in (int, float, bool):
+            dtype = {int: np.int64, float: np.float64, bool: np.bool_}[kind]
+            fill = {int: 0, float: np.nan, bool: False}[kind]
+            self.values = np.array([fill if value is None else value for value in values], dtype=dtype)
+        else:
+            self.values = np.empty(len(values), dtype=object)
+            self.values[:] = values
+        self.missing = missing if missing.any() else None
+        self.kind = kind
+        self._numeric = None
+
+    def get(self, i):
+        """i번째 값 (원래 파이썬 타입, 결측은 None)"""
+        if self.missing is not None and self.missing[i]:
+            return None
+        value = self.values[i]
+        return value if self.kind in (object, str) else self.kind(value)
+
+    def numeric(self):
+        """float64 배열 (숫자가 아니거나 결측이면 NaN) - 벡터 비교용"""
+        if self._numeric is None:
+            if self.kind in (int, float, bool):
+                numeric = self.values.astype(np.float64)
+            else:
+                numeric = np.array([value if isinstance(value, (int, float)) and not isinstance(value, bool)
+                                    else np.nan for value in self.values], dtype=np.float64)
+            if self.missing is not None:
+                numeric[self.missing] = np.nan
+            self._numeric = numeric
+        return self._numeric
+
+    def tolist(self):
+        return [self.get(i) for i in range(len(self.values))]
+
+
+class TraderTable:
+    """리포트의 스칼라 필드를 (섹션, 키)별 컬럼으로 보관하는 트레이더 테이블
+
+    검색은 행 번호 배열로 하고 결과는 TraderRow 뷰로 돌려주므로 레코드 딕셔너리를
+    복사하지 않는다. 컬럼에 없는 필드(중첩 값 등)는 뷰가 원래 레코드에서 읽는다.
+    저장소 기반 리포트(LazyReport)는 저장소 인덱스 컬럼만 테이블에 둔다.
+    """
+
+    def __init__(self, data, store=None):
+        self.data = data
+        self.trader_ids = list(data.keys())
+        self._position = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+        if store is not None:
+            raw = self._store_columns(store)
+        else:
+            raw = self._record_columns(data)
+        self.columns = {field: Column(values) for field, values in raw.items()}
+
+    @staticmethod
+    def _store_columns(store):
+        return {(section, key): store.columns[key] for section, key in INDEX_FIELDS if key in store.columns}
+
+    def _record_columns(self, data):
+        fields = {}
+        for record in data.values():
+            for section in TABLE_SECTIONS:
+                for key, value in (record.get(section) or {}).items():
+                    if (section, key) not in fields and (value is None or isinstance(value, _SCALARS)):
+                        fields[(section, key)] = None
+        raw = {field: [] for field in fields}
+        for record in data.values():
+            for (section, key), values in raw.items():
+                values.append((record.get(section) or {}).get(key))
+        # 일부 레코드에서 중첩 값이면 컬럼으로 두지 않는다
+        return {field: values for field, values in raw.items()
+                if all(value is None or isinstance(value, _SCALARS) for value in values)}
+
+    def __len__(self):
+        return len(self.trader_ids)
+
+    def __contains__(self, trader_id):
+        return trader_id in self._position
+
+    def position(self, trader_id):
+        """trader_id → 행 번호 (없으면 None)"""
+        return self._position.get(trader_id)
+
+    def column(self, section, key):
+        """(섹션, 키) 컬럼 (없으면 None)"""
+        return self.columns.get((section, key))
+
+    def values(self, section, key):
+        """필드 값 목록 (행 순서, 컬럼에 없으면 레코드에서 읽음)"""
+        column = self.column(section, key)
+        if column is not None:
+            return column.tolist()
+        return [(self.data[trader_id].get(section) or {}).get(key) for trader_id in self.trader_ids]
+
+    def record(self, i):
+        """i번째 트레이더의 원래 레코드 (수정하지 말 것)"""
+        return self.data[self.trader_ids[i]]
+
+    def row(self, trader_id, **extra):
+        """trader_id의 읽기 전용 뷰 (extra는 뷰에만 붙는 추가 키, 없으면 None)"""
+        i = self._position.get(trader_id)
+        return None if i is None else TraderRow(self, i, extra)
+
+    def rows(self, positions=None):
+        """행 번호 배열 → 지연 생성 뷰 목록 (None이면 전체)"""
+        if positions is None:
+            positions = np.arange(len(self.trader_ids))
+        return TraderRows(self, np.asarray(positions, dtype=np.int64))
+
+
+class SectionView(Mapping):
+    """트레이더 한 명의 섹션(profile/performance/pattern) 뷰 - 컬럼 값을 먼저, 없으면 레코드를 읽음"""
+
+    __slots__ = ('_table', '_i', '_section')
+
+    def __init__(self, table, i, section):
+        self._table, self._i, self._section = table, i, section
+
+    def _raw(self):
+        return self._table.record(self._i).get(self._section) or {}
+
+    def __getitem__(self, key):
+        column = self._table.columns.get((self._section, key))
+        if column is not None:
+            return column.get(self._i)
+        return self._raw()[key]
+
+    def __iter__(self):
+        return iter(self._raw())
+
+    def __len__(self):
+        return len(self._raw())
+
+    def to_dict(self):
+        return dict(self._raw())
+
+    def __repr__(self):
+        return f"SectionView({self._section}, {self._table.trader_ids[self._i]})"
+
+
+class TraderRow(Mapping):
+    """트레이더 레코드의 읽기 전용 뷰 ({**레코드, 'trader_id': ...}를 복사 없이)
+
+    대입한 키는 원래 레코드가 아니라 이 뷰에만 붙는다 (예: row['exposure'] = ...).
+    딕셔너리가 필요하면 to_dict()를 쓴다.
+    """
+
+    __slots__ = ('_table', '_i', '_extra')
+
+    def __init__(self, table, i, extra=None):
+        self._table, self._i = table, i
+        self._extra = extra or {}
+
+    @property
+    def trader_id(self):
+        return self._table.trader_ids[self._i]
+
+    def __getitem__(self, key):
+        if key in self._extra:
+            return self._extra[key]
+        if key == 'trader_id':
+            return self.trader_id
+        if key in TABLE_SECTIONS:
+            return SectionView(self._table, self._i, key)
+        return self._table.record(self._i)[key]
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+    def __iter__(self):
+        keys = list(self._table.record(self._i))
+        keys += [key for key in ('trader_id', *self._extra) if key not in keys]
+        return iter(keys)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def to_dict(self):
+        """{**레코드, 'trader_id': ..., **추가 키} 얕은 복사 딕셔너리"""
+        return {**self._table.record(self._i), 'trader_id': self.trader_id, **self._extra}
+
+    def __repr__(self):
+        return f"TraderRow({self.trader_id})"
+
+
+class TraderRows(Sequence):
+    """행 번호 배열 위의 뷰 목록 (인덱싱/순회할 때만 TraderRow 생성, 슬라이스는 번호 배열만 자름)"""
+
+    __slots__ = ('_table', 'positions')
+
+    def __init__(self, table, positions):
+        self._table = table
+        self.positions = positions
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return TraderRows(self._table, self.positions[index])
+        return TraderRow(self._table, int(self.positions[index]))
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        table = self._table
+        return (TraderRow(table, i) for i in self.positions.tolist())
+
+    @property
+    def trader_ids(self):
+        return [self._table.trader_ids[i] for i in self.positions.tolist()]
+
+    def to_dicts(self):
+        return [row.to_dict() for row in self]
@@ -0,0 +1,272 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+REQUIRED_COLUMNS = [
+    'trader_id', 'date', 'time', 'symbol', 'side', 'quantity', 'price', 'commission', 'total_amount'
+]
+NUMERIC_COLUMNS = ['quantity', 'price', 'commission', 'total_amount']
+SIDES = ('Buy', 'Sell')
+AMOUNT_TOLERANCE = 0.01  # total_amount와 quantity x price ± commission 허용 오차
+
+# 행별 플래그 비트
+FLAGS = {
+    'missing_value': 1,
+    'bad_type': 2,
+    'bad_side': 4,
+    'non_positive': 8,
+    'bad_datetime': 16,
+    'duplicate': 32,
+    'unknown_trader': 64,
+    'amount_mismatch': 128,
+    'sell_without_buy': 256,
+}
+# 분석에서 빼는 플래그 (나머지는 경고만 하고 분석에 남긴다)
+QUARANTINE_FLAGS = (
+    FLAGS['missing_value'] | FLAGS['bad_type'] | FLAGS['bad_side'] | FLAGS['non_positive']
+    | FLAGS['bad_datetime'] | FLAGS['duplicate'] | FLAGS['unknown_trader']
+)
+
+
+def default_quarantine_path(output_file):
+    """리포트 파일 옆에 두는 격리 행 CSV 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.quarantine.csv"
+
+
+def default_validation_path(output_file):
+    """리포트 파일 옆에 두는 검증 요약 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.validation.json"
+
+
+def has_bom(path):
+    """파일이 UTF-8 BOM으로 시작하는지"""
+    if path is None or path.endswith('.parquet'):
+        return False
+    with open(path, 'rb') as f:
+        return f.read(3) == b'\xef\xbb\xbf'
+
+
+def clean_header(frame):
+    """컬럼명의 BOM/앞뒤 공백 제거 → (frame, {원래 이름: 바뀐 이름})"""
+    renamed = {}
+    for name in frame.columns:
+        cleaned = str(name).replace('\ufeff', '').strip()
+        if cleaned != name:
+            renamed[name] = cleaned
+    return (frame.rename(columns=renamed) if renamed else frame), renamed
+
+
+def issue_names(flags):
+    """플래그 값 → 'a|b' 형식 문제 이름"""
+    return '|'.join(name for name, bit in FLAGS.items() if flags & bit)
+
+
+def _mark(flags, mask, name):
+    """mask가 참인 행에 플래그 비트 설정"""
+    flags[mask] |= FLAGS[name]
+
+
+def _enforce_numeric(frame, flags):
+    """숫자 컬럼을 float64/int64로 맞추고 변환 실패는 bad_type으로 표시 → 변환된 컬럼 딕셔너리"""
+    columns = {}
+    for name in NUMERIC_COLUMNS:
+        series = frame[name]
+        if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            converted = pd.to_numeric(series.astype(object), errors='coerce')
+            _mark(flags, series.notna().to_numpy() & converted.isna().to_numpy(), 'bad_type')
+            series = converted
+        columns[name] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    quantity = columns['quantity']
+    fractional = np.isfinite(quantity) & (quantity != np.round(quantity))
+    _mark(flags, fractional, 'bad_type')
+    return columns
+
+
+def _codes(series):
+    """범주형이면 범주 코드, 아니면 factorize 코드 → (int64 코드, 고유값 수) (결측은 -1)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy().astype(np.int64), len(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=False)
+    return codes.astype(np.int64), len(uniques)
+
+
+def _sorted_rows(transactions, times, is_sell, keyed):
+    """keyed 행을 (트레이더, 종목, 시각, 매수 먼저) 순으로 정렬 → (행 번호, 종목 쌍 코드, 정렬 키)
+
+    두 코드와 시각을 int64 키 하나로 합쳐 한 번에 정렬하고, 이미 정렬돼 있으면 생략한다.
+    키가 같은 행은 (트레이더, 종목, 시각, 매수/매도)가 같다.
+    """
+    trader_codes, _ = _codes(transactions['trader_id'])
+    symbol_codes, n_symbols = _codes(transactions['symbol'])
+    pair = trader_codes * n_symbols + symbol_codes
+    rows, t, sells = np.arange(len(keyed)), times, is_sell
+    if not keyed.all():
+        rows = np.flatnonzero(keyed)
+        pair, t, sells = pair[rows], t[rows], sells[rows]
+    if len(rows) == 0:
+        return rows, pair, pair
+    offset = t.min()
+    span = int(t.max() - offset) + 1
+    if (int(pair.max()) + 1) * span * 2 < 2 ** 62:
+        key = pair * span
+        key += t
+        key -= offset
+        key *= 2
+        key += sells
+        if (np.diff(key) >= 0).all():
+            return rows, pair, key
+        order = np.argsort(key, kind='stable')
+        return rows[order], pair[order], key[order]
+    # 키 하나로 합칠 수 없으면 정렬 후 (종목 쌍, 시각, 매도)가 바뀌는 지점마다 증가하는 키
+    order = np.lexsort((sells, t, pair))
+    pair, t, sells = pair[order], t[order], sells[order]
+    changed = np.r_[True, (pair[1:] != pair[:-1]) | (t[1:] != t[:-1]) | (sells[1:] != sells[:-1])]
+    return rows[order], pair, np.cumsum(changed)
+
+
+def _duplicates(transactions, columns, rows, key):
+    """정렬 키가 같은 행 묶음 안에서만 전체 컬럼 해시로 중복 검사 (처음 나온 행은 제외)
+
+    중복 행은 정렬 키도 같으므로 키가 겹치는 후보만 해시해 전체 행 해시를 피한다.
+    """
+    duplicate = np.zeros(len(transactions), dtype=bool)
+    tie = np.zeros(len(rows), dtype=bool)
+    same = key[1:] == key[:-1]
+    tie[1:] |= same
+    tie[:-1] |= same
+    candidates = np.sort(rows[tie])
+    if len(candidates):
+        hashes = pd.util.hash_pandas_object(transactions.iloc[candidates][columns], index=False)
+        duplicate[candidates[hashes.duplicated(keep='first').to_numpy()]] = True
+    return duplicate
+
+
+def _sell_without_buy(rows, pair, is_sell, quantity, n):
+    """정렬된 행에서 (트레이더, 종목)별 누적 수량이 음수가 되는 매도 행 (시각이 같으면 매수 먼저)"""
+    short = np.zeros(n, dtype=bool)
+    if len(rows) == 0:
+        return short
+    sells = is_sell[rows]
+    signed = np.where(sells, -quantity[rows], quantity[rows])
+    position = np.cumsum(signed)
+    starts = np.flatnonzero(np.r_[True, pair[1:] != pair[:-1]])
+    base = np.repeat(position[starts] - signed[starts], np.diff(np.append(starts, len(rows))))
+    short[rows[sells & (position - base < -1e-9)]] = True
+    return short
+
+
+def validate_transactions(transactions, profiles=None, source_file=None):
+    """거래 데이터의 타입/일관성 검사를 컬럼 단위 배열 연산으로 수행
+
+    반환값은 (분석에 쓸 행, 격리 행, 요약)이다. 격리 행에는 flags(비트마스크)와 issues
+    컬럼이 붙는다. 금액 불일치와 매수 없는 매도는 경고로만 집계하고 분석에 남긴다
+    (순번 매칭은 매도가 먼저 나와도 짝을 짓는다). 격리할 행이 없으면 입력 프레임을
+    그대로 돌려주므로 검증을 켜도 리포트는 같다.
+    """
+    transactions, renamed = clean_header(transactions)
+    missing_columns = [name for name in REQUIRED_COLUMNS if name not in transactions.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    n = len(transactions)
+    flags = np.zeros(n, dtype=np.uint16)
+    numeric = _enforce_numeric(transactions, flags)
+
+    missing = np.zeros(n, dtype=bool)
+    for name in REQUIRED_COLUMNS:
+        missing |= transactions[name].isna().to_numpy()
+    _mark(flags, missing, 'missing_value')
+
+    side = transactions['side']
+    is_sell = (side == 'Sell').to_numpy(dtype=bool, na_value=False)
+    _mark(flags, ~side.isin(SIDES).to_numpy(), 'bad_side')
+
+    quantity, price = numeric['quantity'], numeric['price']
+    commission, total = numeric['commission'], numeric['total_amount']
+    with np.errstate(invalid='ignore'):
+        non_positive = (quantity <= 0) | (price <= 0) | (commission < 0) | (total < 0)
+        expected = quantity * price + np.where(is_sell, -commission, commission)
+        mismatch = np.abs(expected - total) > AMOUNT_TOLERANCE + 1e-9 * np.abs(total)
+    _mark(flags, non_positive, 'non_positive')
+    _mark(flags, mismatch, 'amount_mismatch')
+
+    if 'datetime' in transactions.columns:
+        datetimes = transactions['datetime'].to_numpy(dtype='datetime64[s]')
+    else:
+        datetimes = pd.to_datetime(
+            transactions['date'].astype(str) + ' ' + transactions['time'].astype(str), errors='coerce'
+        ).to_numpy(dtype='datetime64[s]')
+    bad_datetime = np.isnat(datetimes) & ~missing
+    _mark(flags, bad_datetime, 'bad_datetime')
+
+    # 결측/날짜 오류 행은 정렬 키를 만들 수 없어 중복/매수 없는 매도 검사에서 빠진다 (이미 격리 대상)
+    original = [name for name in transactions.columns if name != 'datetime']
+    rows, pair, key = _sorted_rows(transactions, datetimes.astype(np.int64), is_sell, ~(missing | bad_datetime))
+    _mark(flags, _duplicates(transactions, original, rows, key), 'duplicate')
+
+    unknown_traders = []
+    if profiles is not None:
+        known = pd.Index(profiles['trader_id'].unique())
+        unknown = ~transactions['trader_id'].isin(known).to_numpy() & ~missing
+        _mark(flags, unknown, 'unknown_trader')
+        unknown_traders = sorted(transactions['trader_id'][unknown].astype(str).unique().tolist())
+
+    valid = (flags & QUARANTINE_FLAGS) == 0
+    kept = valid[rows]
+    _mark(flags, _sell_without_buy(rows[kept], pair[kept], is_sell, quantity, n), 'sell_without_buy')
+
+    quarantined = ~valid
+    summary = {
+        'rows': n,
+        'clean_rows': int(valid.sum()),
+        'quarantined_rows': int(quarantined.sum()),
+        'flags': {name: int(np.count_nonzero(flags & bit)) for name, bit in FLAGS.items()},
+        'header': {'bom': has_bom(source_file), 'renamed': renamed},
+        'unknown_traders': unknown_traders,
+        'duplicate_profiles': int(profiles['trader_id'].duplicated().sum()) if profiles is not None else 0,
+    }
+
+    quarantine = transactions.iloc[np.flatnonzero(quarantined)][original].copy()
+    quarantine['flags'] = flags[quarantined]
+    quarantine['issues'] = [issue_names(value) for value in flags[quarantined].tolist()]
+    if not quarantined.any():
+        return transactions, quarantine, summary
+
+    clean = transactions.iloc[np.flatnonzero(valid)].reset_index(drop=True)
+    for name in NUMERIC_COLUMNS:
+        values = numeric[name][valid]
+        clean[name] = values.astype(np.int64) if name == 'quantity' else values
+    for name in clean.columns:
+        if isinstance(clean[name].dtype, pd.CategoricalDtype):
+            clean[name] = clean[name].cat.remove_unused_categories()
+    return clean, quarantine, summary
+
+
+def print_validation_summary(summary):
+    """검증 요약 콘솔 출력"""
+    if summary['header']['bom']:
+        print("[WARNING] Transactions file starts with a UTF-8 BOM (stripped from header)")
+    if summary['header']['renamed']:
+        print(f"[WARNING] Renamed columns: {summary['header']['renamed']}")
+    issues = ', '.join(f"{name}={count}" for name, count in summary['flags'].items() if count)
+    print(f"[OK] Validated {summary['rows']:,} rows: {summary['clean_rows']:,} clean, "
+          f"{summary['quarantined_rows']:,} quarantined" + (f" ({issues})" if issues else ''))
+
+
+def save_validation(output_file, quarantine, summary):
+    """격리 행 CSV와 검증 요약 JSON을 리포트 옆에 저장 (임시 파일 후 교체) → (격리 경로, 요약 경로)"""
+    quarantine_path = default_quarantine_path(output_file)
+    tmp_path = f"{quarantine_path}.tmp"
+    quarantine.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, quarantine_path)
+
+    summary_path = default_validation_path(output_file)
+    tmp_path = f"{summary_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, summary_path)
+    return quarantine_path, summary_path
@@ -0,0 +1,148 @@
+import math
+import zlib
+
+import numpy as np
+
+from cohorts import COHORT_METRICS
+
+# 임베딩에 쓰는 프로필 텍스트 필드와 지표 (지표는 코호트 통계와 같은 목록)
+PROFILE_FIELDS = ('trading_style', 'risk_tolerance', 'preferred_sectors', 'education', 'certifications',
+                  'performance_goal')
+METRIC_FIELDS = tuple(COHORT_METRICS)
+TEXT_DIM = 1 << 9  # 해시 char n-gram 버킷 수
+NGRAM_SIZES = (2, 3)
+PROFILE_WEIGHT = 0.5  # 유사 트레이더 점수에서 프로필 텍스트 비중 (나머지는 지표)
+Z_CLIP = 3.0  # 지표 z-score 절단 (꼬리가 긴 손익이 거리를 지배하지 않도록)
+BLOCK_ROWS = 1 << 16  # 이보다 많은 트레이더는 행 블록 단위로 점수 계산
+
+
+def char_ngrams(text):
+    """텍스트 → 단어별 char n-gram 목록 (단어 앞뒤 공백 포함, 소문자, '/'와 ','도 단어 구분)"""
+    grams = []
+    for token in str(text).lower().replace('/', ' ').replace(',', ' ').split():
+        token = f" {token} "
+        for size in NGRAM_SIZES:
+            grams.extend(token[i:i + size] for i in range(len(token) - size + 1))
+    return grams
+
+
+def _buckets(text, cache):
+    """텍스트 → n-gram 해시 버킷 배열 (같은 값은 한 번만 계산)"""
+    buckets = cache.get(text)
+    if buckets is None:
+        buckets = cache[text] = np.array(
+            [zlib.crc32(gram.encode('utf-8')) % TEXT_DIM for gram in char_ngrams(text)], dtype=np.int64)
+    return buckets
+
+
+def _normalize(matrix):
+    """행별 L2 정규화 (영벡터는 그대로)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _top_k(scores, top_k):
+    """점수 행렬 (질의 x 후보) → 질의별 상위 top_k 열 번호 (점수 내림차순, 동률은 번호 순)"""
+    if scores.shape[1] > top_k:
+        # k번째 점수보다 큰 열 전부 + 같은 점수는 번호가 작은 것부터 (argpartition은 동률 선택이 임의라서)
+        kth = -np.partition(-scores, top_k - 1, axis=1)[:, top_k - 1:top_k]
+        above = scores > kth
+        tied = scores == kth
+        need = top_k - above.sum(axis=1, keepdims=True)
+        mask = above | (tied & (np.cumsum(tied, axis=1) <= need))
+        candidates = np.nonzero(mask)[1].reshape(len(scores), top_k)
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    picked = np.take_along_axis(scores, candidates, axis=1)
+    order = np.lexsort((candidates, -picked), axis=1)
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class VectorIndex:
+    """트레이더 프로필 텍스트(해시 char n-gram TF-IDF)와 정규화 지표 벡터의 오프라인 임베딩
+
+    행 벡터는 [sqrt(w) * 텍스트, sqrt(1 - w) * 지표] (각각 L2 정규화)이므로 내적 한 번이
+    가중 코사인 유사도다. 질의 여러 개는 (질의 x 차원) 행렬 하나로 모아 행렬 곱 한 번에 점수를
+    내고, 트레이더가 BLOCK_ROWS보다 많으면 행 블록마다 상위 후보만 남겨 합친다.
+    """
+
+    def __init__(self, profiles, metrics):
+        """profiles: {필드: 값 목록}, metrics: {지표: 값 목록} (모두 트레이더 행 순서)"""
+        n = len(next(iter(profiles.values()))) if profiles else 0
+        cache = {}
+        rows, cols = [], []
+        for values in profiles.values():
+            for i, value in enumerate(values):
+                if value is None or (isinstance(value, float) and math.isnan(value)):
+                    continue
+                buckets = _buckets(value, cache)
+                rows.append(np.full(len(buckets), i, dtype=np.int64))
+                cols.append(buckets)
+        counts = np.zeros((n, TEXT_DIM), dtype=np.float32)
+        if rows:
+            np.add.at(counts, (np.concatenate(rows), np.concatenate(cols)), 1.0)
+        df = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        text = _normalize(np.log1p(counts) * self.idf)
+
+        values = np.array([[np.nan if v is None else v for v in metrics[field]] for field in metrics],
+                          dtype=np.float64).T.reshape(n, len(metrics))
+        with np.errstate(invalid='ignore'):
+            mean, std = np.nanmean(values, axis=0), np.nanstd(values, axis=0)
+            z = np.clip((values - mean) / np.where(std > 0, std, 1.0), -Z_CLIP, Z_CLIP)
+        z = _normalize(np.nan_to_num(z, nan=0.0).astype(np.float32))
+
+        self.text_scale = math.sqrt(PROFILE_WEIGHT)
+        self.matrix = np.hstack([text * self.text_scale, z * math.sqrt(1 - PROFILE_WEIGHT)])
+
+    def __len__(self):
+        return len(self.matrix)
+
+    def embed_text(self, texts):
+        """자유 텍스트 목록 → 질의 행렬 (텍스트 부분만 채우고 지표 부분은 0)"""
+        cache = {}
+        counts = np.zeros((len(texts), TEXT_DIM), dtype=np.float32)
+        for i, text in enumerate(texts):
+            np.add.at(counts[i], _buckets(text, cache), 1.0)
+        queries = np.zeros((len(texts), self.matrix.shape[1]), dtype=np.float32)
+        queries[:, :TEXT_DIM] = _normalize(np.log1p(counts) * self.idf)
+        return queries
+
+    def search(self, queries, top_k=5, exclude=None):
+        """질의 행렬 → 질의별 [(행 번호, 점수)] (exclude[q]는 q번 질의에서 뺄 행 번호, 예: 자기 자신)"""
+        extra = 0 if exclude is None else 1
+        k = min(top_k + extra, len(self.matrix))
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+        if len(self.matrix) <= BLOCK_ROWS:
+            scores = queries @ self.matrix.T
+            best = _top_k(scores, k)
+            best_scores = np.take_along_axis(scores, best, axis=1)
+        else:
+            best = np.zeros((len(queries), 0), dtype=np.int64)
+            best_scores = np.zeros((len(queries), 0), dtype=np.float32)
+            for start in range(0, len(self.matrix), BLOCK_ROWS):
+                block = queries @ self.matrix[start:start + BLOCK_ROWS].T
+                picked = _top_k(block, min(k, block.shape[1]))
+                best = np.hstack([best, picked + start])
+                best_scores = np.hstack([best_scores, np.take_along_axis(block, picked, axis=1)])
+                keep = _top_k(best_scores, min(k, best.shape[1]))
+                best = np.take_along_axis(best, keep, axis=1)
+                best_scores = np.take_along_axis(best_scores, keep, axis=1)
+
+        results = []
+        for q in range(len(queries)):
+            hits = [(int(i), round(float(s), 4)) for i, s in zip(best[q].tolist(), best_scores[q].tolist())
+                    if exclude is None or i != exclude[q]]
+            results.append(hits[:top_k])
+        return results
+
+    def similar(self, positions, top_k=5):
+        """트레이더 행 번호 목록 → 각자 프로필+지표가 가장 비슷한 [(행 번호, 점수)] (자기 자신 제외)"""
+        positions = list(positions)
+        return self.search(self.matrix[positions], top_k, exclude=positions)
+
+    def text_search(self, texts, top_k=5):
+        """자유 텍스트 목록 → 프로필 텍스트 코사인 유사도 상위 [(행 번호, 점수)]"""
+        hits = self.search(self.embed_text(texts), top_k)
+        return [[(i, round(score / self.text_scale, 4)) for i, score in found] for found in hits]
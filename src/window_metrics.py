@@ -0,0 +1,151 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from segments import segment_bounds, segment_cumsum
+
+# 구간 합계 컬럼 (각 트레이더 구간 앞에 0을 둔 누적합)
+PREFIX_COLUMNS = ('pnl', 'wins', 'returns', 'returns_sq')
+
+
+def default_window_index_path(output_file):
+    """리포트 파일 옆에 두는 기간 지표 인덱스 파일 경로"""
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.prefix.npz"
+
+
+def _seconds(value):
+    """날짜/문자열/Timestamp → epoch 초 (None은 그대로)"""
+    if value is None:
+        return None
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[s]').astype(np.int64))
+
+
+def _label(value):
+    """기록용 기간 경계 문자열"""
+    return None if value is None else pd.Timestamp(value).isoformat()
+
+
+def _with_leading_zero(values, counts):
+    """트레이더별 누적합 앞에 0을 끼워 (행 수 + 트레이더 수) 길이로"""
+    cumulative = segment_cumsum(values, counts)
+    positions = np.arange(len(values)) + np.repeat(np.arange(len(counts)), counts) + 1
+    out = np.zeros(len(values) + len(counts), dtype=cumulative.dtype)
+    out[positions] = cumulative
+    return out
+
+
+def build_window_index(round_trips):
+    """라운드트립을 트레이더별 청산 시각 순으로 정렬하고 구간 누적합 계산
+
+    반환값은 trader_ids, offsets(트레이더별 행 범위), times(청산 시각, epoch 초)와
+    PREFIX_COLUMNS 누적합 배열의 딕셔너리다. 트레이더 i의 k번째 행까지 합계는
+    prefix[offsets[i] + i + k]에 있다.
+    """
+    if len(round_trips) == 0:
+        empty = {'trader_ids': np.array([], dtype=str), 'offsets': np.zeros(1, dtype=np.int64),
+                 'times': np.array([], dtype=np.int64)}
+        empty.update({name: np.zeros(0) for name in PREFIX_COLUMNS})
+        return empty
+
+    trader_ids = round_trips['trader_id'].to_numpy()
+    starts, counts = segment_bounds(trader_ids)
+    seg = np.repeat(np.arange(len(starts)), counts)
+    times = round_trips['sell_date'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    order = np.lexsort((times, seg))
+
+    pnl = round_trips['pnl'].to_numpy(dtype=np.float64)[order]
+    returns = round_trips['pnl_pct'].to_numpy(dtype=np.float64)[order]
+    return {
+        'trader_ids': np.asarray(trader_ids[starts], dtype=str),
+        'offsets': np.append(starts, len(round_trips)).astype(np.int64),
+        'times': times[order],
+        'pnl': _with_leading_zero(pnl, counts),
+        'wins': _with_leading_zero(pnl > 0, counts).astype(np.int64),
+        'returns': _with_leading_zero(returns, counts),
+        'returns_sq': _with_leading_zero(returns ** 2, counts)
+    }
+
+
+def save_window_index(path, index):
+    """기간 지표 인덱스를 압축 .npz로 저장 (임시 파일 후 교체)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez_compressed(f, **index)
+    os.replace(tmp_path, path)
+
+
+def window_record(trader_id, start, end, n, wins, pnl, returns, returns_sq):
+    """구간 합계로 performance_record와 같은 반올림의 기간 지표 딕셔너리 생성
+
+    샤프 비율은 합계/제곱합으로 구한 표본 표준편차(ddof=1)를 쓰므로 전체 기간 값과
+    마지막 자리에서 다를 수 있다.
+    """
+    mean_return = returns / n if n > 0 else 0
+    std_return = np.sqrt(max(returns_sq - returns * mean_return, 0) / (n - 1)) if n > 1 else 0
+    sharpe_ratio = (mean_return / std_return * np.sqrt(252)) if std_return != 0 else 0
+    return {
+        'trader_id': trader_id,
+        'start': start,
+        'end': end,
+        'total_trades': n,
+        'winning_trades': wins,
+        'win_rate': round(wins / n * 100, 2) if n > 0 else 0,
+        'total_pnl': round(pnl, 2),
+        'avg_return_pct': round(mean_return, 2),
+        'sharpe_ratio': round(float(sharpe_ratio), 2)
+    }
+
+
+class WindowMetrics:
+    """save_window_index로 저장한 인덱스로 임의 기간 [start, end) 지표를 이진 탐색 두 번으로 계산"""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        self.trader_ids = arrays.pop('trader_ids').tolist()
+        self._offsets = arrays.pop('offsets')
+        self._times = arrays.pop('times')
+        self._prefix = arrays
+        self._index = {trader_id: i for i, trader_id in enumerate(self.trader_ids)}
+
+    def __contains__(self, trader_id):
+        return trader_id in self._index
+
+    @property
+    def last_time(self):
+        """전체 데이터의 마지막 청산 시각 (없으면 None)"""
+        return pd.Timestamp(int(self._times.max()), unit='s') if len(self._times) else None
+
+    def _sums(self, i, lo, hi):
+        """트레이더 i의 구간 행 [lo, hi) 합계"""
+        base = self._offsets[i] + i
+        return {name: values[base + hi] - values[base + lo] for name, values in self._prefix.items()}
+
+    def metrics_between(self, trader_id, start=None, end=None):
+        """청산 시각이 [start, end)인 라운드트립의 승률/손익/평균 수익률/샤프 (트레이더가 없으면 None)
+
+        start/end는 날짜 문자열, date, Timestamp 또는 None(열린 구간)이다.
+        """
+        i = self._index.get(trader_id)
+        if i is None:
+            return None
+        times = self._times[self._offsets[i]:self._offsets[i + 1]]
+        lo = 0 if start is None else int(np.searchsorted(times, _seconds(start), 'left'))
+        hi = len(times) if end is None else int(np.searchsorted(times, _seconds(end), 'left'))
+        hi = max(lo, hi)
+        sums = self._sums(i, lo, hi)
+        return window_record(
+            trader_id, _label(start), _label(end), hi - lo, int(sums['wins']),
+            float(sums['pnl']), float(sums['returns']), float(sums['returns_sq'])
+        )
+
+    def all_between(self, start=None, end=None, min_trades=1):
+        """전체 트레이더의 [start, end) 지표 목록 (구간 거래가 min_trades 미만이면 제외)"""
+        results = []
+        for trader_id in self.trader_ids:
+            record = self.metrics_between(trader_id, start, end)
+            if record['total_trades'] >= min_trades:
+                results.append(record)
+        return results
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# src/ 모듈은 서로 최상위 이름으로 import하므로 (analyzer.py와 같은 방식) 경로에 추가
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
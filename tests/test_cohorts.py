@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from cohorts import EXPERIENCE_BUCKETS, build_cohorts, cohort_key, experience_bounds, experience_bucket
+
+
+@pytest.mark.parametrize('years, label', [
+    (0, '0-2'), (2, '0-2'), (3, '3-5'), (5, '3-5'), (6, '6-10'), (10, '6-10'), (11, '11+'), (40, '11+'),
+    (-1, None), (None, None), (float('nan'), None), ('3-5', '3-5'),
+])
+def test_experience_bucket(years, label):
+    assert experience_bucket(years) == label
+
+
+def test_bounds_cover_every_year_once():
+    for years in range(0, 30):
+        inside = [label for label, _ in EXPERIENCE_BUCKETS
+                  if experience_bounds(label)[0] <= years
+                  and (experience_bounds(label)[1] is None or years < experience_bounds(label)[1])]
+        assert inside == [experience_bucket(years)]
+
+
+def test_cells_are_keyed_by_experience_band():
+    rng = np.random.default_rng(3)
+    results = {
+        f"T{i:03d}": {
+            'profile': {'trading_style': rng.choice(['단기매매', '장기투자']), 'risk_tolerance': '중위험',
+                        'years_experience': int(rng.integers(0, 15))},
+            'performance': {'win_rate': float(rng.uniform(30, 70)), 'total_trades': int(rng.integers(1, 40))},
+        }
+        for i in range(120)
+    }
+    cohorts = build_cohorts(results)
+    assert cohorts['experience_buckets'] == [label for label, _ in EXPERIENCE_BUCKETS]
+
+    for label, _ in EXPERIENCE_BUCKETS:
+        members = [r for r in results.values() if experience_bucket(r['profile']['years_experience']) == label]
+        cell = cohorts['cells'][cohort_key(None, None, label)]
+        assert cell['traders'] == len(members)
+        assert cell['win_rate']['mean'] == pytest.approx(np.mean([r['performance']['win_rate'] for r in members]),
+                                                         abs=1e-4)
+        # 연수로 찾아도 같은 구간 셀
+        assert cohort_key(None, None, experience_bounds(label)[0]) == cohort_key(None, None, label)
+
+    for trader_id, record in results.items():
+        profile = record['profile']
+        expected = cohort_key(profile['trading_style'], profile['risk_tolerance'], profile['years_experience'])
+        assert cohorts['ranks'][trader_id]['cohort'] == expected
+        assert expected.endswith(experience_bucket(profile['years_experience']))
@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from exposure import exposure_timeline
+from lots import LOT_METHODS, match_lots
+
+
+def _transactions(rows):
+    return pd.DataFrame(rows, columns=['trader_id', 'symbol', 'side', 'quantity', 'price', 'total_amount', 'datetime'])
+
+
+@pytest.mark.parametrize('method', LOT_METHODS)
+def test_lot_methods_keep_remaining_lots_open(method):
+    t = pd.Timestamp('2024-01-02 09:00')
+    tx = _transactions([
+        ('T1', 'AAA', 'Buy', 100, 10.0, 1000.0, t),
+        ('T1', 'AAA', 'Buy', 100, 12.0, 1200.0, t + pd.Timedelta(days=1)),
+        ('T1', 'AAA', 'Sell', 150, 11.0, 1650.0, t + pd.Timedelta(days=2)),
+        ('T1', 'BBB', 'Buy', 10, 50.0, 500.0, t + pd.Timedelta(days=3)),
+    ])
+    round_trips, positions, open_lots = match_lots(tx, method, open_lots=True)
+    assert match_lots(tx, method)[1].equals(positions)
+
+    # 남은 로트의 수량/원가 합은 잔여 포지션과 같다
+    by_symbol = open_lots.groupby('symbol')[['quantity', 'total_amount']].sum()
+    held = positions.set_index('symbol')
+    assert by_symbol['quantity'].to_dict() == held['quantity'].to_dict()
+    assert np.allclose(by_symbol['total_amount'], held.loc[by_symbol.index, 'cost_basis'])
+
+    end = t + pd.Timedelta(days=10)
+    timeline = exposure_timeline(round_trips, open_lots, end_time=end)
+    # 데이터 끝에서도 남은 로트만큼 열려 있다 (AAA 50주 + BBB 10주)
+    assert timeline['positions'][-1] == len(open_lots)
+    assert timeline['exposure'][-1] == pytest.approx(open_lots['total_amount'].sum())
+    assert timeline['exposure'][-1] > 500.0
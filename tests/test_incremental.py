@@ -0,0 +1,33 @@
+from pathlib import Path
+
+import pytest
+
+from analyzer import TradingPerformanceAnalyzer
+from incremental import default_checkpoint_path, output_formats, sources_unchanged
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+TRANSACTIONS = str(DATA / 'trading_transactions_enhanced.csv')
+PROFILES = str(DATA / 'trader_profiles_enhanced.csv')
+SOURCES = [TRANSACTIONS, PROFILES]
+
+
+def _update(output, **formats):
+    analyzer = TradingPerformanceAnalyzer(TRANSACTIONS, PROFILES, use_cache=False, **formats)
+    analyzer.update_report(output)
+
+
+@pytest.mark.parametrize('formats', [
+    {'msgpack': True}, {'store': True}, {'compact_json': True}, {'msgpack': True, 'store': True},
+])
+def test_changed_output_formats_are_not_unchanged(tmp_path, formats):
+    pytest.importorskip('msgpack')
+    output = str(tmp_path / 'r.json')
+    checkpoint = default_checkpoint_path(output)
+    _update(output)
+    assert sources_unchanged(checkpoint, SOURCES, output, formats=output_formats())
+    # 형식만 바꾼 재실행은 건너뛰면 안 된다
+    assert not sources_unchanged(checkpoint, SOURCES, output, formats=output_formats(**formats))
+
+    _update(output, **formats)
+    assert sources_unchanged(checkpoint, SOURCES, output, formats=output_formats(**formats))
+    assert not sources_unchanged(checkpoint, SOURCES, output, formats=output_formats())
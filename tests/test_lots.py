@@ -0,0 +1,129 @@
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import lots
+from lots import LOT_METHODS, match_lots
+
+
+def _random_transactions(seed, n_rows=600, n_traders=5, n_symbols=4):
+    """부분 체결, 보유량보다 큰 매도(미체결 수량), 같은 시각 체결이 섞인 거래"""
+    rng = np.random.default_rng(seed)
+    quantity = rng.choice([1, 5, 10, 25, 40, 100], n_rows)
+    price = np.round(rng.uniform(10, 100, n_rows), 2)
+    is_sell = rng.random(n_rows) < 0.45
+    commission = np.round(quantity * price * 0.001, 2)
+    start = np.datetime64('2024-01-01T09:00:00', 's')
+    return pd.DataFrame({
+        'trader_id': rng.choice([f"T{i}" for i in range(n_traders)], n_rows),
+        'symbol': rng.choice([f"S{i}" for i in range(n_symbols)], n_rows),
+        'side': np.where(is_sell, 'Sell', 'Buy'),
+        'quantity': quantity,
+        'price': price,
+        'total_amount': np.where(is_sell, quantity * price - commission, quantity * price + commission),
+        'datetime': (start + rng.integers(0, 30 * 86400, n_rows).astype('timedelta64[s]')).astype('datetime64[ns]'),
+    })
+
+
+def _naive(transactions, method):
+    """종목별 로트 목록을 거래 한 건씩 갱신하는 기준 구현 (라운드트립, 포지션, 남은 로트)"""
+    tx = transactions.copy()
+    tx['_trader'] = pd.factorize(tx['trader_id'])[0]
+    tx['_pair'] = pd.factorize(tx['_trader'].astype(str) + '|' + tx['symbol'])[0]
+    tx = tx.sort_values(['_trader', '_pair', 'datetime'], kind='stable')
+
+    trips, positions, open_lots = [], [], []
+    for (trader_id, symbol), group in tx.groupby(['trader_id', 'symbol'], sort=False):
+        book = deque()  # [매수 시각, 매수가, 원래 수량, 원래 금액, 남은 수량]
+        held, cost, price_basis, opened, unmatched = 0, 0.0, 0.0, None, 0
+        for row in group.itertuples():
+            if row.side == 'Buy':
+                if held == 0:
+                    opened = row.datetime
+                book.append([row.datetime, row.price, row.quantity, row.total_amount, row.quantity])
+                held += row.quantity
+                cost += row.total_amount
+                price_basis += row.price * row.quantity
+                continue
+            filled = min(row.quantity, held)
+            unmatched += row.quantity - filled
+            if filled == 0:
+                continue
+            proceeds = row.total_amount if filled == row.quantity else row.total_amount * filled / row.quantity
+            if method == 'average':
+                piece_cost = cost if filled == held else cost * filled / held
+                pieces = [(opened, price_basis / held, filled, piece_cost, proceeds)]
+                cost *= (held - filled) / held
+                price_basis *= (held - filled) / held
+                book = deque([[opened, None, held - filled, None, held - filled]]) if held > filled else deque()
+            else:
+                pieces, need = [], filled
+                while need:
+                    lot = book[0] if method == 'fifo' else book[-1]
+                    take = min(need, lot[4])
+                    piece_cost = lot[3] if take == lot[2] else lot[3] * take / lot[2]
+                    piece_proceeds = proceeds if take == filled else row.total_amount * take / row.quantity
+                    pieces.append((lot[0], lot[1], take, piece_cost, piece_proceeds))
+                    lot[4] -= take
+                    need -= take
+                    if lot[4] == 0:
+                        book.popleft() if method == 'fifo' else book.pop()
+                cost = sum(lot[3] if lot[4] == lot[2] else lot[3] * lot[4] / lot[2] for lot in book)
+            held -= filled
+            for buy_date, buy_price, quantity, piece_cost, piece_proceeds in pieces:
+                pnl = piece_proceeds - piece_cost
+                trips.append((trader_id, symbol, buy_date, row.datetime, buy_price, row.price, quantity, pnl,
+                              pnl / piece_cost * 100, (row.datetime - buy_date) // pd.Timedelta(days=1)))
+        if held > 0 or unmatched > 0:
+            positions.append((trader_id, symbol, held, cost, unmatched))
+        if method == 'average':
+            if held > 0:
+                open_lots.append((trader_id, symbol, opened, held, cost))
+        else:
+            for buy_date, _, quantity, amount, remaining in book:
+                open_lots.append((trader_id, symbol, buy_date, remaining,
+                                  amount if remaining == quantity else amount * remaining / quantity))
+    return (pd.DataFrame(trips, columns=lots.ROUND_TRIP_COLUMNS),
+            pd.DataFrame(positions, columns=lots.POSITION_COLUMNS),
+            pd.DataFrame(open_lots, columns=lots.OPEN_LOT_COLUMNS))
+
+
+def _assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for column in expected.columns:
+        left, right = actual[column].to_numpy(), expected[column].to_numpy()
+        if np.issubdtype(np.asarray(right).dtype, np.floating):
+            np.testing.assert_allclose(left.astype(float), right.astype(float), rtol=1e-9, err_msg=column)
+        else:
+            assert left.tolist() == right.tolist(), column
+
+
+@pytest.mark.parametrize('method', LOT_METHODS)
+@pytest.mark.parametrize('seed', range(6))
+def test_matchers_agree_with_naive_simulator(method, seed):
+    tx = _random_transactions(seed)
+    round_trips, positions, open_lots = match_lots(tx, method, open_lots=True)
+    expected_trips, expected_positions, expected_lots = _naive(tx, method)
+    _assert_same(round_trips.reset_index(drop=True), expected_trips)
+    _assert_same(positions.reset_index(drop=True), expected_positions)
+    _assert_same(open_lots.reset_index(drop=True), expected_lots)
+
+
+@pytest.mark.parametrize('tail', [0, 16, 10 ** 9])
+def test_lifo_vector_and_loop_paths_agree(monkeypatch, tail):
+    # 깊은 스택(작은 매수 여러 번 뒤 한 번에 매도)과 일반 거래를 함께 (배열 단계/루프 마무리 모두 경유)
+    t = np.datetime64('2024-02-01T09:00:00', 'ns')
+    deep = pd.DataFrame({
+        'trader_id': 'D', 'symbol': 'X', 'side': ['Buy'] * 300 + ['Sell', 'Buy', 'Sell'],
+        'quantity': [1] * 300 + [250, 5, 60], 'price': 10.0, 'total_amount': 10.0 * np.r_[[1] * 300, 250, 5, 60],
+        'datetime': t + np.arange(303).astype('timedelta64[s]'),
+    })
+    tx = pd.concat([_random_transactions(11), deep], ignore_index=True)
+    monkeypatch.setattr(lots, 'STACK_TAIL', tail)
+    round_trips, positions, open_lots = match_lots(tx, 'lifo', open_lots=True)
+    expected_trips, expected_positions, expected_lots = _naive(tx, 'lifo')
+    _assert_same(round_trips.reset_index(drop=True), expected_trips)
+    _assert_same(positions.reset_index(drop=True), expected_positions)
+    _assert_same(open_lots.reset_index(drop=True), expected_lots)
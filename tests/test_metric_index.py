@@ -0,0 +1,68 @@
+import json
+import math
+import operator
+
+import pytest
+
+from metric_index import OPERATORS, SortedMetricIndex, is_metric_value
+from rag_system import TradingKnowledgeBase
+
+COMPARE = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le, '==': operator.eq}
+NAN = float('nan')
+PAIRS = [('T1', 1.5), ('T2', NAN), ('T3', -0.5), ('T4', None), ('T5', 1.5), ('T6', NAN), ('T7', 3), ('T8', 0.0)]
+
+
+def brute_select(pairs, threshold, op):
+    """기존 방식 (값마다 비교, NaN 비교는 항상 False)"""
+    return [trader_id for trader_id, value in pairs
+            if isinstance(value, (int, float)) and COMPARE[op](value, threshold)]
+
+
+def test_is_metric_value_rejects_non_finite():
+    assert is_metric_value(1.5) and is_metric_value(0) and is_metric_value(-2)
+    for value in (NAN, math.inf, -math.inf, None, True, 'x', {'a': 1}):
+        assert not is_metric_value(value)
+
+
+@pytest.mark.parametrize('op', sorted(OPERATORS))
+@pytest.mark.parametrize('threshold', [-1000, -0.5, 0.0, 1.5, 2, 1000])
+def test_select_and_count_skip_nan(op, threshold):
+    index = SortedMetricIndex(PAIRS)
+    expected = brute_select(PAIRS, threshold, op)
+    assert index.select(threshold, op) == expected
+    assert index.count(threshold, op) == len(expected)
+
+
+def test_between_top_and_len_skip_nan():
+    index = SortedMetricIndex(PAIRS)
+    assert len(index) == 5
+    assert index.between() == ['T1', 'T3', 'T5', 'T7', 'T8']
+    assert index.between(0.0, 1.5) == ['T1', 'T5', 'T8']
+    assert index.between(low=1.5) == ['T1', 'T5', 'T7']
+    assert index.top(10) == ['T7', 'T1', 'T5', 'T8', 'T3']
+    assert index.top(2, ascending=True) == ['T3', 'T8']
+
+
+def test_all_nan_index_is_empty():
+    index = SortedMetricIndex([('T1', NAN), ('T2', NAN)])
+    assert len(index) == 0
+    assert index.top(3) == []
+    for op in OPERATORS:
+        assert index.select(0, op) == []
+
+
+def test_knowledge_base_ignores_nan_metric(tmp_path):
+    # 라운드트립이 하나뿐이면 sharpe_ratio가 NaN인 리포트 (NaN을 그대로 쓰던 이전 리포트 형식)
+    report = {
+        trader_id: {'profile': {'name': trader_id}, 'performance': {'sharpe_ratio': value, 'total_trades': 1}}
+        for trader_id, value in [('T1', 0.8), ('T2', NAN), ('T3', 2.4)]
+    }
+    path = tmp_path / 'report.json'
+    path.write_text(json.dumps(report), encoding='utf-8')
+    kb = TradingKnowledgeBase(str(path))
+
+    assert list(kb.search_by_metric('sharpe_ratio', 1000, '>')) == []
+    for op in OPERATORS:
+        found = [r['trader_id'] for r in kb.search_by_metric('sharpe_ratio', 0.8, op)]
+        assert found == brute_select([('T1', 0.8), ('T2', NAN), ('T3', 2.4)], 0.8, op)
+    assert [r['trader_id'] for r in kb.get_top_performers('sharpe_ratio', 3)] == ['T3', 'T1']
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from name_index import NameIndex, decompose, edit_distance
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+PAIRS = [('T001', '김민수'), ('T002', '김민지'), ('T003', '이서연'), ('T004', '김민수'),
+         ('T005', 'John Smith'), ('T006', '박지훈'), ('T007', None)]
+
+
+def _naive_find(pairs, query):
+    """기존 search_by_trader 방식의 선형 탐색"""
+    query = query.strip().upper()
+    for trader_id, _ in pairs:
+        if str(trader_id).upper() == query:
+            return trader_id
+    names = ['' if name is None else str(name) for _, name in pairs]
+    for (trader_id, _), name in zip(pairs, names):
+        if name == query:
+            return trader_id
+    for (trader_id, _), name in zip(pairs, names):
+        if query in name:
+            return trader_id
+    return None
+
+
+def test_exact_id_and_name():
+    index = NameIndex(PAIRS)
+    assert index.find('t003') == 'T003'
+    assert index.find(' 이서연 ') == 'T003'
+    # 같은 이름이면 먼저 나온 트레이더
+    assert index.find('김민수') == 'T001'
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('민수', 'T001'), ('김민', 'T001'), ('서', 'T003'), ('지훈', 'T006'), ('민지', 'T002'),
+    ('수김', None), ('최', None),
+    # 기존 search_by_trader처럼 대문자로 바꾼 질의로 비교하므로 대소문자가 섞인 영문 이름은 부분 일치하지 않는다
+    ('smith', None), ('SMITH', None),
+])
+def test_partial_name(query, expected):
+    assert NameIndex(PAIRS).find(query) == expected
+
+
+def test_partial_syllable_is_not_a_substring():
+    # '김미'는 '김민'의 자모 앞부분이지만 이름에 포함된 문자열은 아니다
+    assert NameIndex(PAIRS).find('김미') is None
+
+
+def test_find_matches_linear_scan_on_profiles():
+    profiles = pd.read_csv(DATA / 'trader_profiles_50.csv', encoding='utf-8-sig')
+    pairs = list(zip(profiles['trader_id'], profiles['name']))
+    index = NameIndex(pairs)
+    queries = {trader_id.lower() for trader_id, _ in pairs}
+    for _, name in pairs:
+        queries.update(name[i:j] for i in range(len(name)) for j in range(i + 1, len(name) + 1))
+    queries.update(['없는이름', 'T999', 'x'])
+    for query in sorted(queries):
+        assert index.find(query) == _naive_find(pairs, query), query
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('김민쑤', '김민수'),   # 자음 하나 오타
+    ('김민스', '김민수'),   # 모음 하나 오타
+    ('이서영', '이서연'),   # 받침 오타
+    ('jon smith', 'John Smith'),
+])
+def test_similar_names_for_typos(query, expected):
+    index = NameIndex(PAIRS)
+    assert index.find(query) is None
+    assert index.similar(query)[0] == expected
+
+
+def test_similar_ignores_unrelated_names():
+    index = NameIndex(PAIRS)
+    assert index.similar('') == []
+    assert index.similar('Zebra Quartz') == []
+    assert index.similar('김민수') == ['김민수', '김민지']
+
+
+def test_decompose_and_edit_distance():
+    assert decompose('김') == '김'
+    assert decompose(' AbC ') == 'abc'
+    assert edit_distance(decompose('김민수'), decompose('김민쑤')) == 1
+    assert edit_distance('kitten', 'sitting') == 3
@@ -0,0 +1,91 @@
+"""같은 입력이면 계산 경로(일괄/트레이더별/병렬/스트리밍/증분)와 상관없이 같은 리포트가 나와야 한다"""
+import json
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from analyzer import TradingPerformanceAnalyzer
+from streaming import StreamingAnalyzer
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+TRANSACTIONS = str(DATA / 'trading_transactions_50.csv')
+PROFILES = str(DATA / 'trader_profiles_50.csv')
+
+
+def _report(tmp_path, name, lot_method=None, **kwargs):
+    """메모리 전체 분석 리포트 (파일 바이트)"""
+    output = tmp_path / f"{name}.json"
+    analyzer = TradingPerformanceAnalyzer(TRANSACTIONS, PROFILES, use_cache=False, lot_method=lot_method)
+    analyzer.generate_full_report(str(output), **kwargs)
+    return output.read_bytes()
+
+
+def _assert_close(actual, expected, path='', tolerance=0.0):
+    """중첩 딕셔너리/리스트 비교 (실수는 tolerance 이내)"""
+    if isinstance(expected, dict):
+        assert isinstance(actual, dict) and list(actual) == list(expected), path
+        for key in expected:
+            _assert_close(actual[key], expected[key], f"{path}.{key}", tolerance)
+    elif isinstance(expected, list):
+        assert isinstance(actual, list) and len(actual) == len(expected), path
+        for i, (left, right) in enumerate(zip(actual, expected)):
+            _assert_close(left, right, f"{path}[{i}]", tolerance)
+    elif isinstance(expected, float) and isinstance(actual, (int, float)):
+        assert actual == pytest.approx(expected, abs=tolerance), path
+    else:
+        assert actual == expected, path
+
+
+@pytest.fixture(scope='module')
+def reference(tmp_path_factory):
+    """lot_method별 일괄(batch) 경로 리포트"""
+    tmp_path = tmp_path_factory.mktemp('reference')
+    return {method: _report(tmp_path, f"batch_{method}", method) for method in (None, 'fifo')}
+
+
+@pytest.mark.parametrize('lot_method', [None, 'fifo'])
+def test_per_trader_matches_batch(tmp_path, reference, lot_method):
+    assert _report(tmp_path, 'per_trader', lot_method, batch=False) == reference[lot_method]
+
+
+@pytest.mark.parametrize('lot_method', [None, 'fifo'])
+def test_parallel_matches_in_memory(tmp_path, reference, lot_method):
+    assert _report(tmp_path, 'parallel', lot_method, workers=2) == reference[lot_method]
+
+
+@pytest.mark.parametrize('chunksize', [97, 1000, 500_000])
+def test_streaming_matches_in_memory(tmp_path, reference, chunksize):
+    output = tmp_path / 'streaming.json'
+    StreamingAnalyzer(TRANSACTIONS, PROFILES, chunksize=chunksize).generate_full_report(str(output))
+    # 평균 포지션 크기는 누적합에서 나누므로 반올림 경계에서 1센트 차이가 날 수 있다
+    _assert_close(json.loads(output.read_bytes()), json.loads(reference[None]), tolerance=0.0101)
+
+
+def test_incremental_matches_full_report(tmp_path, reference):
+    transactions = tmp_path / 'transactions.csv'
+    profiles = tmp_path / 'profiles.csv'
+    shutil.copy(TRANSACTIONS, transactions)
+    shutil.copy(PROFILES, profiles)
+    output = tmp_path / 'incremental.json'
+
+    def update():
+        analyzer = TradingPerformanceAnalyzer(str(transactions), str(profiles), use_cache=False)
+        return analyzer.update_report(str(output))
+
+    update()  # 체크포인트가 없으면 전체 계산
+    assert output.read_bytes() == reference[None]
+
+    # 한 트레이더는 가격이 바뀌고 한 트레이더는 거래가 모두 빠진 뒤 증분 갱신
+    frame = pd.read_csv(transactions)
+    trader_ids = frame['trader_id'].unique()
+    frame.loc[frame['trader_id'] == trader_ids[3], 'price'] *= 1.1
+    frame = frame[frame['trader_id'] != trader_ids[7]]
+    frame.to_csv(transactions, index=False)
+    results = update()
+
+    full = tmp_path / 'full.json'
+    TradingPerformanceAnalyzer(str(transactions), str(profiles), use_cache=False).generate_full_report(str(full))
+    assert trader_ids[7] not in results
+    assert output.read_bytes() == full.read_bytes()
@@ -0,0 +1,42 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+from analyzer import TradingPerformanceAnalyzer
+from profiling import StageProfiler
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+
+
+class NestingProfiler(StageProfiler):
+    """열려 있는 단계 안에서 다른 단계가 열리면 (바깥, 안쪽) 이름을 기록"""
+
+    def __init__(self):
+        super().__init__(per_trader=True, track_memory=False)
+        self.open = []
+        self.nested = []
+
+    @contextmanager
+    def stage(self, name, rows=None, trader_id=None):
+        if self.open:
+            self.nested.append((self.open[-1], name))
+        self.open.append(name)
+        try:
+            with super().stage(name, rows, trader_id) as info:
+                yield info
+        finally:
+            self.open.pop()
+
+
+def test_per_trader_stages_do_not_nest(tmp_path):
+    profiler = NestingProfiler().start()
+    analyzer = TradingPerformanceAnalyzer(
+        str(DATA / 'trading_transactions_enhanced.csv'), str(DATA / 'trader_profiles_enhanced.csv'),
+        use_cache=False, profiler=profiler)
+    results = analyzer.generate_full_report(str(tmp_path / 'report.json'), batch=False)
+    profiler.stop()
+
+    assert results
+    assert profiler.nested == []
+    stages = {row['stage']: row for row in profiler.summary()['stages']}
+    assert stages['patterns']['calls'] == len(analyzer.transactions['trader_id'].unique())
+    assert stages['filter']['calls'] == 2 * stages['patterns']['calls']
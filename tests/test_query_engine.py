@@ -0,0 +1,114 @@
+import itertools
+import json
+import math
+import random
+
+import pytest
+
+from rag_system import TradingKnowledgeBase
+
+STYLES = ['단기매매', '스윙트레이딩', '중기투자', '장기투자']
+RISKS = ['저위험', '중위험', '고위험']
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+
+def _metric(rng, low, high):
+    """값 대부분은 숫자, 일부는 NaN(라운드트립 1건의 샤프 등), inf(이전 리포트) 또는 결측"""
+    roll = rng.random()
+    if roll < 0.1:
+        return float('nan')
+    if roll < 0.12:
+        return float('inf')
+    if roll < 0.15:
+        return None
+    return round(rng.uniform(low, high), 1)
+
+
+@pytest.fixture(scope='module')
+def kb(tmp_path_factory):
+    rng = random.Random(7)
+    report = {}
+    for i in range(300):
+        report[f"T{i:04d}"] = {
+            'profile': {'name': f"Trader {i}", 'trading_style': rng.choice(STYLES),
+                        'risk_tolerance': rng.choice(RISKS), 'years_experience': rng.randint(0, 15)},
+            'performance': {'sharpe_ratio': _metric(rng, -1, 3), 'win_rate': _metric(rng, 20, 80),
+                            'max_drawdown_pct': _metric(rng, 0, 40), 'total_trades': rng.randint(1, 50)},
+            'pattern': {'most_active_day': rng.choice(DAYS), 'most_active_hour': rng.randint(9, 15)},
+        }
+    path = tmp_path_factory.mktemp('report') / 'report.json'
+    path.write_text(json.dumps(report, ensure_ascii=False), encoding='utf-8')
+    return TradingKnowledgeBase(str(path))
+
+
+def _value(record, field):
+    key = field.rpartition('.')[2]
+    for section in ('performance', 'profile', 'pattern'):
+        if key in (record.get(section) or {}):
+            return record[section][key]
+    return None
+
+
+def _matches(record, predicate):
+    """조건 하나를 레코드 값으로 직접 판정 (NaN/inf/결측은 어떤 비교도 만족하지 않음)"""
+    field, op, value = predicate
+    x = _value(record, field)
+    if x is None or (isinstance(x, float) and not math.isfinite(x)):
+        return False
+    if op == 'between':
+        low, high = value
+        return (low is None or x >= low) and (high is None or x <= high)
+    if op == 'in':
+        return x in value
+    if op == 'contains':
+        return str(value).lower() in str(x).lower()
+    return {'>': x > value, '>=': x >= value, '<': x < value, '<=': x <= value,
+            '==': x == value, '!=': x != value}[op]
+
+
+def _brute(kb, where, mode):
+    combine = all if mode == 'all' else any
+    return [tid for tid in kb.traders if combine(_matches(kb.data[tid], p) for p in where)]
+
+
+QUERIES = [
+    [('sharpe_ratio', '>', 1.0), ('risk_tolerance', '==', '중위험'), ('win_rate', '<=', 60)],
+    [('performance.sharpe_ratio', '>=', -1000), ('trading_style', 'in', ['단기매매', '장기투자']),
+     ('max_drawdown_pct', 'between', (5, 25))],
+    [('win_rate', '!=', 50.0), ('sharpe_ratio', '<', 1000), ('most_active_day', 'contains', 'day')],
+    [('years_experience', '>=', 5), ('sharpe_ratio', '==', 1.0), ('risk_tolerance', '==', '저위험')],
+    [('max_drawdown_pct', '<', 10), ('win_rate', 'between', (None, 55)), ('years_experience', '<', 8)],
+]
+
+
+@pytest.mark.parametrize('where', QUERIES)
+@pytest.mark.parametrize('mode', ['all', 'any'])
+def test_results_independent_of_plan_order(kb, where, mode):
+    engine = kb.query_engine
+    expected = _brute(kb, where, mode)
+    default = engine.run(where, mode)
+    assert [kb.traders[i] for i in default.tolist()] == expected
+
+    # 계획기가 고르는 순서 대신 모든 순서로 실행 (첫 조건이 인덱스면 그것이 후보를 만든다)
+    original = engine._steps
+    try:
+        for order in itertools.permutations(where):
+            engine._steps = lambda predicates, mode, order=order: original(order, 'any')
+            positions = engine.run(where, mode)
+            assert [kb.traders[i] for i in positions.tolist()] == expected, order
+    finally:
+        del engine._steps
+
+
+def test_activity_hits_are_per_query(kb):
+    where = [('activity', 'during', {'days': 'Monday', 'hours': (9, 11)}), ('sharpe_ratio', '>', 0)]
+    hits = {}
+    positions = kb.query_engine.run(where, hits=hits)
+    assert len(hits) == 1
+    assert not hasattr(kb.query_engine, '_hits')
+    expected = [tid for tid in kb.traders
+                if kb.data[tid]['pattern']['most_active_day'] == 'Monday'
+                and 9 <= kb.data[tid]['pattern']['most_active_hour'] <= 11
+                and _matches(kb.data[tid], ('sharpe_ratio', '>', 0))]
+    assert [kb.traders[i] for i in positions.tolist()] == expected
+    assert [r['trader_id'] for r in kb.query(where)] == expected
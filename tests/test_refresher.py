@@ -0,0 +1,98 @@
+import os
+
+import pytest
+
+import refresher
+from refresher import DataRefresher
+
+
+@pytest.fixture
+def no_settle(monkeypatch):
+    monkeypatch.setattr(refresher, 'SETTLE_SECONDS', 0)
+
+
+def _write(path, text, mtime_ns):
+    """내용과 수정 시각을 함께 지정 (파일 시스템 시각 해상도와 무관하게 시그니처를 바꾼다)"""
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _reader(path):
+    return lambda: path.read_text(encoding='utf-8')
+
+
+def test_swaps_when_signature_changes(tmp_path, no_settle):
+    path = tmp_path / 'r.json'
+    _write(path, 'v1', 10 ** 18)
+    swapped = []
+    data = DataRefresher(_reader(path), [str(path)], on_swap=swapped.append)
+    assert data.current == 'v1' and data.version == 0
+
+    assert not data.refresh()
+    assert data.current == 'v1' and swapped == []
+
+    _write(path, 'v2', 10 ** 18 + 1)
+    assert data.changed()
+    assert data.refresh()
+    assert data.current == 'v2' and data.version == 1 and swapped == ['v2']
+    assert not data.changed() and not data.refresh()
+
+
+def test_no_swap_while_file_is_being_written(tmp_path, monkeypatch, no_settle):
+    path = tmp_path / 'r.json'
+    _write(path, 'v1', 10 ** 18)
+    builds = []
+    data = DataRefresher(lambda: builds.append(1) or path.read_text(encoding='utf-8'), [str(path)])
+
+    # 대기하는 동안 파일이 또 바뀌면 이번 주기에는 만들지 않는다
+    writes = iter(['v2-partial-more', 'v2-complete-final'])
+    mtime = iter([10 ** 18 + 2, 10 ** 18 + 3])
+    monkeypatch.setattr(refresher.time, 'sleep', lambda seconds: _write(path, next(writes), next(mtime)))
+    _write(path, 'v2-partial', 10 ** 18 + 1)
+    assert not data.refresh()
+    assert data.current == 'v1' and data.version == 0 and len(builds) == 1
+
+    # 다음 주기에도 쓰는 중이면 그대로
+    assert not data.refresh()
+    assert data.current == 'v1' and len(builds) == 1
+
+    # 더 바뀌지 않으면 교체
+    monkeypatch.setattr(refresher.time, 'sleep', lambda seconds: None)
+    assert data.refresh()
+    assert data.current == 'v2-complete-final' and data.version == 1 and len(builds) == 2
+
+
+def test_failed_build_keeps_previous_until_signature_changes(tmp_path, no_settle):
+    path = tmp_path / 'r.json'
+    _write(path, 'v1', 10 ** 18)
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        text = path.read_text(encoding='utf-8')
+        if text == 'broken':
+            raise ValueError('bad report')
+        return text
+
+    data = DataRefresher(build, [str(path)])
+    _write(path, 'broken', 10 ** 18 + 1)
+    assert not data.refresh()
+    assert data.current == 'v1' and data.version == 0
+    assert data.last_error == 'bad report' and len(attempts) == 2
+
+    # 같은 파일 상태로는 다시 시도하지 않는다
+    assert not data.refresh()
+    assert len(attempts) == 2
+
+    _write(path, 'v2', 10 ** 18 + 2)
+    assert data.refresh()
+    assert data.current == 'v2' and data.last_error is None and len(attempts) == 3
+
+
+def test_force_rebuilds_without_change(tmp_path, no_settle):
+    path = tmp_path / 'r.json'
+    _write(path, 'v1', 10 ** 18)
+    data = DataRefresher(_reader(path), [str(path)], initial='preloaded')
+    assert data.current == 'preloaded'
+    assert data.refresh(force=True)
+    assert data.current == 'v1' and data.version == 1
@@ -0,0 +1,83 @@
+import json
+
+import numpy as np
+import pytest
+
+from report_io import load_report, read_msgpack_report, read_report, report_path, write_report
+
+
+def _results():
+    """숫자 trader_id, 한글, numpy 스칼라, 정수 키 분포가 섞인 리포트"""
+    return {
+        1: {'profile': {'name': '김민수', 'years_experience': np.int64(3), 'certifications': None},
+            'performance': {'win_rate': np.float64(55.5), 'total_trades': np.int64(12), 'flag': np.bool_(True)},
+            'pattern': {'hourly_distribution': {'9': 4, '14': 8}}},
+        'T002': {'profile': {'name': 'Lee', 'years_experience': 7, 'certifications': 'CFA'},
+                 'performance': {'win_rate': 40.0, 'total_trades': 3, 'flag': False},
+                 'pattern': {'hourly_distribution': {'10': 3}}},
+    }
+
+
+def _expected(results):
+    """기존 json.dump(results)를 다시 읽은 결과 (키는 문자열, numpy 스칼라는 기본 타입)"""
+    return json.loads(json.dumps(results, default=lambda value: value.item()))
+
+
+def test_streamed_json_matches_json_dump(tmp_path):
+    results = _results()
+    path = str(tmp_path / 'report.json')
+    write_report(path, results)
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    assert text == json.dumps(results, ensure_ascii=False, indent=2, default=lambda value: value.item())
+    assert json.loads(text) == _expected(results)
+
+
+def test_compact_json_round_trip(tmp_path):
+    results = _results()
+    path = str(tmp_path / 'report.json')
+    write_report(path, results, compact=True)
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    assert '\n' not in text
+    assert json.loads(text) == _expected(results)
+
+
+def test_empty_report(tmp_path):
+    for compact in (False, True):
+        path = str(tmp_path / f"empty_{compact}.json")
+        write_report(path, {}, compact=compact)
+        assert read_report(path) == {}
+
+
+def test_msgpack_and_store_round_trip(tmp_path):
+    pytest.importorskip('msgpack')
+    results = _results()
+    path = str(tmp_path / 'report.json')
+    paths = write_report(path, results, formats=('json', 'msgpack', 'store'))
+    assert paths[1] == report_path(path, 'msgpack')
+
+    expected = _expected(results)
+    assert read_msgpack_report(paths[1]) == expected
+    lazy = load_report(path)
+    assert list(lazy) == list(expected)
+    assert {trader_id: lazy[trader_id] for trader_id in lazy} == expected
+
+
+def test_non_finite_floats_become_null(tmp_path):
+    results = {'T1': {'performance': {'sharpe_ratio': float('nan'), 'profit_factor': np.float64('inf'),
+                                      'values': [1.0, float('-inf')]}}}
+    path = str(tmp_path / 'report.json')
+    write_report(path, results, formats=('json', 'store'))
+    with open(path, encoding='utf-8') as f:
+        loaded = json.load(f, parse_constant=lambda name: pytest.fail(f"bare {name} in report"))
+    assert loaded == {'T1': {'performance': {'sharpe_ratio': None, 'profit_factor': None, 'values': [1.0, None]}}}
+    assert load_report(path)['T1'] == loaded['T1']
+
+
+def test_failed_write_keeps_previous_report(tmp_path):
+    path = str(tmp_path / 'report.json')
+    write_report(path, {'T1': {'a': 1}})
+    with pytest.raises(TypeError):
+        write_report(path, {'T1': {'a': 2}, 'T2': {'a': object()}})
+    assert read_report(path) == {'T1': {'a': 1}}
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar import load_transactions, read_transactions_csv
+from validation import FLAGS, QUARANTINE_FLAGS, REQUIRED_COLUMNS, validate_transactions
+
+CLEAN = [
+    ('T1', '2024-01-02', '09:00:00', 'AAA', 'Buy', 10, 100.0, 1.0, 1001.0),
+    ('T1', '2024-01-03', '10:00:00', 'AAA', 'Sell', 10, 110.0, 1.0, 1099.0),
+    ('T2', '2024-01-02', '09:30:00', 'BBB', 'Buy', 5, 20.0, 0.5, 100.5),
+]
+PROFILES = pd.DataFrame({'trader_id': ['T1', 'T2']})
+
+
+def _csv(tmp_path, rows, name='tx.csv'):
+    path = tmp_path / name
+    pd.DataFrame(rows, columns=REQUIRED_COLUMNS).to_csv(path, index=False)
+    return str(path)
+
+
+def _validate(tmp_path, extra):
+    """깨끗한 행 뒤에 extra 행 하나를 붙여 검증 → 마지막 행의 플래그와 결과"""
+    path = _csv(tmp_path, CLEAN + [extra])
+    transactions = read_transactions_csv(path, errors='coerce')
+    clean, quarantine, summary = validate_transactions(transactions, PROFILES, path)
+    return clean, quarantine, summary
+
+
+@pytest.mark.parametrize('name, row', [
+    ('missing_value', ('T1', '2024-01-04', '09:00:00', None, 'Buy', 1, 10.0, 0.1, 10.1)),
+    ('bad_type', ('T1', '2024-01-04', '09:00:00', 'AAA', 'Buy', 'ten', 10.0, 0.1, 10.1)),
+    ('bad_type', ('T1', '2024-01-04', '09:00:00', 'AAA', 'Buy', 1.5, 10.0, 0.1, 15.1)),
+    ('bad_side', ('T1', '2024-01-04', '09:00:00', 'AAA', 'Hold', 1, 10.0, 0.1, 10.1)),
+    ('non_positive', ('T1', '2024-01-04', '09:00:00', 'AAA', 'Buy', 1, -10.0, 0.1, 0.0)),
+    ('bad_datetime', ('T1', '2024-13-45', '09:00:00', 'AAA', 'Buy', 1, 10.0, 0.1, 10.1)),
+    ('unknown_trader', ('T9', '2024-01-04', '09:00:00', 'AAA', 'Buy', 1, 10.0, 0.1, 10.1)),
+])
+def test_quarantine_flags(tmp_path, name, row):
+    clean, quarantine, summary = _validate(tmp_path, row)
+    assert FLAGS[name] & QUARANTINE_FLAGS
+    assert len(quarantine) == 1 and len(clean) == len(CLEAN)
+    assert quarantine['flags'].iloc[0] & FLAGS[name]
+    assert name in quarantine['issues'].iloc[0].split('|')
+    assert summary['flags'][name] == 1
+    assert summary['clean_rows'] == len(CLEAN) and summary['quarantined_rows'] == 1
+
+
+def test_duplicate_keeps_first_row(tmp_path):
+    clean, quarantine, summary = _validate(tmp_path, CLEAN[0])
+    assert summary['flags']['duplicate'] == 1
+    assert quarantine['issues'].tolist() == ['duplicate']
+    # 처음 나온 행은 분석에 남는다
+    assert len(clean) == len(CLEAN)
+    assert clean['trader_id'].astype(str).tolist() == [row[0] for row in CLEAN]
+
+
+def test_same_key_with_different_values_is_not_duplicate(tmp_path):
+    row = CLEAN[0][:6] + (101.0, 1.0, 1011.0)
+    clean, quarantine, summary = _validate(tmp_path, row)
+    assert summary['flags']['duplicate'] == 0
+    assert len(quarantine) == 0
+
+
+def test_amount_mismatch_is_warning_only(tmp_path):
+    clean, quarantine, summary = _validate(tmp_path, ('T2', '2024-01-04', '09:00:00', 'BBB', 'Sell', 5, 20.0, 0.5, 150.0))
+    assert not FLAGS['amount_mismatch'] & QUARANTINE_FLAGS
+    assert summary['flags']['amount_mismatch'] == 1
+    assert len(quarantine) == 0 and len(clean) == len(CLEAN) + 1
+
+
+def test_sell_without_buy(tmp_path):
+    rows = CLEAN + [
+        # 보유 5주보다 많이 매도
+        ('T2', '2024-01-05', '09:00:00', 'BBB', 'Sell', 8, 20.0, 0.5, 159.5),
+        # 매수보다 먼저 나온 매도
+        ('T2', '2024-01-01', '09:00:00', 'CCC', 'Sell', 1, 30.0, 0.1, 29.9),
+        ('T2', '2024-01-06', '09:00:00', 'CCC', 'Buy', 1, 30.0, 0.1, 30.1),
+        # 같은 시각의 매수/매도는 매수가 먼저
+        ('T1', '2024-01-07', '09:00:00', 'DDD', 'Sell', 2, 10.0, 0.1, 19.9),
+        ('T1', '2024-01-07', '09:00:00', 'DDD', 'Buy', 2, 10.0, 0.1, 20.1),
+    ]
+    path = _csv(tmp_path, rows)
+    clean, quarantine, summary = validate_transactions(read_transactions_csv(path, errors='coerce'), PROFILES, path)
+    assert summary['flags']['sell_without_buy'] == 2
+    assert len(quarantine) == 0 and len(clean) == len(rows)
+
+
+def test_clean_frame_passes_through_unchanged(tmp_path):
+    path = _csv(tmp_path, CLEAN)
+    transactions = read_transactions_csv(path, errors='coerce')
+    clean, quarantine, summary = validate_transactions(transactions, PROFILES, path)
+    assert clean is transactions
+    assert len(quarantine) == 0
+    assert summary['quarantined_rows'] == 0 and not any(summary['flags'].values())
+    assert summary['header'] == {'bom': False, 'renamed': {}}
+
+
+def test_bom_header_is_cleaned(tmp_path):
+    path = tmp_path / 'bom.csv'
+    pd.DataFrame(CLEAN, columns=REQUIRED_COLUMNS).to_csv(path, index=False, encoding='utf-8-sig')
+    transactions = pd.read_csv(path, encoding='utf-8')
+    transactions['datetime'] = pd.to_datetime(transactions['date'] + ' ' + transactions['time'])
+    clean, _, summary = validate_transactions(transactions, PROFILES, str(path))
+    assert summary['header']['bom'] is True
+    assert list(clean.columns[:len(REQUIRED_COLUMNS)]) == REQUIRED_COLUMNS
+
+
+def test_coerced_load_does_not_write_cache(tmp_path):
+    path = _csv(tmp_path, CLEAN + [('T1', 'not-a-date', '09:00:00', 'AAA', 'Buy', 1, 10.0, 0.1, 10.1)])
+    cache_dir = str(tmp_path / 'cache')
+    coerced = load_transactions(path, cache_dir=cache_dir, errors='coerce')
+    assert np.isnat(coerced['datetime'].to_numpy()).sum() == 1
+    # --validate 실행이 NaT 캐시를 남기면 다음 일반 실행이 그 캐시를 읽게 된다
+    with pytest.raises(ValueError):
+        load_transactions(path, cache_dir=cache_dir)
+
+
+def test_clean_coerced_load_shares_cache(tmp_path):
+    path = _csv(tmp_path, CLEAN)
+    cache_dir = str(tmp_path / 'cache')
+    coerced = load_transactions(path, cache_dir=cache_dir, errors='coerce')
+    cached = load_transactions(path, cache_dir=cache_dir)
+    pd.testing.assert_frame_equal(cached, coerced, check_categorical=False)
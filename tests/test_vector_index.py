@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import vector_index
+from vector_index import METRIC_FIELDS, PROFILE_FIELDS, VectorIndex, _top_k
+
+STYLES = ['단기매매', '스윙', '장기투자', '데이트레이딩']
+SECTORS = ['IT', '금융', '헬스케어', 'IT/금융', '에너지, 소재']
+
+
+def _index(n, seed=0, duplicate=0):
+    """무작위 프로필/지표 (앞쪽 duplicate개 행을 뒤에 한 번 더 붙여 동점을 만든다)"""
+    rng = np.random.default_rng(seed)
+    profiles = {field: [None] * n for field in PROFILE_FIELDS}
+    profiles['trading_style'] = [STYLES[i] for i in rng.integers(len(STYLES), size=n)]
+    profiles['preferred_sectors'] = [SECTORS[i] for i in rng.integers(len(SECTORS), size=n)]
+    metrics = {field: rng.normal(size=n).round(1).tolist() for field in METRIC_FIELDS}
+    metrics['sharpe_ratio'][0] = None
+    if duplicate:
+        profiles = {field: values + values[:duplicate] for field, values in profiles.items()}
+        metrics = {field: values + values[:duplicate] for field, values in metrics.items()}
+    return VectorIndex(profiles, metrics)
+
+
+def _brute_top_k(scores, top_k):
+    return np.array([sorted(range(len(row)), key=lambda j: (-row[j], j))[:top_k] for row in scores])
+
+
+@pytest.mark.parametrize('top_k', [1, 3, 7, 20, 25])
+def test_top_k_breaks_ties_by_position(top_k):
+    rng = np.random.default_rng(1)
+    scores = rng.integers(0, 4, size=(30, 20)).astype(np.float32)
+    scores[0] = 1.0  # 전부 동점
+    expected = _brute_top_k(scores, top_k)
+    assert np.array_equal(_top_k(scores, min(top_k, scores.shape[1])), expected)
+
+
+def test_identical_rows_rank_by_position():
+    index = _index(10, duplicate=10)  # i와 i + 10은 같은 벡터
+    hits = index.similar([3], top_k=3)[0]
+    assert hits[0][0] == 13
+    assert hits[0][1] == pytest.approx(1.0, abs=1e-4)
+    assert all(position != 3 for position, _ in hits)
+
+    # 점수가 같으면 앞쪽 행 먼저
+    rows = index.search(index.matrix[[3]], top_k=2)[0]
+    assert [position for position, _ in rows] == [3, 13]
+
+
+@pytest.mark.parametrize('block_rows', [1, 3, 16, 47])
+def test_blocked_search_matches_unblocked(monkeypatch, block_rows):
+    index = _index(60, duplicate=20)
+    queries = np.vstack([index.matrix[:12], index.embed_text(['IT 스윙', '금융', '', '없는 단어'])])
+    exclude = list(range(12)) + [-1] * 4
+    expected = index.search(queries, top_k=6, exclude=exclude)
+    expected_text = index.text_search(['IT 스윙', '헬스케어'], top_k=10)
+
+    monkeypatch.setattr(vector_index, 'BLOCK_ROWS', block_rows)
+    assert index.search(queries, top_k=6, exclude=exclude) == expected
+    assert index.text_search(['IT 스윙', '헬스케어'], top_k=10) == expected_text
+
+
+def test_search_matches_brute_force():
+    index = _index(40)
+    queries = index.matrix[:5]
+    scores = queries @ index.matrix.T
+    for q, hits in enumerate(index.search(queries, top_k=4, exclude=list(range(5)))):
+        expected = [j for j in _brute_top_k(scores[q:q + 1], 5)[0] if j != q][:4]
+        assert [position for position, _ in hits] == expected
+
+
+def test_small_and_empty_index():
+    index = _index(3)
+    assert [len(hits) for hits in index.similar([0, 1, 2], top_k=5)] == [2, 2, 2]
+    empty = VectorIndex({field: [] for field in PROFILE_FIELDS}, {field: [] for field in METRIC_FIELDS})
+    assert len(empty) == 0
+    assert empty.text_search(['IT'], top_k=3) == [[]]
@@ -0,0 +1,103 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from analyzer import TradingPerformanceAnalyzer
+from window_metrics import WindowMetrics, build_window_index, save_window_index
+
+DATA = Path(__file__).resolve().parent.parent / 'data'
+TRANSACTIONS = str(DATA / 'trading_transactions_50.csv')
+PROFILES = str(DATA / 'trader_profiles_50.csv')
+FIELDS = ('total_trades', 'winning_trades', 'win_rate', 'total_pnl', 'avg_return_pct', 'sharpe_ratio')
+
+
+@pytest.fixture(scope='module', params=[None, 'lifo'], ids=['pairwise', 'lifo'])
+def run(request, tmp_path_factory):
+    """리포트와 기간 지표 인덱스를 만든 분석기 → (분석기, 리포트, WindowMetrics)"""
+    output = str(tmp_path_factory.mktemp('window') / 'r.json')
+    analyzer = TradingPerformanceAnalyzer(TRANSACTIONS, PROFILES, use_cache=False, lot_method=request.param)
+    analyzer.generate_full_report(output)
+    path = analyzer.write_window_index(output)
+    with open(output, encoding='utf-8') as f:
+        report = json.load(f)
+    return analyzer, report, WindowMetrics(path)
+
+
+def _brute_force(round_trips, trader_id, start=None, end=None):
+    """청산 시각으로 라운드트립을 직접 거른 뒤 같은 식으로 계산"""
+    rows = round_trips[round_trips['trader_id'] == trader_id]
+    if start is not None:
+        rows = rows[rows['sell_date'] >= pd.Timestamp(start)]
+    if end is not None:
+        rows = rows[rows['sell_date'] < pd.Timestamp(end)]
+    n = len(rows)
+    returns = rows['pnl_pct'].astype(float)
+    std = returns.std() if n > 1 else 0
+    mean = returns.mean() if n else 0
+    return {
+        'total_trades': n,
+        'winning_trades': int((rows['pnl'] > 0).sum()),
+        'win_rate': round((rows['pnl'] > 0).sum() / n * 100, 2) if n else 0,
+        'total_pnl': round(float(rows['pnl'].sum()), 2),
+        'avg_return_pct': round(float(mean), 2),
+        'sharpe_ratio': round(float(mean / std * np.sqrt(252)), 2) if std else 0,
+    }
+
+
+def _assert_record(actual, expected):
+    for field in FIELDS:
+        if field == 'sharpe_ratio':
+            # 합계/제곱합으로 구한 표준편차라 마지막 자리에서 다를 수 있다 (window_record 참고)
+            assert actual[field] == pytest.approx(expected[field], abs=0.0101), field
+        else:
+            assert actual[field] == pytest.approx(expected[field], abs=1e-9), field
+
+
+def test_full_range_matches_report_performance(run):
+    _, report, windows = run
+    assert sorted(windows.trader_ids) == sorted(
+        trader_id for trader_id, record in report.items() if record['performance']['total_trades'] > 0
+    )
+    for trader_id in windows.trader_ids:
+        performance = report[trader_id]['performance']
+        record = windows.metrics_between(trader_id)
+        if performance['sharpe_ratio'] is None:
+            # 거래 한 건이면 리포트는 표준편차가 NaN → null, 기간 지표는 0
+            assert record['total_trades'] == 1 and record['sharpe_ratio'] == 0
+            performance = dict(performance, sharpe_ratio=0)
+        _assert_record(record, performance)
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2025-05-01', '2025-08-01'), ('2025-09-15', None), (None, '2025-06-10 14:00'),
+    ('2025-08-01', '2025-05-01'), ('2030-01-01', None),
+])
+def test_bounded_window_matches_brute_force(run, start, end):
+    analyzer, _, windows = run
+    round_trips = analyzer.round_trips
+    total = 0
+    for trader_id in windows.trader_ids:
+        record = windows.metrics_between(trader_id, start, end)
+        _assert_record(record, _brute_force(round_trips, trader_id, start, end))
+        total += record['total_trades']
+    assert (total > 0) == (start != '2030-01-01' and (start or '') < (end or '9999'))
+
+
+def test_window_boundaries_are_half_open(tmp_path):
+    t = pd.Timestamp('2025-01-02 10:00')
+    round_trips = pd.DataFrame({
+        'trader_id': ['T1', 'T1', 'T1', 'T2'],
+        'sell_date': [t, t + pd.Timedelta(days=1), t + pd.Timedelta(days=2), t],
+        'pnl': [10.0, -5.0, 20.0, 1.0],
+        'pnl_pct': [1.0, -0.5, 2.0, 0.1],
+    })
+    path = str(tmp_path / 'r.prefix.npz')
+    save_window_index(path, build_window_index(round_trips))
+    windows = WindowMetrics(path)
+    assert windows.metrics_between('T1', t, t + pd.Timedelta(days=2))['total_pnl'] == 5.0
+    assert windows.metrics_between('T1', t + pd.Timedelta(seconds=1))['total_trades'] == 2
+    assert windows.metrics_between('T9') is None
+    assert [r['trader_id'] for r in windows.all_between(t + pd.Timedelta(days=1))] == ['T1']